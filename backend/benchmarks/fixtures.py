@@ -0,0 +1,75 @@
+"""
+Synthetic video fixtures for benchmarks.
+
+Clips are generated locally with MoviePy, so benchmarks need no network or
+storage access. Frames are a moving gradient with noise so the encoder has
+real work to do, and audio is a tone with a slow amplitude envelope.
+"""
+import os
+import hashlib
+from typing import NamedTuple
+import numpy as np
+from moviepy.editor import VideoClip, AudioClip
+
+class ClipSpec(NamedTuple):
+    """Shape of one synthetic clip"""
+    width: int
+    height: int
+    fps: int
+    duration: float
+    audio_fps: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.width}x{self.height}_{self.fps}fps_{self.duration:g}s_{self.audio_fps}hz"
+
+def _make_frame(spec: ClipSpec, seed: int):
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 24, size=(spec.height, spec.width, 1), dtype=np.uint8)
+    x = np.linspace(0, 255, spec.width, dtype=np.float32)[None, :, None]
+    y = np.linspace(0, 255, spec.height, dtype=np.float32)[:, None, None]
+
+    shape = (spec.height, spec.width, 1)
+    blue = np.broadcast_to((x + y) / 2, shape)
+
+    def make_frame(t: float) -> np.ndarray:
+        shift = 60.0 * t
+        red = np.broadcast_to((x + shift) % 256, shape)
+        green = np.broadcast_to((y + 2 * shift) % 256, shape)
+        frame = np.concatenate([red, green, blue], axis=2).astype(np.uint8)
+        return frame + noise
+
+    return make_frame
+
+def _make_audio(spec: ClipSpec):
+    def make_audio(t):
+        t = np.asarray(t)
+        envelope = 0.5 + 0.4 * np.sin(2 * np.pi * 0.5 * t)
+        tone = envelope * np.sin(2 * np.pi * 440 * t)
+        return np.stack([tone, tone], axis=-1) if tone.ndim else [tone, tone]
+
+    return make_audio
+
+def make_clip(spec: ClipSpec, directory: str) -> str:
+    """Write a synthetic clip to directory (reusing an existing one) and return its path"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{spec.name}.mp4")
+    if os.path.exists(path):
+        return path
+
+    seed = int(hashlib.sha1(spec.name.encode()).hexdigest()[:8], 16)
+    clip = VideoClip(_make_frame(spec, seed), duration=spec.duration)
+    clip = clip.set_audio(AudioClip(_make_audio(spec), duration=spec.duration, fps=spec.audio_fps))
+    partial_path = f"{path}.part.mp4"
+    clip.write_videofile(
+        partial_path,
+        fps=spec.fps,
+        codec="libx264",
+        audio_codec="aac",
+        audio_fps=spec.audio_fps,
+        temp_audiofile=f"{partial_path}.m4a",
+        remove_temp=True,
+        logger=None
+    )
+    os.replace(partial_path, path)
+    return path
@@ -0,0 +1,119 @@
+"""
+Ingest analysis benchmark.
+
+Runs the upload ingest steps (header probe and the single-decode analysis
+pass) over synthetic clips of increasing length and reports how CPU time,
+wall time and peak RSS scale with clip length. Each clip runs in a fresh
+process so peak memory is its own.
+
+Usage (from backend/):
+    python benchmarks/ingest_benchmark.py [--quick]
+        [--output results.json] [--compare baseline.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from datetime import datetime
+from typing import List, Dict, Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import ClipSpec, make_clip
+from measure import cpu_seconds, peak_rss_mb, environment
+from services.media_probe import probe_video
+from services.media_analysis import analyze_video
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCHMARK_DIR, ".fixtures")
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+# Same format at increasing lengths, up to the upload duration limit
+CLIP_SPECS = [
+    ClipSpec(1920, 1080, 30, duration, 48000)
+    for duration in (5.0, 15.0, 30.0, 60.0, 120.0, 300.0)
+]
+
+QUICK_CLIP_SPECS = CLIP_SPECS[:3]
+
+def _run_clip(path: str, results) -> None:
+    """Child process entry point: probe and analyse once and report measurements"""
+    probe_start = time.perf_counter()
+    probe = probe_video(path)
+    probe_seconds = time.perf_counter() - probe_start
+
+    cpu_start = cpu_seconds()
+    wall_start = time.perf_counter()
+    analysis = analyze_video(path)
+    wall = time.perf_counter() - wall_start
+    cpu = cpu_seconds() - cpu_start
+
+    results.put({
+        "probe_ms": round(probe_seconds * 1000, 2),
+        "analysis_wall_seconds": round(wall, 3),
+        "analysis_cpu_seconds": round(cpu, 3),
+        "media_seconds_per_cpu_second": round(probe.duration / cpu, 2) if cpu else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "scene_changes": len(analysis["scene_changes"]),
+        "mean_volume": analysis["mean_volume"]
+    })
+
+def run_benchmark(specs: List[ClipSpec]) -> Dict[str, Any]:
+    """Run every clip and collect results"""
+    context = multiprocessing.get_context("spawn")
+    clip_results = []
+    for spec in specs:
+        path = make_clip(spec, FIXTURE_DIR)
+        queue = context.Queue()
+        process = context.Process(target=_run_clip, args=(path, queue))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            result = {"error": f"exit code {process.exitcode}"}
+        else:
+            result = queue.get()
+        clip_results.append({"clip": spec.name, **spec._asdict(), **result})
+        print(f"{spec.name:36} {json.dumps(result)}")
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "environment": environment(),
+        "clips": clip_results
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print analysis CPU time change per clip against a baseline run"""
+    previous = {result["clip"]: result for result in baseline["clips"]}
+    for result in current["clips"]:
+        before = previous.get(result["clip"])
+        if not before or "error" in result or "error" in before:
+            continue
+        cpu = result["analysis_cpu_seconds"] / before["analysis_cpu_seconds"] - 1
+        wall = result["analysis_wall_seconds"] / before["analysis_wall_seconds"] - 1
+        print(f"{result['clip']:36} cpu {cpu:+.1%}  wall {wall:+.1%}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="run the shorter clips only")
+    parser.add_argument("--output", help="results JSON path")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    results = run_benchmark(QUICK_CLIP_SPECS if args.quick else CLIP_SPECS)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"ingest_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    with open(output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(results, json.load(baseline_file))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Process measurements shared by the benchmarks.
+"""
+import os
+import sys
+import platform
+import resource
+import subprocess
+from typing import Dict, Any
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def cpu_seconds() -> float:
+    """CPU time of this process and its waited-for children (ffmpeg)"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process and its largest child, in MB"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return max(own, children) / scale
+
+def environment() -> Dict[str, Any]:
+    """Where a benchmark ran, stored with its results"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, cwd=BENCHMARK_DIR
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit
+    }
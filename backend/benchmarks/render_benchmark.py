@@ -0,0 +1,169 @@
+"""
+Render engine benchmark.
+
+Renders synthetic local clips through the story render engine over a set
+of scenarios and reports seconds of output per CPU-second, wall time and
+peak RSS. Each scenario runs in a fresh process so peak memory is its own.
+
+Usage (from backend/):
+    python benchmarks/render_benchmark.py [--quick] [--engine moviepy]
+        [--output results.json] [--compare baseline.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from datetime import datetime
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import ClipSpec, make_clip
+from measure import cpu_seconds, peak_rss_mb, environment
+from services.render_plan import RenderPlan, RenderSegment
+from services.renderer import StageTimer, render_story
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCHMARK_DIR, ".fixtures")
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+# Source clips cycled through by scenarios: mixed resolution, fps, length and audio rate
+CLIP_SPECS = [
+    ClipSpec(1280, 720, 30, 4.0, 44100),
+    ClipSpec(1920, 1080, 30, 6.0, 48000),
+    ClipSpec(854, 480, 24, 3.0, 22050),
+    ClipSpec(1080, 1920, 60, 5.0, 48000),
+]
+
+class Scenario(NamedTuple):
+    """One benchmark case"""
+    steps: int
+    transition_type: Optional[str]
+    resolution: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.steps}steps_{self.transition_type or 'cut'}_{self.resolution}"
+
+SCENARIOS = [
+    Scenario(steps, transition_type, resolution)
+    for steps in (2, 4, 8)
+    for transition_type in (None, "fade")
+    for resolution in ("720p", "1080p")
+]
+
+QUICK_SCENARIOS = [
+    Scenario(2, None, "720p"),
+    Scenario(4, "fade", "720p"),
+]
+
+def _render_moviepy(plan: RenderPlan, output_path: str) -> Dict[str, Any]:
+    timer = StageTimer()
+    metadata = render_story(plan, lambda segment: segment.storage_path, output_path, timer=timer)
+    metadata["stage_timings"] = timer.as_dict()
+    return metadata
+
+# Engines take a plan whose storage paths are local files and an output path.
+# Register alternative engines here to compare them on the same scenarios.
+ENGINES = {
+    "moviepy": _render_moviepy,
+}
+
+def build_plan(scenario: Scenario, clip_paths: List[Tuple[ClipSpec, str]]) -> RenderPlan:
+    """Build a render plan cycling through the fixture clips"""
+    segments = []
+    for index in range(scenario.steps):
+        spec, path = clip_paths[index % len(clip_paths)]
+        segments.append(RenderSegment(
+            storage_path=path,
+            transition_type=scenario.transition_type,
+            transition_duration=0.5 if scenario.transition_type else None,
+            source_duration=spec.duration
+        ))
+    return RenderPlan(resolution=scenario.resolution, segments=tuple(segments))
+
+def _run_scenario(engine: str, plan: RenderPlan, output_path: str, results) -> None:
+    """Child process entry point: render once and report measurements"""
+    cpu_start = cpu_seconds()
+    wall_start = time.perf_counter()
+    metadata = ENGINES[engine](plan, output_path)
+    wall = time.perf_counter() - wall_start
+    cpu = cpu_seconds() - cpu_start
+    results.put({
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": round(cpu, 3),
+        "output_seconds": round(metadata["duration"], 3),
+        "output_seconds_per_cpu_second": round(metadata["duration"] / cpu, 4) if cpu else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "stage_timings": metadata.get("stage_timings", {})
+    })
+
+def run_benchmark(engine: str, scenarios: List[Scenario]) -> Dict[str, Any]:
+    """Run every scenario for an engine and collect results"""
+    clip_paths = [(spec, make_clip(spec, FIXTURE_DIR)) for spec in CLIP_SPECS]
+    context = multiprocessing.get_context("spawn")
+    output_dir = os.path.join(FIXTURE_DIR, "output")
+    os.makedirs(output_dir, exist_ok=True)
+
+    scenario_results = []
+    for scenario in scenarios:
+        plan = build_plan(scenario, clip_paths)
+        output_path = os.path.join(output_dir, f"{engine}_{scenario.name}.mp4")
+        queue = context.Queue()
+        process = context.Process(target=_run_scenario, args=(engine, plan, output_path, queue))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            result = {"error": f"exit code {process.exitcode}"}
+        else:
+            result = queue.get()
+        scenario_results.append({"scenario": scenario.name, **scenario._asdict(), **result})
+        print(f"{engine:10} {scenario.name:28} {json.dumps(result)}")
+
+    return {
+        "engine": engine,
+        "created_at": datetime.utcnow().isoformat(),
+        "environment": environment(),
+        "clips": [spec._asdict() for spec in CLIP_SPECS],
+        "scenarios": scenario_results
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print throughput and wall time change per scenario against a baseline run"""
+    previous = {result["scenario"]: result for result in baseline["scenarios"]}
+    for result in current["scenarios"]:
+        before = previous.get(result["scenario"])
+        if not before or "error" in result or "error" in before:
+            continue
+        throughput = result["output_seconds_per_cpu_second"] / before["output_seconds_per_cpu_second"] - 1
+        wall = result["wall_seconds"] / before["wall_seconds"] - 1
+        print(f"{result['scenario']:28} throughput {throughput:+.1%}  wall {wall:+.1%}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", action="append", choices=sorted(ENGINES), help="engine to run (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="run a small scenario subset")
+    parser.add_argument("--output", help="results JSON path")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    scenarios = QUICK_SCENARIOS if args.quick else SCENARIOS
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    for engine in args.engine or sorted(ENGINES):
+        results = run_benchmark(engine, scenarios)
+        output = args.output or os.path.join(
+            RESULTS_DIR, f"render_{engine}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        with open(output, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+        print(f"Results written to {output}")
+
+        if args.compare:
+            with open(args.compare) as baseline_file:
+                compare(results, json.load(baseline_file))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Storage client benchmark.
+
+Measures the per-request cost of getting an S3 client the way services
+used to (a new boto3 client per StorageService) against the shared pooled
+client. With --key, each request also makes a HEAD call for that object,
+so connection setup and reuse are included; this needs credentials and
+network access to the configured bucket.
+
+Usage (from backend/):
+    python benchmarks/storage_benchmark.py [--requests 200] [--key videos/...]
+        [--output results.json] [--compare baseline.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import boto3
+
+from measure import cpu_seconds, environment
+from services.storage import StorageService
+from config.settings import settings
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+def _per_instance_client():
+    """A fresh client with default pooling, as each StorageService used to create"""
+    return boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION
+    )
+
+def _shared_client():
+    return StorageService().s3_client
+
+MODES: Dict[str, Callable[[], Any]] = {
+    "per_instance": _per_instance_client,
+    "shared": _shared_client,
+}
+
+def run_mode(mode: str, requests: int, key: Optional[str]) -> Dict[str, Any]:
+    """Time getting a client, plus a HEAD call when a key is given, per request"""
+    get_client = MODES[mode]
+    timings: List[float] = []
+    cpu_start = cpu_seconds()
+    for _ in range(requests):
+        start = time.perf_counter()
+        client = get_client()
+        if key:
+            client.head_object(Bucket=settings.AWS_BUCKET_NAME, Key=key)
+        timings.append((time.perf_counter() - start) * 1000)
+    cpu = cpu_seconds() - cpu_start
+
+    timings.sort()
+    return {
+        "mode": mode,
+        "requests": requests,
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "cpu_ms_per_request": round(cpu * 1000 / requests, 3)
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print mean latency change per mode against a baseline run"""
+    previous = {result["mode"]: result for result in baseline["modes"]}
+    for result in current["modes"]:
+        before = previous.get(result["mode"])
+        if not before:
+            continue
+        mean = result["mean_ms"] / before["mean_ms"] - 1
+        print(f"{result['mode']:14} mean {mean:+.1%}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="requests per mode")
+    parser.add_argument("--key", help="object to HEAD on each request")
+    parser.add_argument("--output", help="results JSON path")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    mode_results = []
+    for mode in MODES:
+        result = run_mode(mode, max(args.requests, 1), args.key)
+        mode_results.append(result)
+        print(f"{mode:14} {json.dumps(result)}")
+
+    results = {
+        "created_at": datetime.utcnow().isoformat(),
+        "environment": environment(),
+        "head_requests": bool(args.key),
+        "modes": mode_results
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"storage_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    with open(output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(results, json.load(baseline_file))
+
+if __name__ == "__main__":
+    main()
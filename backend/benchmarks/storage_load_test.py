@@ -0,0 +1,127 @@
+"""
+Storage event loop load test.
+
+Fires many concurrent storage calls from one event loop while a probe task
+measures how late the loop wakes it, the lag every other request on the
+process would see. Two modes are compared: "blocking" calls the S3 client
+directly from the coroutine, as StorageService used to, and "pooled" goes
+through StorageService's storage I/O pool.
+
+By default the client is replaced by one that sleeps for --latency seconds
+per call, so the test runs without a bucket; pass --key to HEAD a real
+object instead (needs credentials and network access).
+
+Usage (from backend/):
+    python benchmarks/storage_load_test.py [--calls 500] [--concurrency 100]
+        [--latency 0.05] [--key videos/...] [--output results.json]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from measure import environment
+from services.storage import StorageService
+from config.settings import settings
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+PROBE_INTERVAL = 0.01  # seconds between event loop lag probes
+
+class SimulatedClient:
+    """S3 client stand-in whose calls block for a fixed network latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def head_object(self, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        return {"ContentLength": 0, "ETag": '""'}
+
+async def _probe_lag(stop: asyncio.Event, lags: List[float]) -> None:
+    """Record how late the loop resumes a task that asked to sleep PROBE_INTERVAL"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+async def _run_mode(mode: str, storage_service: StorageService, key: str, calls: int, concurrency: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call() -> None:
+        async with semaphore:
+            if mode == "blocking":
+                storage_service.s3_client.head_object(Bucket=settings.AWS_BUCKET_NAME, Key=key)
+            else:
+                await storage_service.check_file_exists(key)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_lag(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(calls)))
+    wall = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    lags.sort()
+    return {
+        "mode": mode,
+        "calls": calls,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 3),
+        "calls_per_second": round(calls / wall, 1) if wall else None,
+        "probes": len(lags),
+        "lag_p50_ms": round(lags[len(lags) // 2], 2) if lags else None,
+        "lag_p99_ms": round(lags[max(int(len(lags) * 0.99) - 1, 0)], 2) if lags else None,
+        "lag_max_ms": round(lags[-1], 2) if lags else None
+    }
+
+def run_load_test(calls: int, concurrency: int, latency: float, key: Optional[str]) -> Dict[str, Any]:
+    """Run both modes and collect results"""
+    storage_service = StorageService()
+    if not key:
+        storage_service.s3_client = SimulatedClient(latency)
+
+    mode_results = []
+    for mode in ("blocking", "pooled"):
+        result = asyncio.run(_run_mode(mode, storage_service, key or "load-test", calls, concurrency))
+        mode_results.append(result)
+        print(f"{mode:10} {json.dumps(result)}")
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "environment": environment(),
+        "simulated_latency": None if key else latency,
+        "storage_io_threads": settings.STORAGE_IO_THREADS,
+        "modes": mode_results
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500, help="storage calls per mode")
+    parser.add_argument("--concurrency", type=int, default=100, help="calls in flight at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per call")
+    parser.add_argument("--key", help="real object to HEAD instead of simulating")
+    parser.add_argument("--output", help="results JSON path")
+    args = parser.parse_args()
+
+    results = run_load_test(max(args.calls, 1), max(args.concurrency, 1), args.latency, args.key)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"storage_load_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    with open(output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
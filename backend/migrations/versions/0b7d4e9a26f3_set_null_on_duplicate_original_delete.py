@@ -0,0 +1,34 @@
+"""Set null on duplicate original delete
+
+Revision ID: 0b7d4e9a26f3
+Revises: e5d8a1f47c20
+Create Date: 2026-10-20 09:14:52.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7d4e9a26f3'
+down_revision: Union[str, None] = 'e5d8a1f47c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('fk_video_segments_duplicate_of_id', 'video_segments', type_='foreignkey')
+    op.create_foreign_key(
+        'fk_video_segments_duplicate_of_id', 'video_segments', 'video_segments',
+        ['duplicate_of_id'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_video_segments_duplicate_of_id', 'video_segments', type_='foreignkey')
+    op.create_foreign_key(
+        'fk_video_segments_duplicate_of_id', 'video_segments', 'video_segments',
+        ['duplicate_of_id'], ['id']
+    )
@@ -0,0 +1,50 @@
+"""Add prerendered stories
+
+Revision ID: 3c9e1f4a7b2d
+Revises: a15159738688
+Create Date: 2026-10-19 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e1f4a7b2d'
+down_revision: Union[str, None] = 'a15159738688'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'prerendered_stories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('template_id', sa.Integer(), nullable=False),
+        sa.Column('resolution', sa.String(length=10), nullable=False),
+        sa.Column('transition_type', sa.String(), nullable=True),
+        sa.Column('transition_duration', sa.Float(), nullable=True),
+        sa.Column('storage_path', sa.String(), nullable=False),
+        sa.Column('thumbnail_path', sa.String(), nullable=True),
+        sa.Column('duration', sa.Float(), nullable=True),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('fps', sa.Float(), nullable=True),
+        sa.Column('segment_ids', sa.ARRAY(sa.Integer()), nullable=False),
+        sa.Column('segment_user_ids', sa.ARRAY(sa.Integer()), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['template_id'], ['story_templates.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_prerendered_stories_template_id', 'prerendered_stories', ['template_id'])
+    op.create_index('ix_prerendered_stories_expires_at', 'prerendered_stories', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_prerendered_stories_expires_at', table_name='prerendered_stories')
+    op.drop_index('ix_prerendered_stories_template_id', table_name='prerendered_stories')
+    op.drop_table('prerendered_stories')
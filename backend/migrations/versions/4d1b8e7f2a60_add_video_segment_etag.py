@@ -0,0 +1,37 @@
+"""Add video segment etag
+
+Revision ID: 4d1b8e7f2a60
+Revises: 9a3f6d2c71e8
+Create Date: 2026-10-21 10:12:45.207311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d1b8e7f2a60'
+down_revision: Union[str, None] = '9a3f6d2c71e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('video_segments', sa.Column('etag', sa.String(), nullable=True))
+    # The latest recorded upload of each segment is its current content
+    op.execute("""
+        UPDATE video_segments
+        SET etag = (
+            SELECT ingest_events.etag
+            FROM ingest_events
+            WHERE ingest_events.video_segment_id = video_segments.id
+            ORDER BY ingest_events.created_at DESC, ingest_events.id DESC
+            LIMIT 1
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('video_segments', 'etag')
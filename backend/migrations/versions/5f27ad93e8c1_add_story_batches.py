@@ -0,0 +1,52 @@
+"""Add story batches
+
+Revision ID: 5f27ad93e8c1
+Revises: 8d41b6e0c5a3
+Create Date: 2026-10-19 11:37:08.514926
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f27ad93e8c1'
+down_revision: Union[str, None] = '8d41b6e0c5a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'story_batches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('template_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('resolution', sa.String(length=10), nullable=False),
+        sa.Column('transition_type', sa.String(), nullable=True),
+        sa.Column('transition_duration', sa.Float(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('total_count', sa.Integer(), nullable=False),
+        sa.Column('completed_count', sa.Integer(), nullable=False),
+        sa.Column('failed_count', sa.Integer(), nullable=False),
+        sa.Column('error_message', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['template_id'], ['story_templates.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.add_column('generated_stories', sa.Column('batch_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_generated_stories_batch_id', 'generated_stories', 'story_batches', ['batch_id'], ['id']
+    )
+    op.create_index('ix_generated_stories_batch_id', 'generated_stories', ['batch_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_generated_stories_batch_id', table_name='generated_stories')
+    op.drop_constraint('fk_generated_stories_batch_id', 'generated_stories', type_='foreignkey')
+    op.drop_column('generated_stories', 'batch_id')
+    op.drop_table('story_batches')
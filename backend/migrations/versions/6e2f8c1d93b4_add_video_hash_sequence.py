@@ -0,0 +1,26 @@
+"""Add video hash sequence
+
+Revision ID: 6e2f8c1d93b4
+Revises: 0b7d4e9a26f3
+Create Date: 2026-10-20 09:47:18.552093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2f8c1d93b4'
+down_revision: Union[str, None] = '0b7d4e9a26f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('video_segments', sa.Column('video_hash_sequence', sa.ARRAY(sa.BigInteger()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('video_segments', 'video_hash_sequence')
@@ -0,0 +1,41 @@
+"""Add story plans
+
+Revision ID: 8d41b6e0c5a3
+Revises: 3c9e1f4a7b2d
+Create Date: 2026-10-19 10:04:52.871330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41b6e0c5a3'
+down_revision: Union[str, None] = '3c9e1f4a7b2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'story_plans',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('token', sa.String(length=64), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('template_id', sa.Integer(), nullable=False),
+        sa.Column('segment_ids', sa.ARRAY(sa.Integer()), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['template_id'], ['story_templates.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_story_plans_token', 'story_plans', ['token'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_story_plans_token', table_name='story_plans')
+    op.drop_table('story_plans')
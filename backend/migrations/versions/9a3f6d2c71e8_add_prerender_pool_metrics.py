@@ -0,0 +1,33 @@
+"""Add prerender pool metrics
+
+Revision ID: 9a3f6d2c71e8
+Revises: 6e2f8c1d93b4
+Create Date: 2026-10-20 11:26:04.318270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3f6d2c71e8'
+down_revision: Union[str, None] = '6e2f8c1d93b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'prerender_pool_metrics',
+        sa.Column('name', sa.String(length=32), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('prerender_pool_metrics')
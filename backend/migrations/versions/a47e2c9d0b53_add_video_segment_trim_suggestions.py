@@ -0,0 +1,28 @@
+"""Add video segment trim suggestions
+
+Revision ID: a47e2c9d0b53
+Revises: f1c74be08d26
+Create Date: 2026-10-19 18:12:41.905317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a47e2c9d0b53'
+down_revision: Union[str, None] = 'f1c74be08d26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('video_segments', sa.Column('suggested_start_time', sa.Float(), nullable=True))
+    op.add_column('video_segments', sa.Column('suggested_end_time', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('video_segments', 'suggested_end_time')
+    op.drop_column('video_segments', 'suggested_start_time')
@@ -0,0 +1,28 @@
+"""Add video segment keyframe index
+
+Revision ID: b62e0d7f4a19
+Revises: 5f27ad93e8c1
+Create Date: 2026-10-19 14:22:41.306518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b62e0d7f4a19'
+down_revision: Union[str, None] = '5f27ad93e8c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('video_segments', sa.Column('keyframe_times', sa.ARRAY(sa.Float()), nullable=True))
+    op.add_column('video_segments', sa.Column('keyframe_offsets', sa.ARRAY(sa.BigInteger()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('video_segments', 'keyframe_offsets')
+    op.drop_column('video_segments', 'keyframe_times')
@@ -0,0 +1,38 @@
+"""Add ingest events
+
+Revision ID: c9f03b6e2d17
+Revises: a47e2c9d0b53
+Create Date: 2026-10-19 19:26:03.517284
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f03b6e2d17'
+down_revision: Union[str, None] = 'a47e2c9d0b53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ingest_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('object_key', sa.String(), nullable=False),
+        sa.Column('etag', sa.String(), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('video_segment_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['video_segment_id'], ['video_segments.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('object_key', 'etag', name='uq_ingest_events_object_key_etag')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ingest_events')
@@ -0,0 +1,43 @@
+"""Add video segment fingerprints
+
+Revision ID: d3a8c51f92e7
+Revises: b62e0d7f4a19
+Create Date: 2026-10-19 15:48:03.712954
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a8c51f92e7'
+down_revision: Union[str, None] = 'b62e0d7f4a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HASH_CHUNK_COLUMNS = ['video_hash_0', 'video_hash_1', 'video_hash_2', 'video_hash_3']
+
+
+def upgrade() -> None:
+    op.add_column('video_segments', sa.Column('video_hash', sa.BigInteger(), nullable=True))
+    op.add_column('video_segments', sa.Column('audio_hash', sa.BigInteger(), nullable=True))
+    for column in HASH_CHUNK_COLUMNS:
+        op.add_column('video_segments', sa.Column(column, sa.Integer(), nullable=True))
+        op.create_index(f'ix_video_segments_{column}', 'video_segments', [column], unique=False)
+    op.add_column('video_segments', sa.Column('duplicate_of_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_video_segments_duplicate_of_id', 'video_segments', 'video_segments',
+        ['duplicate_of_id'], ['id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_video_segments_duplicate_of_id', 'video_segments', type_='foreignkey')
+    op.drop_column('video_segments', 'duplicate_of_id')
+    for column in reversed(HASH_CHUNK_COLUMNS):
+        op.drop_index(f'ix_video_segments_{column}', table_name='video_segments')
+        op.drop_column('video_segments', column)
+    op.drop_column('video_segments', 'audio_hash')
+    op.drop_column('video_segments', 'video_hash')
@@ -0,0 +1,39 @@
+"""Add storage deletions
+
+Revision ID: e5d8a1f47c20
+Revises: c9f03b6e2d17
+Create Date: 2026-10-19 21:08:37.662915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5d8a1f47c20'
+down_revision: Union[str, None] = 'c9f03b6e2d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'storage_deletions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('object_key', sa.String(), nullable=False),
+        sa.Column('is_prefix', sa.Boolean(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_storage_deletions_next_attempt_at', 'storage_deletions', ['next_attempt_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_storage_deletions_next_attempt_at', table_name='storage_deletions')
+    op.drop_table('storage_deletions')
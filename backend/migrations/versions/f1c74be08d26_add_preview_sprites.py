@@ -0,0 +1,32 @@
+"""Add preview sprites
+
+Revision ID: f1c74be08d26
+Revises: d3a8c51f92e7
+Create Date: 2026-10-19 17:05:29.448120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c74be08d26'
+down_revision: Union[str, None] = 'd3a8c51f92e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['video_segments', 'generated_stories', 'prerendered_stories']
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column('sprite_path', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('sprite_vtt_path', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, 'sprite_vtt_path')
+        op.drop_column(table, 'sprite_path')
@@ -1,12 +1,13 @@
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+import hmac
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from config.database import SessionLocal
 from config.settings import settings
-from models.base import User
+from models.story import User
 from services.user import UserService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
@@ -64,4 +65,18 @@ async def get_current_admin_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user doesn't have enough privileges"
         )
-    return current_user 
\ No newline at end of file
+    return current_user 
+
+async def verify_storage_webhook(authorization: Optional[str] = Header(None)) -> None:
+    """Check the bearer token of a storage notification against the shared secret"""
+    if not settings.STORAGE_WEBHOOK_SECRET:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not found"
+        )
+    expected = f"Bearer {settings.STORAGE_WEBHOOK_SECRET}"
+    if not authorization or not hmac.compare_digest(authorization.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid webhook token"
+        )
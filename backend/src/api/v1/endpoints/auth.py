@@ -9,7 +9,7 @@ from api.deps import get_db
 from schemas.token import Token, TokenPair
 from services.user import UserService
 from services.auth import AuthService
-from models.base import User
+from models.story import User
 from schemas.user import UserCreate
 
 router = APIRouter()
@@ -1,16 +1,27 @@
+import json
+import asyncio
 from typing import Optional
-from fastapi import APIRouter, Depends, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, Query, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse, Response
 from sqlalchemy.orm import Session
 
-from api.deps import get_db, get_current_user
-from models.base import User
+from api.deps import get_db, get_current_user, get_current_admin_user
+from models.story import User
 from schemas.story import (
     StoryGenerationRequest,
     GeneratedStoryResponse,
     GeneratedStoryList,
-    StoryGenerationStatus
+    StoryGenerationStatus,
+    StoryPrepareRequest,
+    StoryPrepareResponse,
+    StoryBatchRequest,
+    StoryBatchStatus
 )
 from services.story_generation import StoryGenerationService
+from services.prerender_pool import PrerenderPoolService
+from services.story_batch import StoryBatchService, run_story_batch
+from services.story_events import story_event_broker
+from config.settings import settings
 
 router = APIRouter()
 
@@ -26,19 +37,80 @@ async def generate_story(
     The story will be generated asynchronously in the background.
     """
     story_service = StoryGenerationService(db)
-    return await story_service.generate_story(current_user.id, request)
+    story = await story_service.generate_story(current_user.id, request, background_tasks)
+    response = GeneratedStoryResponse.model_validate(story)
+    # The session is only closed after background tasks finish; release its
+    # connection now so it is not held idle in a transaction during the render
+    db.close()
+    return response
+
+@router.post("/prepare", response_model=StoryPrepareResponse)
+async def prepare_story(
+    request: StoryPrepareRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Prepare a story before generation.
+    Selects and pins segments for the template and starts fetching them,
+    so that generating with the returned plan token skips both steps.
+    """
+    story_service = StoryGenerationService(db)
+    plan = await story_service.prepare_story(current_user.id, request, background_tasks)
+    response = {
+        "plan_token": plan.token,
+        "template_id": plan.template_id,
+        "expires_at": plan.expires_at
+    }
+    # Warming runs before the session is closed; release its connection now
+    db.close()
+    return response
+
+@router.post("/batch", response_model=StoryBatchStatus)
+async def generate_story_batch(
+    request: StoryBatchRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Generate many stories from one template.
+    All stories are planned immediately and rendered in the background;
+    poll the batch status endpoint for progress.
+    """
+    batch_service = StoryBatchService(db)
+    batch = await batch_service.create_batch(current_user.id, request)
+    background_tasks.add_task(run_story_batch, batch.id)
+    response = await batch_service.get_batch_status(batch.id, current_user.id)
+    # The batch renders before the session is closed; release its connection now
+    db.close()
+    return response
+
+@router.get("/batch/{batch_id}", response_model=StoryBatchStatus)
+async def get_story_batch(
+    batch_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get progress of a story batch"""
+    batch_service = StoryBatchService(db)
+    return await batch_service.get_batch_status(batch_id, current_user.id)
 
 @router.get("", response_model=GeneratedStoryList)
 async def list_stories(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     user_id: Optional[int] = None,
+    include_urls: bool = Query(False, description="Include presigned playback and thumbnail URLs"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """List generated stories with pagination"""
     story_service = StoryGenerationService(db)
     stories, total = await story_service.list_stories(user_id, skip, limit)
+    if include_urls:
+        await story_service.attach_urls(stories)
     return {
         "total": total,
         "page": skip // limit + 1,
@@ -46,15 +118,98 @@ async def list_stories(
         "items": stories
     }
 
+@router.get("/pool/stats")
+async def get_prerender_pool_stats(
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Get pre-render pool hit rate and fill levels (admin only)"""
+    pool_service = PrerenderPoolService(db)
+    return await pool_service.get_pool_stats()
+
 @router.get("/{story_id}", response_model=GeneratedStoryResponse)
 async def get_story(
     story_id: int,
+    include_urls: bool = Query(False, description="Include presigned playback and thumbnail URLs"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific generated story"""
     story_service = StoryGenerationService(db)
-    return await story_service.get_story(story_id, current_user.id)
+    story = await story_service.get_story(story_id, current_user.id)
+    if include_urls:
+        await story_service.attach_urls([story])
+    return story
+
+@router.get("/{story_id}/sprite.vtt")
+async def get_story_sprite_vtt(
+    story_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a story's WebVTT scrubber index.
+    Each cue points at a tile of the presigned sprite sheet URL.
+    """
+    story_service = StoryGenerationService(db)
+    vtt = await story_service.get_sprite_vtt(story_id)
+    return Response(content=vtt, media_type="text/vtt")
+
+@router.get("/{story_id}/status", response_model=StoryGenerationStatus)
+async def get_story_status(
+    story_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get generation progress and estimated time remaining for a story"""
+    story_service = StoryGenerationService(db)
+    return await story_service.get_generation_status(story_id, current_user.id)
+
+@router.get("/{story_id}/events")
+async def stream_story_status(
+    story_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream generation status updates as server-sent events.
+    Sends the current status first, then every update until the story
+    completes or fails. Use this instead of polling the story.
+    """
+    story_service = StoryGenerationService(db)
+    user_id = current_user.id
+
+    async def event_stream():
+        # Subscribe before reading the current status so no update is missed
+        async with story_event_broker.subscribe(story_id) as queue:
+            story_status = await story_service.get_generation_status(story_id, user_id)
+            # Release the connection; the stream may stay open for minutes
+            db.close()
+
+            while True:
+                yield f"data: {json.dumps(story_status)}\n\n"
+                if story_status["status"] in ("completed", "failed"):
+                    return
+
+                while True:
+                    if await request.is_disconnected():
+                        return
+                    try:
+                        event = await asyncio.wait_for(queue.get(), timeout=settings.STORY_EVENTS_KEEPALIVE)
+                        break
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+
+                story_status = {key: value for key, value in event.items() if key != "story_id"}
+
+    # Validate access before the response starts streaming
+    await story_service.get_generation_status(story_id, user_id)
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.delete("/{story_id}")
 async def delete_story(
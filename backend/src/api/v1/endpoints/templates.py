@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
 from api.deps import get_db, get_current_user, get_current_admin_user
-from models.base import User
+from models.story import User
 from schemas.template import (
     StoryTemplateCreate,
     StoryTemplateUpdate,
@@ -2,7 +2,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
-from models.base import User
+from models.story import User
 from schemas.user import (
     UserCreate,
     UserUpdate,
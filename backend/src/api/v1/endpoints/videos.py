@@ -1,11 +1,13 @@
 """Video management endpoints"""
 from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Dict, Any
 import tempfile
 
-from api.deps import get_db, get_current_user, get_current_admin_user
-from models.base import User
+from api.deps import get_db, get_current_user, get_current_admin_user, verify_storage_webhook
+from config.settings import settings
+from models.story import User
 from schemas.video import (
     PresignedUrlRequest,
     PresignedUrlResponse,
@@ -16,7 +18,7 @@ from schemas.video import (
 )
 from services.storage import StorageService
 from services.video import VideoService
-from services.s3 import S3Service
+from services.ingest import upload_object_key
 
 router = APIRouter()
 storage_service = StorageService()
@@ -34,6 +36,8 @@ async def get_upload_url(
     
     Args:
         * **filename**: Required. Original filename of the video
+        * **step_id**: Optional. Story step the video is recorded for; without it the key
+          does not name a step and complete-upload must give one
         * **content_type**: Required. MIME type of the video (must be a valid video type)
     
     Returns:
@@ -47,8 +51,22 @@ async def get_upload_url(
         * **401**: Not authenticated
         * **422**: Validation error
     """
-    s3_service = S3Service()
-    return await s3_service.generate_presigned_url(request, current_user.id)
+    if request.content_type not in settings.ALLOWED_VIDEO_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid content type"
+        )
+
+    # The key names the owner and step, so storage notifications can record the upload
+    upload_url, object_key = await storage_service.generate_presigned_url(
+        upload_object_key(current_user.id, request.step_id, request.content_type),
+        settings.UPLOAD_URL_EXPIRE
+    )
+    return PresignedUrlResponse(
+        upload_url=upload_url,
+        object_key=object_key,
+        expires_in=settings.UPLOAD_URL_EXPIRE
+    )
 
 @router.post("/complete-upload", response_model=VideoSegment)
 async def complete_upload(
@@ -60,11 +78,14 @@ async def complete_upload(
     """
     Complete video upload process.
     
-    Validates the uploaded video and processes it for use in stories.
+    Records the uploaded video and queues it for validation and processing.
     Must be called after successfully uploading a video using the presigned URL.
+    Poll the returned segment's processing status to see when it is ready.
     
     Args:
         * **object_key**: Required. Object key returned from upload-url endpoint
+        * **step_id**: Optional. Story step the video was recorded for; required when the
+          object key does not name one
         * **success**: Required. Whether the upload was successful
         * **error_message**: Optional. Error message if upload failed
     
@@ -72,21 +93,49 @@ async def complete_upload(
         VideoSegment object containing:
         * **id**: Unique identifier for the video segment
         * **user_id**: ID of the user who uploaded the video
-        * **object_key**: S3 object key
-        * **duration**: Video duration in seconds
-        * **size**: File size in bytes
-        * **status**: Processing status
-        * **metadata**: Additional video metadata
+        * **storage_path**: S3 object key
+        * **processing_status**: pending, processing, completed or failed
+        * **processing_error**: Why processing failed, if it did
     
     Raises:
-        * **400**: Invalid video format or failed upload
+        * **400**: Failed upload, not an upload-url object key, no step, or uploaded for a different step
         * **401**: Not authenticated
-        * **404**: Video not found in storage
+        * **403**: Object key belongs to another user
+        * **404**: Story step or uploaded video not found
         * **422**: Validation error
+        * **429**: Too many uploads being processed; retry after the Retry-After header
     """
     video_service = VideoService(db)
     return await video_service.process_upload(upload_data, current_user.id, background_tasks)
 
+@router.post("/storage-events", dependencies=[Depends(verify_storage_webhook)])
+async def storage_events(
+    notification: Dict[str, Any],
+    db: Session = Depends(get_db)
+):
+    """
+    Receive object-created notifications from storage.
+    
+    Queues uploads for ingestion even when the client never calls
+    complete-upload. Each object version is ingested once, however many
+    notifications or complete-upload calls arrive for it.
+    
+    Args:
+        * **Records**: S3-style event records
+    
+    Returns:
+        * **status**: "success"
+        * **queued**: Number of uploads queued for ingestion
+    
+    Raises:
+        * **401**: Missing or invalid bearer token
+        * **404**: Notifications are not enabled
+        * **429**: Too many uploads being processed; retry after the Retry-After header
+    """
+    video_service = VideoService(db)
+    queued = await video_service.process_storage_notification(notification)
+    return {"status": "success", "queued": queued}
+
 @router.get("/{object_key}/metadata", response_model=VideoMetadata)
 async def get_video_metadata(
     object_key: str,
@@ -143,23 +192,31 @@ async def delete_video(
     await video_service.delete_video(object_key, current_user.id)
     return {"status": "success"}
 
-@router.get("/{object_key}/view-url")
+@router.get("/{object_key:path}/view-url")
 async def get_video_view_url(
     object_key: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get a presigned URL for viewing a video"""
-    # Verify the video exists
-    if not await storage_service.check_file_exists(object_key):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Video not found"
-        )
-
-    # Generate a presigned URL for viewing
-    url = await storage_service.get_download_url(object_key)
+    video_service = VideoService(db)
+    url = await video_service.get_view_url(object_key)
     return {"url": url}
 
+@router.get("/segments/{segment_id}/sprite.vtt")
+async def get_segment_sprite_vtt(
+    segment_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a video segment's WebVTT scrubber index.
+    Each cue points at a tile of the presigned sprite sheet URL.
+    """
+    video_service = VideoService(db)
+    vtt = await video_service.get_sprite_vtt(segment_id)
+    return Response(content=vtt, media_type="text/vtt")
+
 # Admin endpoints
 @router.put("/segments/{segment_id}/approve", dependencies=[Depends(get_current_admin_user)])
 async def approve_segment(
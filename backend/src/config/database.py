@@ -6,6 +6,7 @@ from sqlalchemy.exc import SQLAlchemyError, DBAPIError
 from sqlalchemy.engine import Engine
 from tenacity import retry, stop_after_attempt, wait_exponential
 from .settings import settings
+from models.base import Base  # The models' declarative base, so there is one metadata
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -24,15 +25,12 @@ engine = create_engine(
 # Create sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Base class for models
-Base = declarative_base()
-
 @event.listens_for(Engine, "connect")
 def connect(dbapi_connection, connection_record):
     """Log when a connection is created"""
     logger.info("Database connection established")
 
-@event.listens_for(Engine, "disconnect")
+@event.listens_for(Engine, "close")
 def disconnect(dbapi_connection, connection_record):
     """Log when a connection is destroyed"""
     logger.info("Database connection closed")
@@ -1,6 +1,8 @@
+import os
+import tempfile
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -33,12 +35,54 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str
     AWS_REGION: str = "us-west-2"
     AWS_BUCKET_NAME: str
+    S3_MAX_POOL_CONNECTIONS: int = 50  # connections kept by the shared S3 client, per process
+    S3_MAX_ATTEMPTS: int = 3  # attempts per S3 call, including the first
+    STORAGE_IO_THREADS: int = 32  # threads running S3 calls for async code, at most S3_MAX_POOL_CONNECTIONS
     
     # S3 Upload Settings
     MAX_UPLOAD_SIZE: int = 100 * 1024 * 1024  # 100MB
     ALLOWED_VIDEO_TYPES: List[str] = ["video/mp4", "video/quicktime", "video/x-msvideo"]
     MAX_VIDEO_DURATION: int = 300  # 5 minutes in seconds
     UPLOAD_URL_EXPIRE: int = 3600  # 1 hour in seconds
+    DOWNLOAD_URL_CACHE_SIZE: int = 10000  # presigned download URLs kept per process
+    DOWNLOAD_URL_EXPIRY_MARGIN: int = 600  # seconds of validity a reused download URL must have left
+    STORAGE_DELETE_INTERVAL: int = 30  # seconds between deletion outbox drains, and the first retry delay
+    STORAGE_DELETE_MAX_BACKOFF: int = 3600  # longest wait before retrying a failed deletion
+    UPLOAD_SNIFF_BYTES: int = 64 * 1024  # leading bytes fetched for type sniffing and box headers
+    FFPROBE_BINARY: str = "ffprobe"  # used for containers without MP4 boxes
+    INGEST_WORKERS: int = 2  # ingest processes per API process
+    INGEST_MAX_QUEUE: int = 50  # unprocessed uploads before refusing more
+    INGEST_AVERAGE_SECONDS: int = 20  # typical ingest time, used for Retry-After
+    INGEST_STALE_AFTER: int = 900  # seconds before an untouched unprocessed upload stops counting and is requeued
+    INGEST_SWEEP_INTERVAL: int = 300  # seconds between sweeps for stale uploads
+    STORAGE_WEBHOOK_SECRET: Optional[str] = None  # bearer token of object-created notifications, unset disables them
+    
+    # Render Settings
+    SEGMENT_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "lovestory-segments")
+    SEGMENT_CACHE_MAX_BYTES: int = 10 * 1024 * 1024 * 1024  # 10GB
+    RENDER_STREAM_INPUTS: bool = False  # decode segments from presigned URLs unless already cached locally
+    RENDER_STREAM_URL_EXPIRE: int = 3600  # 1 hour in seconds
+    STORY_PLAN_TTL: int = 900  # 15 minutes in seconds
+    RENDER_COST_MODEL_REFRESH: int = 300  # seconds between cost model refits
+    RENDER_COST_MODEL_SAMPLES: int = 200  # recent renders used to fit the cost model
+    RENDER_MAX_BACKLOG_SECONDS: int = 3600  # predicted in-flight render time before refusing work, 0 disables
+    STORY_EVENTS_KEEPALIVE: int = 15  # seconds between SSE keep-alive comments
+    STORY_EVENTS_RECONNECT_DELAY: int = 5  # seconds before re-opening the LISTEN connection
+    BATCH_RENDER_PROCESSES: int = os.cpu_count() or 2  # render processes shared by all batches, per API process
+    BATCH_DOWNLOAD_THREADS: int = 8
+
+    # Preview Settings
+    SPRITE_FRAMES: int = 50  # scrubber tiles per video
+    SPRITE_COLUMNS: int = 10
+    SPRITE_TILE_WIDTH: int = 160  # pixels
+    
+    # Pre-render Pool Settings
+    PRERENDER_POOL_ENABLED: bool = False
+    PRERENDER_POOL_TARGETS: Dict[int, int] = {}  # template_id -> ready stories per resolution
+    PRERENDER_POOL_RESOLUTIONS: List[str] = ["1080p"]
+    PRERENDER_POOL_TTL: int = 6 * 3600  # 6 hours in seconds
+    PRERENDER_POOL_REFILL_INTERVAL: int = 60  # seconds between refill passes
+    PRERENDER_POOL_METRICS_INTERVAL: int = 10  # seconds between writes of the pool hit/miss counters
     
     # CORS Settings
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
@@ -3,12 +3,18 @@ LoveStory Backend API
 
 A FastAPI application for creating and sharing love story videos.
 """
+import asyncio
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from api.v1.api import api_router
 from config.settings import settings
 from config.database import verify_database_connection
+from services.story_events import story_event_broker
+from services.ingest import shutdown_ingest_pool, run_ingest_sweeper
+from services.story_batch import shutdown_render_pool
+from services.storage import shutdown_storage_io
+from services.prerender_pool import run_pool_metrics_flusher, flush_pool_metrics
 
 app = FastAPI(
     title="LoveStory API",
@@ -186,8 +192,26 @@ async def health_check():
         "database": "connected"
     }
 
+_background_tasks = []
+
 @app.on_event("startup")
 async def startup_event():
-    """Verify database connection on startup"""
+    """Verify database connection on startup and start the stale upload sweeper and pool metrics flusher"""
     if not await verify_database_connection():
-        raise Exception("Database connection failed during startup") 
\ No newline at end of file
+        raise Exception("Database connection failed during startup")
+    _background_tasks.append(asyncio.create_task(run_ingest_sweeper()))
+    _background_tasks.append(asyncio.create_task(run_pool_metrics_flusher()))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Stop listening for story status events, stop ingest, render and storage
+    workers and write the pool counters still pending
+    """
+    for task in _background_tasks:
+        task.cancel()
+    story_event_broker.close()
+    shutdown_ingest_pool()
+    shutdown_render_pool()
+    shutdown_storage_io()
+    flush_pool_metrics()
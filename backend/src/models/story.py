@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, Boolean, Text, ARRAY, JSON
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Float, Boolean, Text, JSON, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import JSONB
-from .base import Base, TimestampMixin
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from .base import Base, BaseModel, TimestampMixin
 
 class StoryTemplate(Base, TimestampMixin):
     """Defines the structure of a story with its sequential steps."""
@@ -42,7 +43,10 @@ class VideoSegment(Base, TimestampMixin):
     step_id = Column(Integer, ForeignKey("story_steps.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     storage_path = Column(String, nullable=False)  # S3 path
+    etag = Column(String, nullable=True)  # ETag of the current upload; local cache copies are kept per ETag
     thumbnail_path = Column(String, nullable=True)
+    sprite_path = Column(String, nullable=True)  # Scrubber sprite sheet
+    sprite_vtt_path = Column(String, nullable=True)  # WebVTT index of the sprite sheet
     
     # Basic metadata
     duration = Column(Float, nullable=False)  # Duration in seconds
@@ -53,8 +57,26 @@ class VideoSegment(Base, TimestampMixin):
     
     # Advanced metadata
     scene_changes = Column(ARRAY(Float), nullable=True)
-    max_volume = Column(Float, nullable=True)
-    mean_volume = Column(Float, nullable=True)
+    max_volume = Column(Float, nullable=True)  # Sample peak in dBFS
+    mean_volume = Column(Float, nullable=True)  # Integrated loudness in LUFS
+    keyframe_times = Column(ARRAY(Float), nullable=True)  # Decode time of each keyframe
+    keyframe_offsets = Column(ARRAY(BigInteger), nullable=True)  # File offset of each keyframe
+
+    # Trim suggestion: the most active window no longer than the step's
+    # duration_max, scored at ingest; null when the whole clip fits
+    suggested_start_time = Column(Float, nullable=True)
+    suggested_end_time = Column(Float, nullable=True)
+
+    # Perceptual fingerprint; the video hash is also stored as four 16-bit
+    # chunks so near duplicates can be found with indexed equality lookups
+    video_hash = Column(BigInteger, nullable=True)
+    video_hash_sequence = Column(ARRAY(BigInteger), nullable=True)  # One hash per second, in order
+    audio_hash = Column(BigInteger, nullable=True)
+    video_hash_0 = Column(Integer, nullable=True, index=True)
+    video_hash_1 = Column(Integer, nullable=True, index=True)
+    video_hash_2 = Column(Integer, nullable=True, index=True)
+    video_hash_3 = Column(Integer, nullable=True, index=True)
+    duplicate_of_id = Column(Integer, ForeignKey("video_segments.id", ondelete="SET NULL"), nullable=True)
     moderation_labels = Column(JSONB, nullable=True)
     
     # Quality variants
@@ -70,6 +92,38 @@ class VideoSegment(Base, TimestampMixin):
     user = relationship("User", back_populates="video_segments")
     used_in_stories = relationship("GeneratedStorySegment", back_populates="video_segment")
 
+class IngestEvent(Base, TimestampMixin):
+    """An uploaded object version that has been queued for ingestion."""
+    
+    __tablename__ = "ingest_events"
+    __table_args__ = (UniqueConstraint("object_key", "etag", name="uq_ingest_events_object_key_etag"),)
+
+    id = Column(Integer, primary_key=True)
+    object_key = Column(String, nullable=False)
+    etag = Column(String, nullable=False)
+    source = Column(String, nullable=False)  # complete-upload or notification
+    video_segment_id = Column(Integer, ForeignKey("video_segments.id"), nullable=True)
+
+class StorageDeletion(Base, TimestampMixin):
+    """A storage object, or every object under a prefix, waiting to be deleted."""
+    
+    __tablename__ = "storage_deletions"
+
+    id = Column(Integer, primary_key=True)
+    object_key = Column(String, nullable=False)
+    is_prefix = Column(Boolean, nullable=False, default=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class PrerenderPoolMetric(Base, TimestampMixin):
+    """A pre-render pool counter, shared by every API process and pool worker."""
+    
+    __tablename__ = "prerender_pool_metrics"
+
+    name = Column(String(32), primary_key=True)  # hits, misses, rendered, expired, invalidated
+    count = Column(BigInteger, nullable=False, default=0)
+
 class User(BaseModel):
     """Represents a user of the application."""
     
@@ -89,6 +143,7 @@ class User(BaseModel):
     location = Column(String(100))
     
     video_segments = relationship("VideoSegment", back_populates="user")
+    generated_stories = relationship("GeneratedStory", back_populates="user")
 
 class GeneratedStory(Base, TimestampMixin):
     """Represents a complete story generated from random video segments."""
@@ -98,10 +153,13 @@ class GeneratedStory(Base, TimestampMixin):
     id = Column(Integer, primary_key=True)
     template_id = Column(Integer, ForeignKey("story_templates.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    batch_id = Column(Integer, ForeignKey("story_batches.id"), nullable=True, index=True)
     title = Column(String(200), nullable=False)
     description = Column(String, nullable=True)
     storage_path = Column(String, nullable=True)  # Path to concatenated video
     thumbnail_path = Column(String, nullable=True)
+    sprite_path = Column(String, nullable=True)  # Scrubber sprite sheet
+    sprite_vtt_path = Column(String, nullable=True)  # WebVTT index of the sprite sheet
     duration = Column(Float, nullable=True)
     
     # Video metadata
@@ -122,6 +180,7 @@ class GeneratedStory(Base, TimestampMixin):
 
     template = relationship("StoryTemplate", back_populates="generated_stories")
     user = relationship("User", back_populates="generated_stories")
+    batch = relationship("StoryBatch", back_populates="stories")
     segments = relationship("GeneratedStorySegment", back_populates="story", order_by="GeneratedStorySegment.order")
 
 class GeneratedStorySegment(Base, TimestampMixin):
@@ -150,4 +209,73 @@ class GeneratedStorySegment(Base, TimestampMixin):
 
     story = relationship("GeneratedStory", back_populates="segments")
     step = relationship("StoryStep", back_populates="generated_segments")
-    video_segment = relationship("VideoSegment", back_populates="used_in_stories") 
\ No newline at end of file
+    video_segment = relationship("VideoSegment", back_populates="used_in_stories") 
+
+class PrerenderedStory(Base, TimestampMixin):
+    """A story rendered ahead of demand, waiting in the pre-render pool to be claimed."""
+    
+    __tablename__ = "prerendered_stories"
+
+    id = Column(Integer, primary_key=True)
+    template_id = Column(Integer, ForeignKey("story_templates.id"), nullable=False, index=True)
+    resolution = Column(String(10), nullable=False)  # 720p, 1080p
+    transition_type = Column(String, nullable=True)
+    transition_duration = Column(Float, nullable=True)
+    storage_path = Column(String, nullable=False)
+    thumbnail_path = Column(String, nullable=True)
+    sprite_path = Column(String, nullable=True)
+    sprite_vtt_path = Column(String, nullable=True)
+    
+    # Video metadata
+    duration = Column(Float, nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    fps = Column(Float, nullable=True)
+    
+    # Segments used, in step order, and their owners (for exclusion on claim)
+    segment_ids = Column(ARRAY(Integer), nullable=False)
+    segment_user_ids = Column(ARRAY(Integer), nullable=False)
+    
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    template = relationship("StoryTemplate")
+
+
+class StoryPlan(Base, TimestampMixin):
+    """Segments selected ahead of generation, redeemed with a plan token."""
+    
+    __tablename__ = "story_plans"
+
+    id = Column(Integer, primary_key=True)
+    token = Column(String(64), unique=True, nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    template_id = Column(Integer, ForeignKey("story_templates.id"), nullable=False)
+    segment_ids = Column(ARRAY(Integer), nullable=False)  # Pinned segments, in step order
+    expires_at = Column(DateTime, nullable=False)
+
+    template = relationship("StoryTemplate")
+
+
+class StoryBatch(Base, TimestampMixin):
+    """A batch of stories generated together from one template."""
+    
+    __tablename__ = "story_batches"
+
+    id = Column(Integer, primary_key=True)
+    template_id = Column(Integer, ForeignKey("story_templates.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # Render settings shared by every story in the batch
+    resolution = Column(String(10), nullable=False)
+    transition_type = Column(String, nullable=True)
+    transition_duration = Column(Float, nullable=True)
+    
+    # Progress
+    status = Column(String, nullable=False, default='pending')  # pending, processing, completed, failed
+    total_count = Column(Integer, nullable=False)
+    completed_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    error_message = Column(String, nullable=True)
+
+    template = relationship("StoryTemplate")
+    stories = relationship("GeneratedStory", back_populates="batch")
@@ -10,6 +10,41 @@ class StoryGenerationRequest(BaseModel):
     preferred_resolution: Optional[str] = "1080p"  # 720p, 1080p
     transition_type: Optional[str] = "fade"  # fade, dissolve, cut
     transition_duration: Optional[float] = 1.0  # seconds
+    plan_token: Optional[str] = None  # From /stories/prepare
+
+class StoryPrepareRequest(BaseModel):
+    """Schema for preparing a story ahead of generation"""
+    template_id: int
+
+class StoryPrepareResponse(BaseModel):
+    """Schema for a prepared story plan"""
+    plan_token: str
+    template_id: int
+    expires_at: datetime
+
+class StoryBatchRequest(BaseModel):
+    """Schema for requesting a batch of stories from one template"""
+    template_id: int
+    count: int = Field(..., ge=1, le=500)
+    title: constr(min_length=1, max_length=200)
+    description: Optional[str] = None
+    preferred_resolution: Optional[str] = "1080p"  # 720p, 1080p
+    transition_type: Optional[str] = "fade"  # fade, dissolve, cut
+    transition_duration: Optional[float] = 1.0  # seconds
+
+class StoryBatchStatus(BaseModel):
+    """Schema for batch generation progress"""
+    id: int
+    template_id: int
+    status: str
+    total_count: int
+    completed_count: int
+    failed_count: int
+    progress: float  # 0 to 1
+    error_message: Optional[str] = None
+    story_ids: List[int]
+    created_at: datetime
+    updated_at: datetime
 
 class StorySegmentInfo(BaseModel):
     """Schema for story segment information"""
@@ -40,6 +75,12 @@ class GeneratedStoryResponse(BaseModel):
     description: Optional[str] = None
     storage_path: Optional[str] = None
     thumbnail_path: Optional[str] = None
+    sprite_path: Optional[str] = None
+    sprite_vtt_path: Optional[str] = None
+    playback_url: Optional[str] = None  # Presigned, only with include_urls
+    thumbnail_url: Optional[str] = None  # Presigned, only with include_urls
+    sprite_url: Optional[str] = None  # Presigned, only with include_urls
+    sprite_vtt_url: Optional[str] = None  # API path serving the WebVTT index with a presigned sprite URL
     status: str
     error_message: Optional[str] = None
     view_count: int = 0
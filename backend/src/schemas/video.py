@@ -1,10 +1,12 @@
-from typing import Optional
-from pydantic import BaseModel, Field, HttpUrl
+from typing import Literal, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 
 class PresignedUrlRequest(BaseModel):
     """Request schema for getting a presigned URL"""
     filename: str = Field(..., min_length=1, max_length=255)
-    content_type: str = Field(..., regex='^video/')  # Ensure it's a video mime type
+    step_id: Optional[int] = None  # Story step the video is recorded for; named in the object key when given
+    content_type: str = Field(..., pattern='^video/')  # Ensure it's a video mime type
 
 class PresignedUrlResponse(BaseModel):
     """Response schema for presigned URL generation"""
@@ -25,5 +27,42 @@ class VideoMetadata(BaseModel):
 class VideoUploadComplete(BaseModel):
     """Schema for video upload completion notification"""
     object_key: str
+    step_id: Optional[int] = None  # Required when the object key does not name a step
     success: bool
-    error_message: Optional[str] = None 
\ No newline at end of file
+    error_message: Optional[str] = None
+
+class VideoSegmentUpdate(BaseModel):
+    """Schema for approving or rejecting a video segment"""
+    status: Literal["approved", "rejected"]
+    rejection_reason: Optional[str] = None
+
+    @model_validator(mode="after")
+    def require_rejection_reason(self) -> "VideoSegmentUpdate":
+        """A rejection must say why"""
+        if self.status == "rejected" and not self.rejection_reason:
+            raise ValueError("rejection_reason is required when rejecting a segment")
+        return self
+
+class VideoSegment(BaseModel):
+    """Schema for video segment response"""
+    id: int
+    step_id: int
+    user_id: int
+    storage_path: str
+    thumbnail_path: Optional[str] = None
+    sprite_path: Optional[str] = None  # Scrubber sprite sheet
+    sprite_vtt_path: Optional[str] = None  # WebVTT index, served signed at /videos/segments/{id}/sprite.vtt
+    duration: float
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    content_type: Optional[str] = None
+    is_approved: bool
+    processing_status: str  # pending, processing, completed, failed
+    processing_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        """Pydantic config"""
+        from_attributes = True
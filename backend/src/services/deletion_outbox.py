@@ -0,0 +1,147 @@
+"""
+Storage deletion outbox.
+
+Deleting a story, pre-rendered story or video segment records its storage
+objects in the storage_deletions table in the same transaction that removes
+the row, so nothing is deleted from storage unless the database change
+commits, and the request does no storage I/O. A drainer deletes the
+recorded objects with DeleteObjects, up to 1000 keys per call, and backs
+off on entries that fail.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+from botocore.exceptions import ClientError
+from sqlalchemy.orm import Session
+
+from models.story import StorageDeletion
+from services.storage import discard_download_urls, get_s3_client
+from config.database import SessionLocal
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DELETE_OBJECTS_LIMIT = 1000  # most keys S3 accepts per DeleteObjects call
+
+def artifact_paths(record: Any) -> Tuple[List[str], List[str]]:
+    """
+    Storage keys and key prefixes of everything stored for a story,
+    pre-rendered story or video segment: the video, its previews and its
+    quality variants. Variants stored as chunks (HLS) give their prefix.
+    """
+    keys = [
+        path for path in (record.storage_path, record.thumbnail_path, record.sprite_path, record.sprite_vtt_path)
+        if path
+    ]
+    prefixes = []
+    for variant in (getattr(record, "quality_variants", None) or {}).values():
+        if not isinstance(variant, dict):
+            continue
+        path = variant.get("storage_path") or variant.get("path")
+        if path:
+            keys.append(path)
+        if variant.get("prefix"):
+            prefixes.append(variant["prefix"])
+    return keys, prefixes
+
+def enqueue_deletions(db: Session, keys: Iterable[str], prefixes: Iterable[str] = ()) -> None:
+    """Record objects to delete; they are only deleted once the session commits"""
+    keys = list(keys)
+    db.add_all([StorageDeletion(object_key=key, is_prefix=False) for key in keys])
+    db.add_all([StorageDeletion(object_key=prefix, is_prefix=True) for prefix in prefixes])
+    discard_download_urls(keys)
+
+def enqueue_artifact_deletion(db: Session, record: Any) -> None:
+    """Record every stored artifact of a story, pre-rendered story or video segment for deletion"""
+    keys, prefixes = artifact_paths(record)
+    enqueue_deletions(db, keys, prefixes)
+
+def _expand(s3_client, deletion: StorageDeletion) -> List[str]:
+    if not deletion.is_prefix:
+        return [deletion.object_key]
+    keys = []
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=settings.AWS_BUCKET_NAME, Prefix=deletion.object_key):
+        keys.extend(item['Key'] for item in page.get('Contents', []))
+    return keys
+
+def _drain_batch(db: Session, s3_client) -> int:
+    """Delete the objects of up to one batch of due entries. Returns the entries claimed."""
+    now = datetime.utcnow()
+    deletions = db.query(StorageDeletion).filter(
+        StorageDeletion.next_attempt_at <= now
+    ).order_by(StorageDeletion.id).limit(DELETE_OBJECTS_LIMIT).with_for_update(skip_locked=True).all()
+    if not deletions:
+        return 0
+
+    entry_keys: Dict[int, List[str]] = {}
+    errors: Dict[str, str] = {}
+    for deletion in deletions:
+        try:
+            entry_keys[deletion.id] = _expand(s3_client, deletion)
+        except ClientError as e:
+            entry_keys[deletion.id] = [deletion.object_key]
+            errors[deletion.object_key] = str(e)
+
+    keys = list(dict.fromkeys(
+        key for object_keys in entry_keys.values() for key in object_keys if key not in errors
+    ))
+    for start in range(0, len(keys), DELETE_OBJECTS_LIMIT):
+        chunk = keys[start:start + DELETE_OBJECTS_LIMIT]
+        try:
+            response = s3_client.delete_objects(
+                Bucket=settings.AWS_BUCKET_NAME,
+                Delete={'Objects': [{'Key': key} for key in chunk], 'Quiet': True}
+            )
+            for error in response.get('Errors', []):
+                errors[error['Key']] = f"{error.get('Code')}: {error.get('Message')}"
+        except ClientError as e:
+            errors.update((key, str(e)) for key in chunk)
+
+    for deletion in deletions:
+        failures = [errors[key] for key in entry_keys[deletion.id] if key in errors]
+        if not failures:
+            db.delete(deletion)
+            continue
+        deletion.attempts += 1
+        deletion.last_error = failures[0][:500]
+        backoff = min(settings.STORAGE_DELETE_INTERVAL * 2 ** deletion.attempts, settings.STORAGE_DELETE_MAX_BACKOFF)
+        deletion.next_attempt_at = now + timedelta(seconds=backoff)
+    db.commit()
+
+    if errors:
+        logger.warning(f"Failed to delete {len(errors)} storage objects, will retry")
+    return len(deletions)
+
+def drain_deletions() -> int:
+    """Work through every due outbox entry, batch by batch. Returns the entries processed."""
+    db = SessionLocal()
+    s3_client = get_s3_client()
+    processed = 0
+    try:
+        while True:
+            claimed = _drain_batch(db, s3_client)
+            processed += claimed
+            if claimed < DELETE_OBJECTS_LIMIT:
+                return processed
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def run_deletion_drainer() -> None:
+    """Drain the deletion outbox until cancelled"""
+    while True:
+        try:
+            processed = await asyncio.to_thread(drain_deletions)
+            if processed:
+                logger.info(f"Processed {processed} storage deletions")
+        except Exception as e:
+            logger.error(f"Error draining storage deletions: {str(e)}")
+        await asyncio.sleep(settings.STORAGE_DELETE_INTERVAL)
+
+if __name__ == "__main__":
+    # Run as a dedicated worker: python -m services.deletion_outbox
+    asyncio.run(run_deletion_drainer())
@@ -0,0 +1,163 @@
+"""
+Upload ingestion workers.
+
+complete-upload or an object-created notification only records a pending
+video segment; a bounded pool of worker processes validates, downloads and
+analyses it. Each API process owns one pool, and admission control counts
+unprocessed segments across all of them so bursts are refused early instead
+of piling up behind the workers.
+
+Upload keys follow videos/{user_id}/{step_id}/{name}, so a notification
+carries everything needed to record the segment without the client.
+"""
+import math
+import uuid
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.story import VideoSegment
+from config.database import SessionLocal
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+UPLOAD_KEY_PREFIX = "videos"
+UPLOAD_EXTENSIONS = {
+    "video/mp4": "mp4",
+    "video/quicktime": "mov",
+    "video/x-msvideo": "avi"
+}
+
+def upload_object_key(user_id: int, step_id: Optional[int], content_type: str) -> str:
+    """
+    Object key for a new upload by a user, naming the story step when it is
+    known. Without one the key keeps the older videos/{user_id}/{name} layout.
+    """
+    extension = UPLOAD_EXTENSIONS.get(content_type, "mp4")
+    if step_id is None:
+        return f"{UPLOAD_KEY_PREFIX}/{user_id}/{uuid.uuid4().hex}.{extension}"
+    return f"{UPLOAD_KEY_PREFIX}/{user_id}/{step_id}/{uuid.uuid4().hex}.{extension}"
+
+def parse_upload_object_key(object_key: str) -> Optional[Tuple[int, Optional[int]]]:
+    """
+    (user_id, step_id) of an upload key, with step_id None for keys in the
+    older layout, or None for keys that are not uploads, such as preview
+    files stored next to them
+    """
+    parts = object_key.split("/")
+    if len(parts) not in (3, 4) or parts[0] != UPLOAD_KEY_PREFIX:
+        return None
+    if not all(part.isdigit() for part in parts[1:-1]):
+        return None
+    if parts[-1].rsplit(".", 1)[-1].lower() not in UPLOAD_EXTENSIONS.values():
+        return None
+    step_id = int(parts[2]) if len(parts) == 4 else None
+    return int(parts[1]), step_id
+
+def _ingest_segment(segment_id: int) -> str:
+    """Worker process entry point: ingest one segment with its own session"""
+    # Imported here so the pool module stays importable from the video service
+    from services.video import VideoService
+
+    db = SessionLocal()
+    try:
+        segment = asyncio.run(VideoService(db).process_video(segment_id))
+        return segment.processing_status if segment else 'failed'
+    finally:
+        db.close()
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max(settings.INGEST_WORKERS, 1),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+def _log_failure(future: Future) -> None:
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Ingest worker failed: {str(error)}")
+
+def submit_ingest(segment_id: int) -> None:
+    """Queue a pending segment for ingestion"""
+    future = _get_executor().submit(_ingest_segment, segment_id)
+    future.add_done_callback(_log_failure)
+
+def check_ingest_capacity(db: Session) -> None:
+    """
+    Refuse new uploads while too many segments are waiting to be ingested.
+    Segments untouched for INGEST_STALE_AFTER were abandoned by a worker
+    that went away and no longer count against the queue.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.INGEST_STALE_AFTER)
+    depth = db.query(func.count(VideoSegment.id)).filter(
+        VideoSegment.processing_status.in_(['pending', 'processing']),
+        VideoSegment.updated_at > stale_before
+    ).scalar()
+
+    if depth >= settings.INGEST_MAX_QUEUE:
+        excess = depth - settings.INGEST_MAX_QUEUE + 1
+        retry_after = math.ceil(excess * settings.INGEST_AVERAGE_SECONDS / max(settings.INGEST_WORKERS, 1))
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many uploads are being processed, please try again later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+def requeue_stale_segments(db: Session) -> int:
+    """
+    Resubmit segments left pending or processing for longer than
+    INGEST_STALE_AFTER, whose work was lost to a shutdown or crash. Each is
+    touched in the same transaction, so other API processes sweeping at the
+    same time skip it. Returns the number resubmitted.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.INGEST_STALE_AFTER)
+    segments = db.query(VideoSegment).filter(
+        VideoSegment.processing_status.in_(['pending', 'processing']),
+        VideoSegment.updated_at <= stale_before
+    ).order_by(VideoSegment.id).limit(settings.INGEST_MAX_QUEUE).with_for_update(skip_locked=True).all()
+
+    for segment in segments:
+        segment.processing_status = 'pending'
+        segment.updated_at = datetime.utcnow()
+    segment_ids = [segment.id for segment in segments]
+    db.commit()
+
+    for segment_id in segment_ids:
+        submit_ingest(segment_id)
+    return len(segment_ids)
+
+async def run_ingest_sweeper() -> None:
+    """Resubmit stale segments every INGEST_SWEEP_INTERVAL until cancelled"""
+    while True:
+        await asyncio.sleep(settings.INGEST_SWEEP_INTERVAL)
+        db = SessionLocal()
+        try:
+            requeued = await asyncio.to_thread(requeue_stale_segments, db)
+            if requeued:
+                logger.warning(f"Requeued {requeued} stale uploads for ingestion")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error requeueing stale uploads: {str(e)}")
+        finally:
+            db.close()
+
+def shutdown_ingest_pool() -> None:
+    """Stop the workers; queued segments stay pending"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
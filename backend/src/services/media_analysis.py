@@ -0,0 +1,415 @@
+"""
+Media analysis helpers.
+
+Vectorized NumPy measurements over decoded media, used at ingest so
+renders can rely on stored values instead of analysing clips again.
+"""
+import math
+from typing import Optional, Tuple, List, Dict, Any, Iterable
+import cv2
+import numpy as np
+from moviepy.editor import VideoFileClip
+
+# Decoded stream used for analysis: frames are scaled down by ffmpeg
+# and sampled at a reduced rate, audio is resampled
+ANALYSIS_HEIGHT = 144
+ANALYSIS_FPS = 10
+ANALYSIS_SAMPLE_RATE = 22050
+
+# Scene change detection
+HISTOGRAM_BINS = [16, 8]  # hue, saturation
+SCENE_THRESHOLD = 0.4  # histogram distance, 0 identical to 1 disjoint
+MIN_SCENE_GAP = 0.5  # seconds between reported scene changes
+
+# Fingerprinting: each sampled frame is reduced to a small grayscale image,
+# from which a 64-bit difference hash (9x8 pixels) is taken. The clip's
+# majority hash finds candidates; a hash per second keeps its timing.
+GRAY_SIZE = (32, 18)  # width, height
+HASH_CHUNKS = 4  # 16-bit chunks indexed for multi-index lookup
+HASH_SEQUENCE_INTERVAL = 1.0  # seconds of frames per hash in the sequence
+HASH_SEQUENCE_MAX_SHIFT = 1  # sequence positions two copies may be offset by
+AUDIO_HASH_BITS = 64
+
+# Defect detection over the sampled grayscale frames and the audio
+BLACK_LUMA = 24  # frame is black when 98% of its pixels are darker than this
+FROZEN_DIFFERENCE = 1.0  # mean absolute gray level change between frozen frames
+SILENCE_WINDOW = 0.1  # seconds of audio per energy measurement
+SILENCE_THRESHOLD_DB = -50.0  # dBFS below which a window is silent
+MIN_DEFECT_SECONDS = {"black": 1.0, "frozen": 2.0, "silent": 2.0}
+DEFECT_FLAG_RATIO = 0.5  # share of the clip that must be defective to flag it
+
+# Trim suggestions: per-frame activity mixes motion and audio energy
+MOTION_WEIGHT = 0.6
+AUDIO_WEIGHT = 0.4
+
+# Story loudness normalization
+TARGET_LOUDNESS = -16.0  # LUFS, common target for mobile playback
+MAX_PEAK = -1.0  # dBFS ceiling after gain
+MAX_GAIN_DB = 12.0  # never boost quiet clips more than this
+
+# Silence floor reported for clips with no measurable signal
+SILENCE_DB = -70.0
+
+AUDIO_DECODE_CHUNK = 50000  # audio frames decoded per read
+
+def _k_weighting_response(frequencies: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    Magnitude response of the ITU-R BS.1770 K-weighting filter
+    (high shelf followed by high pass) at the given frequencies.
+    """
+    z = np.exp(-1j * 2 * np.pi * frequencies / sample_rate)
+
+    def biquad(b, a):
+        return (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+
+    # Stage 1: high shelf, +4 dB above ~1.7 kHz
+    gain_db, q, center = 3.99984385397, 0.7071752369554193, 1681.9744509555319
+    amplitude = 10 ** (gain_db / 40)
+    w0 = 2 * np.pi * center / sample_rate
+    alpha = np.sin(w0) / (2 * q)
+    cos_w0 = np.cos(w0)
+    sqrt_a = np.sqrt(amplitude)
+    shelf = biquad(
+        (
+            amplitude * ((amplitude + 1) + (amplitude - 1) * cos_w0 + 2 * sqrt_a * alpha),
+            -2 * amplitude * ((amplitude - 1) + (amplitude + 1) * cos_w0),
+            amplitude * ((amplitude + 1) + (amplitude - 1) * cos_w0 - 2 * sqrt_a * alpha)
+        ),
+        (
+            (amplitude + 1) - (amplitude - 1) * cos_w0 + 2 * sqrt_a * alpha,
+            2 * ((amplitude - 1) - (amplitude + 1) * cos_w0),
+            (amplitude + 1) - (amplitude - 1) * cos_w0 - 2 * sqrt_a * alpha
+        )
+    )
+
+    # Stage 2: high pass at ~38 Hz
+    q, center = 0.5003270373253953, 38.13547087613982
+    w0 = 2 * np.pi * center / sample_rate
+    alpha = np.sin(w0) / (2 * q)
+    cos_w0 = np.cos(w0)
+    high_pass = biquad(
+        ((1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2),
+        (1 + alpha, -2 * cos_w0, 1 - alpha)
+    )
+
+    return np.abs(shelf * high_pass)
+
+def decode_audio(clip, sample_rate: int) -> Optional[np.ndarray]:
+    """
+    PCM samples of a clip's audio track shaped (frames, channels) in the
+    range -1..1, or None when the clip has no audio stream. Decoded chunk
+    by chunk: MoviePy 1.0.3's to_soundarray hands np.vstack a generator for
+    tracks longer than one chunk, which numpy rejects. Decode errors are
+    raised, never reported as missing audio.
+    """
+    if clip.audio is None:
+        return None
+    chunks = list(clip.audio.iter_chunks(fps=sample_rate, chunksize=AUDIO_DECODE_CHUNK))
+    if not chunks:
+        return np.zeros((0, clip.audio.nchannels))
+    return np.vstack(chunks)
+
+def measure_loudness(samples: np.ndarray, sample_rate: int) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Measure integrated loudness (LUFS, BS.1770 gated) and sample peak (dBFS)
+    of PCM samples shaped (frames, channels) in the range -1..1.
+    The K-weighting is applied in the frequency domain so the whole
+    measurement stays vectorized. Returns (None, None) for empty input.
+    """
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    if samples.shape[0] == 0:
+        return None, None
+    samples = samples.astype(np.float64, copy=False)
+
+    peak = float(np.max(np.abs(samples)))
+    peak_db = 20 * math.log10(peak) if peak > 0 else SILENCE_DB
+
+    # K-weight every channel at once
+    spectrum = np.fft.rfft(samples, axis=0)
+    frequencies = np.fft.rfftfreq(samples.shape[0], d=1.0 / sample_rate)
+    weighted = np.fft.irfft(spectrum * _k_weighting_response(frequencies, sample_rate)[:, None], n=samples.shape[0], axis=0)
+
+    # Mean square per 400 ms block with 75% overlap, from cumulative sums
+    block = int(0.4 * sample_rate)
+    hop = block // 4
+    energy = np.concatenate([np.zeros((1, weighted.shape[1])), np.cumsum(weighted ** 2, axis=0)])
+    if weighted.shape[0] < block:
+        block_power = (energy[-1] / weighted.shape[0])[None, :]
+    else:
+        starts = np.arange(0, weighted.shape[0] - block + 1, hop)
+        block_power = (energy[starts + block] - energy[starts]) / block
+
+    # Channels are summed with unit weights (front left/right)
+    power = block_power.sum(axis=1)
+    with np.errstate(divide="ignore"):
+        block_loudness = -0.691 + 10 * np.log10(power)
+
+    # Absolute gate at -70 LUFS, then relative gate 10 LU below the gated mean
+    gated = power[block_loudness > -70.0]
+    if gated.size == 0:
+        return SILENCE_DB, peak_db
+    relative_threshold = -0.691 + 10 * math.log10(gated.mean()) - 10.0
+    gated = power[block_loudness > relative_threshold]
+    if gated.size == 0:
+        return SILENCE_DB, peak_db
+
+    return float(-0.691 + 10 * math.log10(gated.mean())), peak_db
+
+def loudness_gain(integrated: Optional[float], peak: Optional[float]) -> float:
+    """
+    Linear gain that brings a clip to the target loudness without pushing
+    its peak over the ceiling. Clips never measured keep unity gain.
+    """
+    if integrated is None or integrated <= SILENCE_DB:
+        return 1.0
+
+    gain_db = min(TARGET_LOUDNESS - integrated, MAX_GAIN_DB)
+    if peak is not None:
+        gain_db = min(gain_db, MAX_PEAK - peak)
+    return 10 ** (gain_db / 20)
+
+def frame_features(frames: Iterable[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-frame features of RGB frames in one pass: normalized hue/saturation
+    histograms shaped (frames, bins) and small grayscale images shaped
+    (frames, height, width).
+    """
+    histograms, grays = [], []
+    for frame in frames:
+        histograms.append(cv2.calcHist(
+            [cv2.cvtColor(frame, cv2.COLOR_RGB2HSV)], [0, 1], None,
+            HISTOGRAM_BINS, [0, 180, 0, 256]
+        ).ravel())
+        grays.append(cv2.resize(cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY), GRAY_SIZE, interpolation=cv2.INTER_AREA))
+
+    if not histograms:
+        return (
+            np.zeros((0, int(np.prod(HISTOGRAM_BINS))), dtype=np.float32),
+            np.zeros((0, GRAY_SIZE[1], GRAY_SIZE[0]), dtype=np.uint8)
+        )
+    histograms = np.stack(histograms)
+    histograms = histograms / np.maximum(histograms.sum(axis=1, keepdims=True), 1.0)
+    return histograms, np.stack(grays)
+
+def _pack_bits(bits: np.ndarray) -> int:
+    """64 booleans to a signed 64-bit integer, as Postgres BIGINT stores it"""
+    value = int.from_bytes(np.packbits(bits.astype(np.uint8)).tobytes(), "big")
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def _difference_hash_bits(grays: np.ndarray) -> np.ndarray:
+    """Difference hash bits of each frame, shaped (frames, 64)"""
+    small = np.stack([cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA) for gray in grays]).astype(np.int16)
+    return (small[:, :, 1:] > small[:, :, :-1]).reshape(len(grays), 64)
+
+def video_fingerprint(grays: np.ndarray) -> Optional[int]:
+    """
+    Majority vote of the difference hashes of every sampled frame: bit i is
+    set when pixel i is brighter than its right neighbour in most frames.
+    """
+    if len(grays) == 0:
+        return None
+    return _pack_bits(_difference_hash_bits(grays).mean(axis=0) > 0.5)
+
+def video_hash_sequence(grays: np.ndarray, fps: float) -> List[int]:
+    """Majority difference hash of each HASH_SEQUENCE_INTERVAL of sampled frames, in order"""
+    if len(grays) == 0:
+        return []
+    bits = _difference_hash_bits(grays)
+    step = max(int(round(fps * HASH_SEQUENCE_INTERVAL)), 1)
+    return [_pack_bits(bits[start:start + step].mean(axis=0) > 0.5) for start in range(0, len(bits), step)]
+
+def sequence_agreement(first: List[int], second: List[int], max_distance: int) -> float:
+    """
+    Share of aligned positions whose hashes are within max_distance bits,
+    at the best offset of up to HASH_SEQUENCE_MAX_SHIFT positions
+    """
+    best = 0.0
+    for shift in range(-HASH_SEQUENCE_MAX_SHIFT, HASH_SEQUENCE_MAX_SHIFT + 1):
+        pairs = list(zip(first[max(shift, 0):], second[max(-shift, 0):]))
+        if not pairs:
+            continue
+        matches = sum(hamming_distance(a, b) <= max_distance for a, b in pairs)
+        best = max(best, matches / max(len(first), len(second)))
+    return best
+
+def audio_fingerprint(samples: np.ndarray) -> Optional[int]:
+    """
+    Hash of the audio energy envelope: bit i is set when window i + 1 is
+    louder than window i. Independent of gain, so normalized copies match.
+    """
+    mono = samples.mean(axis=1) if samples.ndim == 2 else samples
+    windows = AUDIO_HASH_BITS + 1
+    if len(mono) < windows:
+        return None
+    usable = len(mono) - len(mono) % windows
+    energy = np.square(mono[:usable]).reshape(windows, -1).mean(axis=1)
+    if not energy.any():
+        return None
+    return _pack_bits(energy[1:] > energy[:-1])
+
+def hash_chunks(value: int) -> List[int]:
+    """Split a 64-bit hash into 16-bit chunks for multi-index lookup"""
+    unsigned = value & ((1 << 64) - 1)
+    return [(unsigned >> (16 * (HASH_CHUNKS - 1 - index))) & 0xFFFF for index in range(HASH_CHUNKS)]
+
+def hamming_distance(first: int, second: int) -> int:
+    """Number of differing bits between two 64-bit hashes"""
+    return bin((first ^ second) & ((1 << 64) - 1)).count("1")
+
+def detect_scene_changes(histograms: np.ndarray, fps: float) -> List[float]:
+    """Times where consecutive frame histograms differ by more than the threshold"""
+    if len(histograms) < 2:
+        return []
+    distances = 0.5 * np.abs(np.diff(histograms, axis=0)).sum(axis=1)
+    candidates = (np.flatnonzero(distances > SCENE_THRESHOLD) + 1) / fps
+
+    scene_changes: List[float] = []
+    for time in candidates:
+        if not scene_changes or time - scene_changes[-1] >= MIN_SCENE_GAP:
+            scene_changes.append(round(float(time), 3))
+    return scene_changes
+
+def _defect_intervals(mask: np.ndarray, step: float, min_seconds: float) -> List[List[float]]:
+    """[start, end] seconds of each run of True in a per-step mask lasting at least min_seconds"""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    keep = (ends - starts) * step >= min_seconds
+    return [
+        [round(float(start * step), 2), round(float(end * step), 2)]
+        for start, end in zip(starts[keep], ends[keep])
+    ]
+
+def detect_defects(
+    grays: np.ndarray,
+    fps: float,
+    samples: Optional[np.ndarray],
+    sample_rate: int,
+    duration: float
+) -> Dict[str, Any]:
+    """
+    Find black, frozen and silent stretches. Returns moderation labels with
+    the intervals and covered share of each defect, plus the defects
+    covering at least DEFECT_FLAG_RATIO of the clip under "flags". A clip
+    without an audio stream is silent for its whole duration.
+    """
+    masks: Dict[str, Tuple[np.ndarray, float]] = {}
+    if len(grays):
+        flat = grays.reshape(len(grays), -1)
+        black = np.percentile(flat, 98, axis=1) < BLACK_LUMA
+        masks["black"] = (black, 1.0 / fps)
+        # A frame is frozen when it matches the previous one; black already covers black frames
+        differences = np.abs(np.diff(flat.astype(np.int16), axis=0)).mean(axis=1)
+        frozen = np.concatenate([[False], differences < FROZEN_DIFFERENCE]) & ~black
+        masks["frozen"] = (frozen, 1.0 / fps)
+
+    if samples is not None:
+        mono = samples.mean(axis=1) if samples.ndim == 2 else samples
+        window = max(int(SILENCE_WINDOW * sample_rate), 1)
+        usable = len(mono) - len(mono) % window
+        if usable:
+            rms = np.sqrt(np.square(mono[:usable]).reshape(-1, window).mean(axis=1))
+            with np.errstate(divide="ignore"):
+                masks["silent"] = (20 * np.log10(rms) < SILENCE_THRESHOLD_DB, window / sample_rate)
+
+    labels: Dict[str, Any] = {"flags": []}
+    for defect, (mask, step) in masks.items():
+        intervals = _defect_intervals(mask, step, MIN_DEFECT_SECONDS[defect])
+        covered = sum(end - start for start, end in intervals)
+        ratio = round(float(covered / (len(mask) * step)), 3) if len(mask) else 0.0
+        labels[defect] = {"ratio": ratio, "intervals": intervals}
+        if ratio >= DEFECT_FLAG_RATIO:
+            labels["flags"].append(defect)
+
+    if samples is None:
+        labels["silent"] = {"ratio": 1.0, "intervals": [[0.0, round(float(duration), 2)]]}
+        labels["flags"].append("silent")
+    return labels
+
+def activity_scores(
+    grays: np.ndarray,
+    fps: float,
+    samples: Optional[np.ndarray],
+    sample_rate: int
+) -> np.ndarray:
+    """
+    Activity of each sampled frame: motion energy from the difference to
+    the previous frame plus audio energy over the frame's interval, each
+    scaled to the clip's maximum.
+    """
+    scores = np.zeros(len(grays))
+    if len(grays) > 1:
+        flat = grays.reshape(len(grays), -1).astype(np.int16)
+        motion = np.concatenate([[0.0], np.abs(np.diff(flat, axis=0)).mean(axis=1)])
+        if motion.max() > 0:
+            scores += MOTION_WEIGHT * motion / motion.max()
+
+    if samples is not None and len(grays):
+        mono = samples.mean(axis=1) if samples.ndim == 2 else samples
+        window = max(int(sample_rate / fps), 1)
+        usable = min(len(mono) // window, len(grays)) * window
+        if usable:
+            rms = np.sqrt(np.square(mono[:usable]).reshape(-1, window).mean(axis=1))
+            if rms.max() > 0:
+                scores[:len(rms)] += AUDIO_WEIGHT * rms / rms.max()
+    return scores
+
+def best_window(
+    scores: np.ndarray,
+    fps: float,
+    duration: float,
+    duration_max: Optional[float]
+) -> Optional[Tuple[float, float]]:
+    """
+    Start and end of the most active duration_max seconds of a clip, or
+    None when the whole clip fits. Ties go to the earliest window.
+    """
+    if not duration_max or duration <= duration_max or not len(scores):
+        return None
+
+    length = max(int(round(duration_max * fps)), 1)
+    if len(scores) <= length:
+        return None
+    totals = np.cumsum(np.concatenate([[0.0], scores]))
+    window_scores = totals[length:] - totals[:-length]
+    start = min(int(np.argmax(window_scores)) / fps, duration - duration_max)
+    return round(start, 3), round(start + duration_max, 3)
+
+def analyze_video(file_path: str, duration_max: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Ingest analysis of a video in one decode of each stream: scene changes
+    and a video fingerprint from a downsampled frame stream, loudness, peak
+    and an audio fingerprint from the audio, black, frozen and silent
+    stretches from both, and the most active window of at most
+    duration_max seconds as a trim suggestion.
+    """
+    with VideoFileClip(
+        file_path,
+        target_resolution=(ANALYSIS_HEIGHT, None),
+        audio_fps=ANALYSIS_SAMPLE_RATE
+    ) as video:
+        histograms, grays = frame_features(video.iter_frames(fps=ANALYSIS_FPS, dtype="uint8"))
+        samples = decode_audio(video, ANALYSIS_SAMPLE_RATE)
+        duration = video.duration
+
+    mean_volume = max_volume = audio_hash = None
+    if samples is not None:
+        mean_volume, max_volume = measure_loudness(samples, ANALYSIS_SAMPLE_RATE)
+        audio_hash = audio_fingerprint(samples)
+
+    return {
+        "scene_changes": detect_scene_changes(histograms, ANALYSIS_FPS),
+        "mean_volume": mean_volume,
+        "max_volume": max_volume,
+        "video_hash": video_fingerprint(grays),
+        "video_hash_sequence": video_hash_sequence(grays, ANALYSIS_FPS),
+        "audio_hash": audio_hash,
+        "moderation_labels": detect_defects(grays, ANALYSIS_FPS, samples, ANALYSIS_SAMPLE_RATE, duration),
+        "trim": best_window(
+            activity_scores(grays, ANALYSIS_FPS, samples, ANALYSIS_SAMPLE_RATE),
+            ANALYSIS_FPS,
+            duration,
+            duration_max
+        )
+    }
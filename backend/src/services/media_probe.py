@@ -0,0 +1,386 @@
+"""
+Video metadata probing.
+
+Reads stream metadata from container headers instead of opening a decoder.
+MP4 and QuickTime files are parsed directly from their box structure, which
+takes milliseconds; other containers fall back to ffprobe.
+"""
+import os
+import json
+import math
+import struct
+import subprocess
+from typing import NamedTuple, Optional, Callable, Dict, Any, Iterator, Tuple
+import numpy as np
+
+# Boxes whose payload is a list of child boxes
+CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"edts"}
+
+# Sample entry formats mapped to the codec names ffprobe reports
+CODEC_NAMES = {
+    "avc1": "h264",
+    "avc3": "h264",
+    "hvc1": "hevc",
+    "hev1": "hevc",
+    "vp09": "vp9",
+    "av01": "av1",
+    "mp4v": "mpeg4",
+    "mp4a": "aac",
+    "ac-3": "ac3",
+    "ec-3": "eac3",
+    "Opus": "opus",
+    "alac": "alac",
+    "lpcm": "pcm",
+    "sowt": "pcm_s16le",
+    "twos": "pcm_s16be",
+}
+
+# Bytes read per box header; large enough for a 64-bit size
+BOX_HEADER_SIZE = 16
+
+class ProbeError(Exception):
+    """Raised when a file's metadata cannot be read"""
+
+class ProbeResult(NamedTuple):
+    """Stream metadata of a video file"""
+    duration: float
+    width: int
+    height: int
+    fps: Optional[float] = None
+    codec: Optional[str] = None
+    bitrate: Optional[int] = None  # bits per second, whole file
+    rotation: int = 0  # clockwise degrees applied at playback
+    audio_codec: Optional[str] = None
+    audio_channels: Optional[int] = None
+    audio_sample_rate: Optional[int] = None
+    keyframe_times: Tuple[float, ...] = ()  # decode time of each keyframe, MP4 only
+    keyframe_offsets: Tuple[int, ...] = ()  # file offset of each keyframe's data
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_codec is not None
+
+    @property
+    def display_width(self) -> int:
+        """Width as shown to viewers, after rotation"""
+        return self.height if self.rotation in (90, 270) else self.width
+
+    @property
+    def display_height(self) -> int:
+        """Height as shown to viewers, after rotation"""
+        return self.width if self.rotation in (90, 270) else self.height
+
+    @property
+    def audio_layout(self) -> Optional[str]:
+        """Channel layout name in ffprobe terms"""
+        if not self.audio_channels:
+            return None
+        return {1: "mono", 2: "stereo"}.get(self.audio_channels, f"{self.audio_channels} channels")
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (type, payload offset, payload end) for each box in data[start:end]"""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size, = struct.unpack_from(">Q", data, offset + 8)
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            return
+        yield box_type, offset + header, offset + size
+        offset += size
+
+def iter_top_level_boxes(read_range: Callable[[int, int], bytes], file_size: int) -> Iterator[Tuple[bytes, int, int]]:
+    """
+    Yield (type, offset, size) of each top-level box by reading only box headers.
+    read_range(offset, length) returns bytes of the file.
+    """
+    offset = 0
+    while offset + 8 <= file_size:
+        header = read_range(offset, min(BOX_HEADER_SIZE, file_size - offset))
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack_from(">I4s", header)
+        if size == 1:
+            if len(header) < 16:
+                return
+            size, = struct.unpack_from(">Q", header, 8)
+        elif size == 0:
+            size = file_size - offset
+        if size < 8:
+            return
+        yield box_type, offset, size
+        offset += size
+
+def locate_box(read_range: Callable[[int, int], bytes], file_size: int, box_type: bytes) -> Optional[Tuple[int, int]]:
+    """Find a top-level box's (offset, size), or None when it is absent"""
+    for found, offset, size in iter_top_level_boxes(read_range, file_size):
+        if found == box_type:
+            return offset, size
+    return None
+
+def _fixed_16_16(value: int) -> float:
+    return value / 65536.0
+
+def _parse_header_duration(data: bytes, offset: int) -> Tuple[int, int]:
+    """Timescale and duration of an mvhd or mdhd payload"""
+    version = data[offset]
+    if version == 1:
+        timescale, duration = struct.unpack_from(">IQ", data, offset + 4 + 16)
+    else:
+        timescale, duration = struct.unpack_from(">II", data, offset + 4 + 8)
+    return timescale, duration
+
+def _parse_tkhd(data: bytes, offset: int) -> Dict[str, Any]:
+    """Presentation size and rotation of a track"""
+    version = data[offset]
+    # version/flags, times, track id, reserved, duration
+    position = offset + 4 + (32 if version == 1 else 20)
+    # reserved, layer, alternate group, volume, reserved
+    position += 16
+    matrix = struct.unpack_from(">9i", data, position)
+    width, height = struct.unpack_from(">II", data, position + 36)
+    a, b = _fixed_16_16(matrix[0]), _fixed_16_16(matrix[1])
+    rotation = int(round(math.degrees(math.atan2(b, a)))) % 360
+    return {
+        "width": int(round(_fixed_16_16(width))),
+        "height": int(round(_fixed_16_16(height))),
+        "rotation": rotation
+    }
+
+def _parse_stsd(data: bytes, offset: int, handler: bytes) -> Dict[str, Any]:
+    """Codec and stream layout of a track's first sample entry"""
+    entry_count, = struct.unpack_from(">I", data, offset + 4)
+    if entry_count == 0:
+        return {}
+    entry = offset + 8
+    _, fourcc = struct.unpack_from(">I4s", data, entry)
+    fourcc = fourcc.decode("latin-1")
+    codec = CODEC_NAMES.get(fourcc, fourcc.strip())
+    # Sample entry: reserved and data reference index precede the fields
+    fields = entry + 8 + 8
+    if handler == b"vide":
+        width, height = struct.unpack_from(">HH", data, fields + 16)
+        return {"codec": codec, "coded_width": width, "coded_height": height}
+    if handler == b"soun":
+        channels, _, _, _, sample_rate = struct.unpack_from(">HHHHI", data, fields + 8)
+        return {"codec": codec, "channels": channels, "sample_rate": sample_rate >> 16}
+    return {"codec": codec}
+
+def _table(data: bytes, offset: int, columns: int, dtype: str = ">u4") -> np.ndarray:
+    """
+    Entries of a sample table box payload (version/flags, entry count,
+    entries) as an array shaped (entries, columns)
+    """
+    entry_count, = struct.unpack_from(">I", data, offset + 4)
+    values = np.frombuffer(data, dtype=dtype, count=entry_count * columns, offset=offset + 8)
+    return values.reshape(entry_count, columns).astype(np.int64)
+
+def _parse_stsz(data: bytes, offset: int) -> np.ndarray:
+    """Size of every sample"""
+    sample_size, sample_count = struct.unpack_from(">II", data, offset + 4)
+    if sample_size:
+        return np.full(sample_count, sample_size, dtype=np.int64)
+    return np.frombuffer(data, dtype=">u4", count=sample_count, offset=offset + 12).astype(np.int64)
+
+def _sample_offsets(track: Dict[str, Any]) -> np.ndarray:
+    """File offset of every sample, from the chunk offset, sample-to-chunk and size tables"""
+    sizes = track["sample_sizes"]
+    chunk_offsets = track["chunk_offsets"]
+    sample_to_chunk = track["sample_to_chunk"]
+
+    # Samples per chunk, expanding each run of chunks in stsc (first chunk is 1-based)
+    first_chunks = sample_to_chunk[:, 0] - 1
+    run_lengths = np.diff(np.append(first_chunks, len(chunk_offsets)))
+    per_chunk = np.repeat(sample_to_chunk[:, 1], run_lengths)
+
+    chunk_of_sample = np.repeat(np.arange(len(per_chunk)), per_chunk)[:len(sizes)]
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    first_sample_of_chunk = np.concatenate([[0], np.cumsum(per_chunk)[:-1]])
+    within_chunk = starts - starts[first_sample_of_chunk[chunk_of_sample]]
+    return chunk_offsets[chunk_of_sample] + within_chunk
+
+def _keyframe_index(track: Dict[str, Any]) -> Tuple[Tuple[float, ...], Tuple[int, ...]]:
+    """Decode time in seconds and file offset of every sync sample of a track"""
+    required = ("time_to_sample", "sample_sizes", "chunk_offsets", "sample_to_chunk", "timescale")
+    if not all(key in track for key in required) or not track["timescale"]:
+        return (), ()
+
+    time_to_sample = track["time_to_sample"]
+    deltas = np.repeat(time_to_sample[:, 1], time_to_sample[:, 0])
+    times = np.concatenate([[0], np.cumsum(deltas)[:-1]]) / track["timescale"]
+    offsets = _sample_offsets(track)
+
+    # Without a sync sample table every sample is a keyframe
+    count = min(len(times), len(offsets))
+    sync = track.get("sync_samples")
+    keyframes = sync[(sync > 0) & (sync <= count)] - 1 if sync is not None else np.arange(count)
+    return (
+        tuple(round(float(time), 3) for time in times[keyframes]),
+        tuple(int(offset) for offset in offsets[keyframes])
+    )
+
+def _parse_track(data: bytes, start: int, end: int) -> Dict[str, Any]:
+    """Collect the fields of one trak box"""
+    track: Dict[str, Any] = {}
+    pending = [(start, end)]
+    while pending:
+        box_start, box_end = pending.pop()
+        for box_type, payload, payload_end in _iter_boxes(data, box_start, box_end):
+            if box_type in CONTAINER_BOXES:
+                pending.append((payload, payload_end))
+            elif box_type == b"tkhd":
+                track.update(_parse_tkhd(data, payload))
+            elif box_type == b"mdhd":
+                track["timescale"], track["duration"] = _parse_header_duration(data, payload)
+            elif box_type == b"hdlr":
+                track["handler"] = data[payload + 8:payload + 12]
+            elif box_type == b"stsd":
+                track["stsd"] = payload
+            elif box_type == b"stts":
+                track["time_to_sample"] = _table(data, payload, 2)
+            elif box_type == b"stss":
+                track["sync_samples"] = _table(data, payload, 1).ravel()
+            elif box_type == b"stsz":
+                track["sample_sizes"] = _parse_stsz(data, payload)
+            elif box_type == b"stsc":
+                track["sample_to_chunk"] = _table(data, payload, 3)
+            elif box_type == b"stco":
+                track["chunk_offsets"] = _table(data, payload, 1).ravel()
+            elif box_type == b"co64":
+                track["chunk_offsets"] = _table(data, payload, 1, ">u8").ravel()
+    # The sample description layout depends on the handler, found anywhere in mdia
+    if "stsd" in track:
+        track.update(_parse_stsd(data, track.pop("stsd"), track.get("handler", b"")))
+    return track
+
+def parse_moov(moov: bytes, file_size: Optional[int] = None) -> ProbeResult:
+    """Build a probe result from the bytes of a complete moov box"""
+    try:
+        boxes = list(_iter_boxes(moov))
+        if not boxes or boxes[0][0] != b"moov":
+            raise ProbeError("Not a moov box")
+        _, start, end = boxes[0]
+
+        duration = None
+        video = audio = None
+        for box_type, payload, payload_end in _iter_boxes(moov, start, end):
+            if box_type == b"mvhd":
+                timescale, units = _parse_header_duration(moov, payload)
+                duration = units / timescale if timescale else None
+            elif box_type == b"trak":
+                track = _parse_track(moov, payload, payload_end)
+                if track.get("handler") == b"vide" and video is None:
+                    video = track
+                elif track.get("handler") == b"soun" and audio is None:
+                    audio = track
+        keyframe_times, keyframe_offsets = _keyframe_index(video) if video else ((), ())
+    except (struct.error, ValueError, IndexError) as e:
+        raise ProbeError(f"Truncated box: {str(e)}")
+
+    if video is None:
+        raise ProbeError("No video track")
+
+    if not duration and video.get("timescale"):
+        duration = video["duration"] / video["timescale"]
+    if not duration:
+        raise ProbeError("Unknown duration")
+
+    fps = None
+    time_to_sample = video.get("time_to_sample")
+    if time_to_sample is not None and video.get("timescale"):
+        samples = int(time_to_sample[:, 0].sum())
+        sample_time = int((time_to_sample[:, 0] * time_to_sample[:, 1]).sum())
+        if sample_time:
+            fps = round(samples * video["timescale"] / sample_time, 3)
+
+    return ProbeResult(
+        duration=duration,
+        width=video.get("width") or video.get("coded_width") or 0,
+        height=video.get("height") or video.get("coded_height") or 0,
+        fps=fps,
+        codec=video.get("codec"),
+        bitrate=int(file_size * 8 / duration) if file_size else None,
+        rotation=video.get("rotation", 0),
+        audio_codec=audio.get("codec") if audio else None,
+        audio_channels=audio.get("channels") if audio else None,
+        audio_sample_rate=audio.get("sample_rate") if audio else None,
+        keyframe_times=keyframe_times,
+        keyframe_offsets=keyframe_offsets
+    )
+
+def probe_mp4(file_path: str) -> ProbeResult:
+    """Probe an MP4 or QuickTime file by reading only its moov box"""
+    file_size = os.path.getsize(file_path)
+    with open(file_path, "rb") as video_file:
+        def read_range(offset: int, length: int) -> bytes:
+            video_file.seek(offset)
+            return video_file.read(length)
+
+        location = locate_box(read_range, file_size, b"moov")
+        if location is None:
+            raise ProbeError("No moov box")
+        offset, size = location
+        return parse_moov(read_range(offset, size), file_size)
+
+def probe_ffprobe(file_path: str, ffprobe_binary: str = "ffprobe") -> ProbeResult:
+    """Probe any container ffprobe understands, from a file path or URL"""
+    try:
+        output = subprocess.run(
+            [
+                ffprobe_binary, "-v", "error", "-print_format", "json",
+                "-show_format", "-show_streams", file_path
+            ],
+            capture_output=True, check=True, timeout=30
+        ).stdout
+        info = json.loads(output)
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        raise ProbeError(f"ffprobe failed: {str(e)}")
+
+    streams = info.get("streams", [])
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), None)
+    audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), None)
+    if video is None:
+        raise ProbeError("No video stream")
+
+    fps = None
+    numerator, _, denominator = (video.get("avg_frame_rate") or "0/0").partition("/")
+    if denominator and float(denominator):
+        fps = round(float(numerator) / float(denominator), 3)
+
+    rotation = video.get("tags", {}).get("rotate")
+    for side_data in video.get("side_data_list", []):
+        if "rotation" in side_data:
+            # Display matrix rotation is counter-clockwise
+            rotation = -float(side_data["rotation"])
+
+    file_format = info.get("format", {})
+    duration = float(file_format.get("duration") or video.get("duration") or 0)
+    if not duration:
+        raise ProbeError("Unknown duration")
+
+    return ProbeResult(
+        duration=duration,
+        width=int(video.get("width", 0)),
+        height=int(video.get("height", 0)),
+        fps=fps,
+        codec=video.get("codec_name"),
+        bitrate=int(file_format["bit_rate"]) if file_format.get("bit_rate") else None,
+        rotation=int(float(rotation or 0)) % 360,
+        audio_codec=audio.get("codec_name") if audio else None,
+        audio_channels=audio.get("channels") if audio else None,
+        audio_sample_rate=int(audio["sample_rate"]) if audio and audio.get("sample_rate") else None
+    )
+
+def probe_video(file_path: str, ffprobe_binary: str = "ffprobe") -> ProbeResult:
+    """Probe a video, parsing MP4 headers directly and falling back to ffprobe"""
+    try:
+        return probe_mp4(file_path)
+    except ProbeError:
+        return probe_ffprobe(file_path, ffprobe_binary)
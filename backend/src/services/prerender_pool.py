@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, Any, Optional
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func
+from sqlalchemy.dialects.postgresql import insert
+
+from models.story import PrerenderedStory, PrerenderPoolMetric
+from services.deletion_outbox import enqueue_artifact_deletion
+from config.database import SessionLocal
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Pool counters, kept in prerender_pool_metrics and reported through get_pool_stats()
+POOL_METRICS = ("hits", "misses", "rendered", "expired", "invalidated")
+
+# Counter increments not yet written. Claims run inside the caller's
+# transaction with a pool entry locked, so they only add here; a flush
+# writes the totals in one short transaction of its own.
+_pending_metrics: Dict[str, int] = {}
+_pending_metrics_lock = threading.Lock()
+
+def record_pool_metric(name: str, amount: int = 1) -> None:
+    """Add to a shared pool counter; the next flush writes it"""
+    if not amount:
+        return
+    with _pending_metrics_lock:
+        _pending_metrics[name] = _pending_metrics.get(name, 0) + amount
+
+def flush_pool_metrics() -> None:
+    """
+    Write pending counter increments. Blocks on the database, so async
+    callers run it in a thread. Increments that fail to write are kept
+    for the next flush.
+    """
+    with _pending_metrics_lock:
+        pending = dict(_pending_metrics)
+        _pending_metrics.clear()
+    if not pending:
+        return
+
+    db = SessionLocal()
+    try:
+        # Sorted so concurrent flushes lock the counter rows in the same order
+        statement = insert(PrerenderPoolMetric).values([
+            {"name": name, "count": count} for name, count in sorted(pending.items())
+        ])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[PrerenderPoolMetric.name],
+            set_={
+                "count": PrerenderPoolMetric.count + statement.excluded.count,
+                "updated_at": datetime.utcnow()
+            }
+        ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error writing pre-render pool metrics: {str(e)}")
+        with _pending_metrics_lock:
+            for name, count in pending.items():
+                _pending_metrics[name] = _pending_metrics.get(name, 0) + count
+    finally:
+        db.close()
+
+async def run_pool_metrics_flusher() -> None:
+    """Write pool counters every PRERENDER_POOL_METRICS_INTERVAL until cancelled"""
+    while True:
+        await asyncio.sleep(settings.PRERENDER_POOL_METRICS_INTERVAL)
+        await asyncio.to_thread(flush_pool_metrics)
+
+class PrerenderPoolService:
+    """Service for managing the pool of pre-rendered stories"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def claim(
+        self,
+        template_id: int,
+        user_id: int,
+        resolution: str,
+        transition_type: Optional[str],
+        transition_duration: Optional[float]
+    ) -> Optional[PrerenderedStory]:
+        """
+        Lock and return the oldest fresh pool entry matching the request.
+        Entries containing segments uploaded by the requesting user are skipped.
+        The caller is responsible for deleting the entry in the same transaction.
+        """
+        entry = self.db.query(PrerenderedStory).filter(
+            and_(
+                PrerenderedStory.template_id == template_id,
+                PrerenderedStory.resolution == resolution,
+                PrerenderedStory.transition_type == transition_type,
+                PrerenderedStory.transition_duration == transition_duration,
+                PrerenderedStory.expires_at > datetime.utcnow(),
+                ~PrerenderedStory.segment_user_ids.overlap([user_id])
+            )
+        ).order_by(
+            PrerenderedStory.created_at
+        ).with_for_update(skip_locked=True).first()
+
+        record_pool_metric("hits" if entry else "misses")
+        return entry
+
+    def count_ready(self, template_id: int, resolution: str) -> int:
+        """Count fresh pool entries for a template and resolution"""
+        return self.db.query(func.count(PrerenderedStory.id)).filter(
+            and_(
+                PrerenderedStory.template_id == template_id,
+                PrerenderedStory.resolution == resolution,
+                PrerenderedStory.expires_at > datetime.utcnow()
+            )
+        ).scalar()
+
+    async def _discard(self, entries) -> int:
+        """Delete pool entries; their rendered files go through the deletion outbox"""
+        for entry in entries:
+            enqueue_artifact_deletion(self.db, entry)
+            self.db.delete(entry)
+        self.db.commit()
+        return len(entries)
+
+    async def evict_expired(self) -> int:
+        """Remove pool entries past their TTL"""
+        entries = self.db.query(PrerenderedStory).filter(
+            PrerenderedStory.expires_at <= datetime.utcnow()
+        ).with_for_update(skip_locked=True).all()
+        evicted = await self._discard(entries)
+        record_pool_metric("expired", evicted)
+        return evicted
+
+    async def invalidate_segment(self, segment_id: int) -> int:
+        """Remove pool entries built from a segment whose moderation status changed"""
+        entries = self.db.query(PrerenderedStory).filter(
+            PrerenderedStory.segment_ids.any(segment_id)
+        ).with_for_update(skip_locked=True).all()
+        invalidated = await self._discard(entries)
+        record_pool_metric("invalidated", invalidated)
+        return invalidated
+
+    async def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Get pool hit rate, counters across all processes as of their last
+        flush and current fill level per template and resolution
+        """
+        metrics = dict.fromkeys(POOL_METRICS, 0)
+        metrics.update(self.db.query(PrerenderPoolMetric.name, PrerenderPoolMetric.count).all())
+
+        rows = self.db.query(
+            PrerenderedStory.template_id,
+            PrerenderedStory.resolution,
+            func.count(PrerenderedStory.id)
+        ).filter(
+            PrerenderedStory.expires_at > datetime.utcnow()
+        ).group_by(
+            PrerenderedStory.template_id,
+            PrerenderedStory.resolution
+        ).all()
+
+        claims = metrics["hits"] + metrics["misses"]
+        return {
+            **metrics,
+            "hit_rate": metrics["hits"] / claims if claims else None,
+            "pools": [
+                {
+                    "template_id": template_id,
+                    "resolution": resolution,
+                    "ready": ready,
+                    "target": settings.PRERENDER_POOL_TARGETS.get(template_id, 0)
+                }
+                for template_id, resolution, ready in rows
+            ]
+        }
+
+async def refill_pool(db: Session) -> int:
+    """
+    Evict stale entries and render stories until every pool reaches its
+    target. A template and resolution that fails is logged and skipped
+    until the next pass, so it cannot starve the others.
+    """
+    # Imported here as story generation claims from the pool
+    from services.story_generation import StoryGenerationService
+
+    pool = PrerenderPoolService(db)
+    await pool.evict_expired()
+
+    rendered = 0
+    story_service = StoryGenerationService(db)
+    for template_id, target in settings.PRERENDER_POOL_TARGETS.items():
+        for resolution in settings.PRERENDER_POOL_RESOLUTIONS:
+            try:
+                missing = target - pool.count_ready(template_id, resolution)
+                for _ in range(max(missing, 0)):
+                    await story_service.prerender_story(template_id, resolution)
+                    rendered += 1
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error refilling pre-render pool for template {template_id} at {resolution}: {str(e)}")
+
+    record_pool_metric("rendered", rendered)
+    return rendered
+
+async def run_pool_maintainer() -> None:
+    """Keep the pre-render pool topped up until cancelled"""
+    while True:
+        db = SessionLocal()
+        try:
+            rendered = await refill_pool(db)
+            if rendered:
+                logger.info(f"Pre-rendered {rendered} stories")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error refilling pre-render pool: {str(e)}")
+        finally:
+            db.close()
+        await asyncio.to_thread(flush_pool_metrics)
+        await asyncio.sleep(settings.PRERENDER_POOL_REFILL_INTERVAL)
+
+if __name__ == "__main__":
+    # Run as a dedicated worker: python -m services.prerender_pool
+    asyncio.run(run_pool_maintainer())
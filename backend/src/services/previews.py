@@ -0,0 +1,154 @@
+"""
+Preview images for videos.
+
+A thumbnail and a sprite sheet of evenly spaced frames are extracted in one
+ffmpeg pass that decodes keyframes only; a WebVTT index maps the sprite's
+tiles to time ranges, so the mobile scrubber and moderation UI never need
+to decode video. The stored index names the sprite by file name; it is
+served with that name replaced by a presigned sprite URL.
+"""
+import os
+import bisect
+import subprocess
+from typing import NamedTuple, Optional, Sequence
+from moviepy.config import get_setting
+
+from services.storage import StorageService
+from config.settings import settings
+
+class Previews(NamedTuple):
+    """Local preview images of one video and the sprite layout"""
+    thumbnail_path: str
+    sprite_path: str
+    duration: float
+    frames: int
+    columns: int
+    tile_width: int
+    tile_height: int
+
+class PreviewPaths(NamedTuple):
+    """Storage paths of a video's preview files"""
+    thumbnail_path: str
+    sprite_path: str
+    vtt_path: str
+
+def preview_storage_paths(storage_path: str) -> PreviewPaths:
+    """Storage paths of the previews uploaded next to a video"""
+    return PreviewPaths(
+        thumbnail_path=f"{storage_path}_thumb.jpg",
+        sprite_path=f"{storage_path}_sprite.jpg",
+        vtt_path=f"{storage_path}_sprite.vtt"
+    )
+
+def _timestamp(seconds: float) -> str:
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+def build_sprite_vtt(
+    sprite_name: str,
+    duration: float,
+    frames: int,
+    columns: int,
+    tile_width: int,
+    tile_height: int
+) -> str:
+    """WebVTT cues mapping each stretch of the video to its tile in the sprite"""
+    interval = duration / frames
+    cues = ["WEBVTT", ""]
+    for index in range(frames):
+        x = (index % columns) * tile_width
+        y = (index // columns) * tile_height
+        cues.append(f"{_timestamp(index * interval)} --> {_timestamp(min((index + 1) * interval, duration))}")
+        cues.append(f"{sprite_name}#xywh={x},{y},{tile_width},{tile_height}")
+        cues.append("")
+    return "\n".join(cues)
+
+def extract_previews(
+    source: str,
+    duration: float,
+    width: int,
+    height: int,
+    output_dir: str,
+    keyframe_times: Optional[Sequence[float]] = None
+) -> Previews:
+    """
+    Write a thumbnail and sprite sheet for a video into output_dir.
+    Only keyframes are decoded: sprite tiles show the latest keyframe at or
+    before each evenly spaced time, and the thumbnail is the keyframe at or
+    before one second in (or the midpoint of shorter videos). width and
+    height are the display size, used to keep the tiles' aspect ratio.
+    """
+    frames = max(settings.SPRITE_FRAMES, 1)
+    columns = min(settings.SPRITE_COLUMNS, frames)
+    rows = -(-frames // columns)
+    tile_width = settings.SPRITE_TILE_WIDTH
+    tile_height = max(2, int(round(tile_width * height / max(width, 1) / 2)) * 2)
+
+    target = min(1.0, duration / 2)
+    thumbnail_time = 0.0
+    if keyframe_times:
+        thumbnail_time = keyframe_times[max(bisect.bisect_right(keyframe_times, target) - 1, 0)]
+
+    previews = Previews(
+        thumbnail_path=os.path.join(output_dir, "thumb.jpg"),
+        sprite_path=os.path.join(output_dir, "sprite.jpg"),
+        duration=duration,
+        frames=frames,
+        columns=columns,
+        tile_width=tile_width,
+        tile_height=tile_height
+    )
+    filters = (
+        f"[0:v]split=2[s][t];"
+        f"[s]fps={frames}/{duration:.6f},scale={tile_width}:{tile_height},tile={columns}x{rows}[sprite];"
+        f"[t]select='gte(t\\,{thumbnail_time:.6f})'[thumb]"
+    )
+    subprocess.run(
+        [
+            get_setting("FFMPEG_BINARY"), "-v", "error", "-y",
+            "-skip_frame", "nokey", "-i", source,
+            "-filter_complex", filters,
+            "-map", "[sprite]", "-frames:v", "1", "-q:v", "4", previews.sprite_path,
+            "-map", "[thumb]", "-frames:v", "1", "-q:v", "2", previews.thumbnail_path
+        ],
+        capture_output=True, check=True, timeout=120
+    )
+    return previews
+
+def upload_previews(storage_service: StorageService, previews: Previews, storage_path: str) -> PreviewPaths:
+    """
+    Upload previews next to the video they belong to, with a WebVTT index
+    whose cues point at the sprite by its file name.
+    """
+    paths = preview_storage_paths(storage_path)
+    for local_path, key in ((previews.thumbnail_path, paths.thumbnail_path), (previews.sprite_path, paths.sprite_path)):
+        with open(local_path, 'rb') as preview_file:
+            storage_service.s3_client.upload_fileobj(
+                preview_file,
+                settings.AWS_BUCKET_NAME,
+                key,
+                ExtraArgs={'ContentType': 'image/jpeg'}
+            )
+
+    vtt = build_sprite_vtt(
+        os.path.basename(paths.sprite_path),
+        previews.duration,
+        previews.frames,
+        previews.columns,
+        previews.tile_width,
+        previews.tile_height
+    )
+    storage_service.s3_client.put_object(
+        Bucket=settings.AWS_BUCKET_NAME,
+        Key=paths.vtt_path,
+        Body=vtt.encode(),
+        ContentType='text/vtt'
+    )
+    return paths
+
+async def signed_sprite_vtt(storage_service: StorageService, vtt_path: str, sprite_path: str) -> str:
+    """A stored WebVTT index whose cues point at a presigned URL of the sprite"""
+    vtt = (await storage_service.read_file(vtt_path)).decode()
+    sprite_url = await storage_service.get_download_url(sprite_path)
+    return vtt.replace(f"{os.path.basename(sprite_path)}#xywh=", f"{sprite_url}#xywh=")
@@ -0,0 +1,107 @@
+"""
+Render cost model.
+
+Predicts how long each render stage will take for a plan, fitted by least
+squares on the stage timings recorded for recently generated stories.
+"""
+import time
+import logging
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models.story import GeneratedStory
+from services.render_plan import RenderPlan
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+RENDER_STAGES = ("download", "decode", "resize", "encode", "upload", "thumbnail")
+
+# Seconds per unit of each feature, used until enough renders have been timed.
+# Features: [1, segments, output seconds, output megapixel-seconds]
+DEFAULT_COEFFICIENTS = {
+    "download": [0.0, 0.5, 0.0, 0.0],
+    "decode": [0.0, 0.2, 0.05, 0.0],
+    "resize": [0.0, 0.0, 0.0, 0.02],
+    "encode": [1.0, 0.0, 0.0, 0.15],
+    "upload": [0.2, 0.0, 0.02, 0.0],
+    "thumbnail": [0.3, 0.0, 0.0, 0.0]
+}
+
+MIN_SAMPLES = 10
+
+def plan_features(plan: RenderPlan) -> np.ndarray:
+    """Feature vector of a plan"""
+    output_seconds = plan.output_duration
+    # 16:9 output frames
+    megapixels = plan.target_height * plan.target_height * 16 / 9 / 1e6
+    return np.array([1.0, len(plan.segments), output_seconds, output_seconds * megapixels])
+
+class RenderCostModel:
+    """Linear per-stage render time model"""
+
+    def __init__(self, coefficients: Optional[Dict[str, List[float]]] = None, samples: int = 0):
+        self.coefficients = {
+            stage: np.asarray(values, dtype=float)
+            for stage, values in (coefficients or DEFAULT_COEFFICIENTS).items()
+        }
+        self.samples = samples
+
+    @classmethod
+    def fit(cls, plans: List[RenderPlan], timings: List[Dict[str, float]]) -> "RenderCostModel":
+        """Fit stage coefficients from plans and their recorded timings"""
+        if len(plans) < MIN_SAMPLES:
+            return cls(samples=len(plans))
+
+        features = np.stack([plan_features(plan) for plan in plans])
+        coefficients = {}
+        for stage in RENDER_STAGES:
+            observed = np.array([timing.get(stage, 0.0) for timing in timings])
+            solution, *_ = np.linalg.lstsq(features, observed, rcond=None)
+            # Negative costs are noise from collinear features
+            coefficients[stage] = np.clip(solution, 0.0, None)
+        return cls(coefficients, samples=len(plans))
+
+    def predict(self, plan: RenderPlan) -> Dict[str, float]:
+        """Predicted seconds per stage, plus the total"""
+        features = plan_features(plan)
+        prediction = {
+            stage: max(float(features @ self.coefficients[stage]), 0.0)
+            for stage in RENDER_STAGES
+        }
+        prediction["total"] = sum(prediction.values())
+        return prediction
+
+def load_samples(db: Session, limit: int):
+    """Load plans and stage timings of recently completed stories"""
+    rows = db.query(GeneratedStory.generation_metadata).filter(
+        GeneratedStory.status == 'completed',
+        GeneratedStory.generation_metadata.has_key('stage_timings'),
+        GeneratedStory.generation_metadata.has_key('render_plan')
+    ).order_by(GeneratedStory.id.desc()).limit(limit).all()
+
+    plans, timings = [], []
+    for metadata, in rows:
+        try:
+            plans.append(RenderPlan.from_dict(metadata["render_plan"]))
+            timings.append(metadata["stage_timings"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return plans, timings
+
+_cached_model: Optional[RenderCostModel] = None
+_cached_at: float = 0.0
+
+def get_cost_model(db: Session) -> RenderCostModel:
+    """Get the per-process cost model, refitting it when stale"""
+    global _cached_model, _cached_at
+    if _cached_model is None or time.monotonic() - _cached_at > settings.RENDER_COST_MODEL_REFRESH:
+        try:
+            plans, timings = load_samples(db, settings.RENDER_COST_MODEL_SAMPLES)
+            _cached_model = RenderCostModel.fit(plans, timings)
+        except Exception as e:
+            logger.error(f"Error fitting render cost model: {str(e)}")
+            _cached_model = _cached_model or RenderCostModel()
+        _cached_at = time.monotonic()
+    return _cached_model
@@ -0,0 +1,145 @@
+"""
+Render plans.
+
+A RenderPlan holds everything the render engine needs for one story, as
+immutable tuples. Plans are built from the ORM once, stored with the story
+as JSON, and are cheap to pickle for worker processes, so renders never
+touch a database session.
+"""
+import bisect
+from typing import NamedTuple, Optional, Tuple, Dict, Any, Iterable, Sequence
+
+from services.media_analysis import loudness_gain
+
+RESOLUTION_HEIGHTS = {
+    "720p": 720,
+    "1080p": 1080
+}
+
+# Byte ranges of a source file, end exclusive; an end of None runs to the end of the media data
+ByteRanges = Tuple[Tuple[int, Optional[int]], ...]
+
+def keyframe_byte_ranges(
+    keyframe_times: Optional[Sequence[float]],
+    keyframe_offsets: Optional[Sequence[int]],
+    start_time: Optional[float],
+    end_time: Optional[float]
+) -> Optional[ByteRanges]:
+    """
+    Byte ranges of a source a trimmed render reads: the first GOP, which
+    decoders read when a clip is opened, and the GOPs around the trim. One
+    extra GOP each side of the trim covers audio interleaved near the cut
+    points. None when the whole file is needed.
+    """
+    if not keyframe_times or not keyframe_offsets or start_time is None or end_time is None:
+        return None
+    if len(keyframe_times) < 3:
+        return None
+
+    first = max(bisect.bisect_right(keyframe_times, start_time) - 2, 0)
+    last = bisect.bisect_right(keyframe_times, end_time) + 1
+    end = keyframe_offsets[last] if last < len(keyframe_offsets) else None
+    if first <= 1:
+        return ((keyframe_offsets[0], end),)
+    return ((keyframe_offsets[0], keyframe_offsets[1]), (keyframe_offsets[first], end))
+
+class RenderSegment(NamedTuple):
+    """One source clip of a story and how to cut it"""
+    storage_path: str
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    volume_adjustment: float = 1.0
+    transition_type: Optional[str] = None
+    transition_duration: Optional[float] = None
+    source_duration: Optional[float] = None  # Full length of the source clip
+    loudness_gain: float = 1.0  # Normalization gain from the loudness measured at ingest
+    byte_ranges: Optional[ByteRanges] = None  # Parts of the source a trimmed render reads
+    etag: Optional[str] = None  # Version of the source; cached copies of other versions are not used
+
+    @property
+    def gain(self) -> float:
+        """Single audio gain applied at render"""
+        return self.volume_adjustment * self.loudness_gain
+
+    @property
+    def output_duration(self) -> float:
+        """Seconds this segment contributes to the story"""
+        if self.start_time is not None and self.end_time is not None:
+            return max(self.end_time - self.start_time, 0.0)
+        return self.source_duration or 0.0
+
+class RenderPlan(NamedTuple):
+    """Ordered segments and output settings for one story render"""
+    resolution: str
+    segments: Tuple[RenderSegment, ...]
+
+    @property
+    def target_height(self) -> int:
+        """Output height in pixels"""
+        return RESOLUTION_HEIGHTS.get(self.resolution, 720)
+
+    @property
+    def storage_paths(self) -> Tuple[str, ...]:
+        """Storage paths of every source clip, in order"""
+        return tuple(segment.storage_path for segment in self.segments)
+
+    @property
+    def output_duration(self) -> float:
+        """Expected story length in seconds"""
+        return sum(segment.output_duration for segment in self.segments)
+
+    @classmethod
+    def from_story_segments(cls, resolution: str, segments: Iterable[Any]) -> "RenderPlan":
+        """
+        Build a plan from GeneratedStorySegment rows.
+        Each row's video_segment must already be loaded.
+        """
+        ordered = sorted(segments, key=lambda segment: segment.order)
+        return cls(
+            resolution=resolution,
+            segments=tuple(
+                RenderSegment(
+                    storage_path=segment.video_segment.storage_path,
+                    start_time=segment.start_time,
+                    end_time=segment.end_time,
+                    volume_adjustment=segment.volume_adjustment if segment.volume_adjustment is not None else 1.0,
+                    transition_type=segment.transition_type,
+                    transition_duration=segment.transition_duration,
+                    source_duration=segment.video_segment.duration,
+                    loudness_gain=loudness_gain(
+                        segment.video_segment.mean_volume,
+                        segment.video_segment.max_volume
+                    ),
+                    byte_ranges=keyframe_byte_ranges(
+                        segment.video_segment.keyframe_times,
+                        segment.video_segment.keyframe_offsets,
+                        segment.start_time,
+                        segment.end_time
+                    ),
+                    etag=segment.video_segment.etag
+                )
+                for segment in ordered
+            )
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-compatible dict for storage with the job"""
+        return {
+            "resolution": self.resolution,
+            "segments": [list(segment) for segment in self.segments]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RenderPlan":
+        """Rebuild a plan stored with to_dict"""
+        return cls(
+            resolution=data["resolution"],
+            segments=tuple(_segment_from_list(segment) for segment in data["segments"])
+        )
+
+def _segment_from_list(values: Sequence[Any]) -> RenderSegment:
+    segment = RenderSegment(*values)
+    if segment.byte_ranges is not None:
+        # JSON turns the range tuples into lists
+        segment = segment._replace(byte_ranges=tuple(tuple(byte_range) for byte_range in segment.byte_ranges))
+    return segment
@@ -0,0 +1,202 @@
+"""
+Story render engine.
+
+Pure MoviePy functions that turn local segment files into a story video.
+Nothing here touches the database or storage, so renders can run in
+worker processes.
+"""
+import os
+import time
+import logging
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable, Iterator, List, Tuple
+from moviepy.editor import VideoFileClip, concatenate_videoclips
+
+from services.render_plan import RenderPlan, RenderSegment
+
+logger = logging.getLogger(__name__)
+
+class ClipCache:
+    """
+    Bounded LRU of opened source clips.
+    Sharing one cache across renders means each distinct segment is
+    opened and decoded once per process instead of once per story.
+    """
+
+    def __init__(self, max_clips: int = 32):
+        self.max_clips = max_clips
+        self._clips: "OrderedDict[str, VideoFileClip]" = OrderedDict()
+
+    def get(self, source: str) -> VideoFileClip:
+        """Get an opened clip for a local file or URL"""
+        clip = self._clips.get(source)
+        if clip is not None:
+            self._clips.move_to_end(source)
+            return clip
+
+        clip = VideoFileClip(source)
+        self._clips[source] = clip
+        while len(self._clips) > self.max_clips:
+            _, evicted = self._clips.popitem(last=False)
+            evicted.close()
+        return clip
+
+    def close(self) -> None:
+        """Close every cached clip"""
+        for clip in self._clips.values():
+            clip.close()
+        self._clips.clear()
+
+class StageTimer:
+    """
+    Accumulates wall time per render stage.
+    Stages may nest (MoviePy decodes and resizes lazily while encoding);
+    each stage is charged only its own time, excluding nested stages.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = defaultdict(float)
+        self._nested: List[float] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block as one stage"""
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] += elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def call(self, name: str, fn: Callable, *args):
+        """Call fn and charge its time to a stage"""
+        with self.stage(name):
+            return fn(*args)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage timings rounded for storage"""
+        return {name: round(seconds, 3) for name, seconds in self.timings.items()}
+
+def apply_transition(
+    clip: VideoFileClip,
+    transition_type: str,
+    transition_duration: float
+) -> VideoFileClip:
+    """Apply transition effect to video clip"""
+    if transition_type == "fade":
+        clip = clip.fadein(transition_duration).fadeout(transition_duration)
+    elif transition_type == "dissolve":
+        # Implement dissolve transition
+        pass
+    # Add more transition types as needed
+    return clip
+
+def audio_gain_filter(spans: List[Tuple[float, float, float]]) -> Optional[str]:
+    """
+    ffmpeg audio filter applying each (start, end, gain) span of the story
+    timeline, so per-segment gain runs in the encoder rather than as a
+    per-frame multiply in Python. None when there is nothing to apply.
+    """
+    filters = [
+        f"volume={gain:.6f}:enable='gte(t,{start:.6f})*lt(t,{end:.6f})'"
+        for start, end, gain in spans
+        if gain != 1.0 and end > start
+    ]
+    return ",".join(filters) or None
+
+def render_story(
+    plan: RenderPlan,
+    resolve_path: Callable[[RenderSegment], str],
+    output_path: str,
+    clip_cache: Optional[ClipCache] = None,
+    timer: Optional[StageTimer] = None,
+    on_stage: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Render a plan into a story video at output_path.
+    resolve_path maps a segment to a local file or URL holding its source.
+    When a timer is given, download, decode, resize and encode time is
+    charged to it; on_stage is called as download and encode start.
+    Returns the video metadata.
+    """
+    cache = clip_cache or ClipCache(max_clips=max(len(plan.segments), 1))
+    timer = timer or StageTimer()
+    target_height = plan.target_height
+    try:
+        if on_stage:
+            on_stage("download")
+
+        clips = []
+        gain_spans = []
+        story_time = 0.0
+        for segment in plan.segments:
+            source_path = timer.call("download", resolve_path, segment)
+            source = timer.call("decode", cache.get, source_path)
+
+            # Frames are decoded lazily during encoding, so charge them as they are read
+            clip = source.fl(lambda get_frame, t: timer.call("decode", get_frame, t))
+
+            # Apply customizations
+            if segment.start_time is not None and segment.end_time is not None:
+                clip = clip.subclip(segment.start_time, segment.end_time)
+
+            # Resize if needed
+            if clip.h != target_height:
+                clip = clip.resize(height=target_height)
+                clip = clip.fl(lambda get_frame, t: timer.call("resize", get_frame, t))
+
+            # Apply transitions
+            if segment.transition_type and segment.transition_duration:
+                clip = apply_transition(
+                    clip,
+                    segment.transition_type,
+                    segment.transition_duration
+                )
+
+            # Volume adjustment and loudness normalization are one gain,
+            # applied by ffmpeg over the segment's span of the story
+            if clip.audio is not None:
+                gain_spans.append((story_time, story_time + clip.duration, segment.gain))
+            story_time += clip.duration
+            clips.append(clip)
+
+        # Concatenate all clips
+        final_clip = concatenate_videoclips(clips, method="compose")
+
+        # Write final video; the audio temp file sits next to the output so
+        # concurrent renders don't collide. It is kept as PCM and encoded to
+        # AAC once, when ffmpeg applies the segment gains
+        audio_params = ['-c:a', 'aac']
+        gain_filter = audio_gain_filter(gain_spans)
+        if gain_filter and final_clip.audio is not None:
+            audio_params = ['-af', gain_filter] + audio_params
+        if on_stage:
+            on_stage("encode")
+        with timer.stage("encode"):
+            final_clip.write_videofile(
+                output_path,
+                codec='libx264',
+                audio_codec='pcm_s16le',
+                temp_audiofile=f"{os.path.splitext(output_path)[0]}_audio.wav",
+                remove_temp=True,
+                ffmpeg_params=audio_params,
+                logger=None
+            )
+
+        metadata = {
+            "duration": final_clip.duration,
+            "width": final_clip.w,
+            "height": final_clip.h,
+            "fps": final_clip.fps
+        }
+        final_clip.close()
+        return metadata
+
+    finally:
+        # Source clips in a shared cache stay open for the next render
+        if clip_cache is None:
+            cache.close()
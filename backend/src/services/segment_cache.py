@@ -0,0 +1,203 @@
+import os
+import glob
+import logging
+import hashlib
+import uuid
+from typing import Iterable, Optional, Tuple
+
+from services.storage import StorageService
+from services.media_probe import iter_top_level_boxes
+from services.render_plan import RenderSegment, ByteRanges
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Largest single ranged GET when filling a sparse copy
+RANGE_CHUNK_BYTES = 8 * 1024 * 1024
+
+class SegmentCache:
+    """
+    Local disk cache of downloaded video segments.
+    Shared by every render on the host, so a segment is downloaded once
+    no matter how many stories use it. Copies are keyed by storage path and
+    ETag, so a re-upload to the same key is never served from a copy of
+    the old content.
+    """
+
+    def __init__(self, storage_service: Optional[StorageService] = None):
+        self.storage_service = storage_service or StorageService()
+        self.cache_dir = settings.SEGMENT_CACHE_DIR
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path_for(self, storage_path: str, etag: Optional[str] = None) -> str:
+        """Get the local cache path for a version of a storage object"""
+        key = f"{storage_path}@{etag}" if etag else storage_path
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        extension = os.path.splitext(storage_path)[1] or ".mp4"
+        return os.path.join(self.cache_dir, f"{digest}{extension}")
+
+    def is_cached(self, storage_path: str, etag: Optional[str] = None) -> bool:
+        """Check whether a version of a storage object is already on local disk"""
+        return os.path.exists(self.path_for(storage_path, etag))
+
+    def discard(self, storage_path: str, etag: Optional[str] = None) -> None:
+        """Delete the full and sparse local copies of a version of a storage object"""
+        root, extension = os.path.splitext(self.path_for(storage_path, etag))
+        for path in [f"{root}{extension}"] + glob.glob(f"{glob.escape(root)}_*{extension}"):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def fetch(self, storage_path: str, etag: Optional[str] = None) -> str:
+        """
+        Return a local path for a storage object, downloading it on a cache
+        miss. With an etag, the download fails if the object has since been
+        replaced.
+        """
+        local_path = self.path_for(storage_path, etag)
+        if os.path.exists(local_path):
+            # Refresh mtime so pruning evicts least recently used files first
+            os.utime(local_path)
+            return local_path
+
+        # Download next to the final path and rename, so concurrent readers
+        # never see a partial file
+        partial_path = f"{local_path}.{uuid.uuid4().hex}.part"
+        try:
+            self.storage_service.s3_client.download_file(
+                settings.AWS_BUCKET_NAME,
+                storage_path,
+                partial_path,
+                ExtraArgs={'IfMatch': f'"{etag}"'} if etag else None
+            )
+            os.replace(partial_path, local_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.unlink(partial_path)
+        self.prune()
+        return local_path
+
+    def fetch_ranges(self, storage_path: str, byte_ranges: ByteRanges, etag: Optional[str] = None) -> str:
+        """
+        Return a local sparse copy of a storage object holding its header
+        boxes and only the given byte ranges of its media data, fetched with
+        ranged GETs. Decoders seeking within the ranges never read the holes.
+        A fully cached copy is used instead when there is one. With an etag,
+        every read must hit that version, so a copy never mixes old and new
+        content.
+        """
+        full_path = self.path_for(storage_path, etag)
+        if os.path.exists(full_path):
+            os.utime(full_path)
+            return full_path
+
+        root, extension = os.path.splitext(full_path)
+        suffix = "_".join(f"{start}-{end if end is not None else 'end'}" for start, end in byte_ranges)
+        local_path = f"{root}_{suffix}{extension}"
+        if os.path.exists(local_path):
+            os.utime(local_path)
+            return local_path
+
+        def read_range(offset: int, length: int) -> bytes:
+            return self.storage_service.read_range(storage_path, offset, length, etag)
+
+        conditions = {'IfMatch': f'"{etag}"'} if etag else {}
+        file_size = self.storage_service.s3_client.head_object(
+            Bucket=settings.AWS_BUCKET_NAME,
+            Key=storage_path,
+            **conditions
+        )['ContentLength']
+
+        partial_path = f"{local_path}.{uuid.uuid4().hex}.part"
+        try:
+            with open(partial_path, "wb") as local_file:
+                local_file.truncate(file_size)
+
+                def copy(start: int, end: int) -> None:
+                    for offset in range(start, end, RANGE_CHUNK_BYTES):
+                        local_file.seek(offset)
+                        local_file.write(read_range(offset, min(RANGE_CHUNK_BYTES, end - offset)))
+
+                for box_type, offset, size in iter_top_level_boxes(read_range, file_size):
+                    if box_type != b"mdat":
+                        copy(offset, offset + size)
+                        continue
+                    for start, end in byte_ranges:
+                        start = max(start, offset)
+                        end = min(offset + size if end is None else end, offset + size)
+                        if end > start:
+                            copy(start, end)
+            os.replace(partial_path, local_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.unlink(partial_path)
+        self.prune()
+        return local_path
+
+    def stream_url(self, storage_path: str) -> str:
+        """
+        Presigned URL ffmpeg can decode a storage object from directly; it
+        issues ranged requests as it reads and seeks. URLs come from the
+        process-wide download URL cache, so every render and request in the
+        process reuses them.
+        """
+        return self.storage_service.signed_download_url(storage_path, settings.RENDER_STREAM_URL_EXPIRE)
+
+    def resolve(self, segment: RenderSegment) -> str:
+        """
+        Path or URL to render a segment from. A fully cached copy is used
+        when there is one; otherwise the segment is streamed from storage
+        when RENDER_STREAM_INPUTS is set, or fetched, only the ranges it
+        reads when those are known.
+        """
+        if settings.RENDER_STREAM_INPUTS:
+            full_path = self.path_for(segment.storage_path, segment.etag)
+            if os.path.exists(full_path):
+                os.utime(full_path)
+                return full_path
+            return self.stream_url(segment.storage_path)
+        if segment.byte_ranges:
+            return self.fetch_ranges(segment.storage_path, segment.byte_ranges, segment.etag)
+        return self.fetch(segment.storage_path, segment.etag)
+
+    def warm(self, sources: Iterable[Tuple[str, Optional[str]]]) -> None:
+        """Download (storage_path, etag) sources ahead of a render, ignoring individual failures"""
+        for storage_path, etag in sources:
+            try:
+                self.fetch(storage_path, etag)
+            except Exception as e:
+                logger.error(f"Error warming segment cache for {storage_path}: {str(e)}")
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Evict least recently used files until the cache fits its size budget.
+        Runs after every download; files open in a render stay readable.
+        """
+        max_bytes = settings.SEGMENT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".part"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            # Sparse copies only occupy the blocks that were written
+            size = min(stat.st_size, stat.st_blocks * 512)
+            entries.append((stat.st_mtime, size, path))
+            total += size
+
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+                evicted += 1
+            except FileNotFoundError:
+                pass
+        return evicted
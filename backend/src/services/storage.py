@@ -1,25 +1,142 @@
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Dict, Iterable
 import os
+import time
+import asyncio
 import logging
+import threading
+import functools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from fastapi import HTTPException, status
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+_s3_client = None
+_s3_client_pid: Optional[int] = None
+_s3_client_lock = threading.Lock()
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_pid: Optional[int] = None
+
+def create_s3_client():
+    """Create an S3 client with the pooled connection settings"""
+    return boto3.session.Session().client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION,
+        config=Config(
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            retries={'max_attempts': settings.S3_MAX_ATTEMPTS, 'mode': 'standard'},
+            tcp_keepalive=True
+        )
+    )
+
+def get_s3_client():
+    """
+    The process-wide S3 client, created on first use. Clients are
+    thread-safe but their connections must not cross a fork, so each
+    process (ingest and render workers included) gets its own.
+    """
+    global _s3_client, _s3_client_pid
+    pid = os.getpid()
+    if _s3_client is None or _s3_client_pid != pid:
+        with _s3_client_lock:
+            if _s3_client is None or _s3_client_pid != pid:
+                _s3_client = create_s3_client()
+                _s3_client_pid = pid
+    return _s3_client
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor, _io_executor_pid
+    pid = os.getpid()
+    if _io_executor is None or _io_executor_pid != pid:
+        with _s3_client_lock:
+            if _io_executor is None or _io_executor_pid != pid:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=max(settings.STORAGE_IO_THREADS, 1),
+                    thread_name_prefix="storage-io"
+                )
+                _io_executor_pid = pid
+    return _io_executor
+
+async def run_storage_io(function, *args, **kwargs):
+    """
+    Run a blocking S3 call on the bounded storage I/O pool so the event
+    loop keeps serving requests during the round trip
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_io_executor(), functools.partial(function, *args, **kwargs))
+
+def shutdown_storage_io() -> None:
+    """Stop the storage I/O threads once in-flight calls finish"""
+    global _io_executor
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=False)
+        _io_executor = None
+
+class PresignedUrlCache:
+    """
+    LRU cache of presigned download URLs by object key and lifetime. A URL
+    is reused until margin seconds before it expires, so clients always get
+    at least that long to start the download.
+    """
+
+    def __init__(self, max_entries: int, margin: int):
+        self.max_entries = max_entries
+        self.margin = margin
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, object_key: str, expiration: int) -> Optional[str]:
+        """A still-fresh URL for the object, or None"""
+        key = (object_key, expiration)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            url, reuse_until = entry
+            if time.monotonic() >= reuse_until:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return url
+
+    def put(self, object_key: str, expiration: int, url: str, signed_at: float) -> None:
+        """Remember a URL signed at signed_at (time.monotonic) for expiration seconds"""
+        if expiration <= self.margin or self.max_entries <= 0:
+            return
+        key = (object_key, expiration)
+        with self._lock:
+            self._entries[key] = (url, signed_at + expiration - self.margin)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, object_key: str) -> None:
+        """Forget every URL of an object"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == object_key]:
+                del self._entries[key]
+
+_download_urls = PresignedUrlCache(settings.DOWNLOAD_URL_CACHE_SIZE, settings.DOWNLOAD_URL_EXPIRY_MARGIN)
+
+def discard_download_urls(object_keys: Iterable[str]) -> None:
+    """Stop handing out cached URLs for objects that are being deleted"""
+    for object_key in object_keys:
+        _download_urls.discard(object_key)
+
 class StorageService:
     """Service for handling S3 storage operations"""
 
     def __init__(self):
-        """Initialize S3 client"""
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
+        """Use the shared S3 client"""
+        self.s3_client = get_s3_client()
         self.bucket_name = settings.AWS_BUCKET_NAME
 
     async def generate_presigned_url(
@@ -37,7 +154,8 @@ class StorageService:
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
             final_object_key = f"{object_key.rsplit('.', 1)[0]}_{timestamp}.{object_key.rsplit('.', 1)[1]}"
             
-            url = self.s3_client.generate_presigned_url(
+            url = await run_storage_io(
+                self.s3_client.generate_presigned_url,
                 ClientMethod=operation,
                 Params={
                     'Bucket': self.bucket_name,
@@ -56,8 +174,10 @@ class StorageService:
 
     async def delete_file(self, object_key: str) -> bool:
         """Delete a file from S3"""
+        _download_urls.discard(object_key)
         try:
-            self.s3_client.delete_object(
+            await run_storage_io(
+                self.s3_client.delete_object,
                 Bucket=self.bucket_name,
                 Key=object_key
             )
@@ -69,10 +189,38 @@ class StorageService:
                 detail="Failed to delete file"
             )
 
+    def cached_download_url(self, object_key: str, expiration: int = 3600) -> Optional[str]:
+        """A previously signed download URL that is still fresh, or None"""
+        return _download_urls.get(object_key, expiration)
+
+    def signed_download_url(self, object_key: str, expiration: int = 3600) -> str:
+        """
+        Blocking get_download_url for code already off the event loop, such
+        as renders; shares the same process-wide URL cache
+        """
+        url = _download_urls.get(object_key, expiration)
+        if url is None:
+            signed_at = time.monotonic()
+            url = self.s3_client.generate_presigned_url(
+                ClientMethod='get_object',
+                Params={'Bucket': self.bucket_name, 'Key': object_key},
+                ExpiresIn=expiration
+            )
+            _download_urls.put(object_key, expiration, url, signed_at)
+        return url
+
     async def get_download_url(self, object_key: str, expiration: int = 3600) -> str:
-        """Generate a presigned URL for downloading/viewing a file"""
+        """
+        Get a presigned URL for downloading/viewing a file, reusing a cached
+        one until shortly before it expires
+        """
+        url = _download_urls.get(object_key, expiration)
+        if url is not None:
+            return url
         try:
-            url = self.s3_client.generate_presigned_url(
+            signed_at = time.monotonic()
+            url = await run_storage_io(
+                self.s3_client.generate_presigned_url,
                 ClientMethod='get_object',
                 Params={
                     'Bucket': self.bucket_name,
@@ -80,6 +228,7 @@ class StorageService:
                 },
                 ExpiresIn=expiration
             )
+            _download_urls.put(object_key, expiration, url, signed_at)
             return url
         except ClientError as e:
             logger.error(f"Error generating download URL: {str(e)}")
@@ -88,10 +237,52 @@ class StorageService:
                 detail="Failed to generate download URL"
             )
 
+    async def get_download_urls(self, object_keys: Iterable[str], expiration: int = 3600) -> Dict[str, str]:
+        """
+        Presigned download URLs for many files, by object key. Cached URLs
+        are reused and the rest are signed together in one pass on the
+        storage I/O pool.
+        """
+        urls: Dict[str, str] = {}
+        missing = []
+        for object_key in dict.fromkeys(object_keys):
+            url = _download_urls.get(object_key, expiration)
+            if url is None:
+                missing.append(object_key)
+            else:
+                urls[object_key] = url
+        if not missing:
+            return urls
+
+        def sign_all() -> Dict[str, str]:
+            return {
+                object_key: self.s3_client.generate_presigned_url(
+                    ClientMethod='get_object',
+                    Params={'Bucket': self.bucket_name, 'Key': object_key},
+                    ExpiresIn=expiration
+                )
+                for object_key in missing
+            }
+
+        try:
+            signed_at = time.monotonic()
+            signed = await run_storage_io(sign_all)
+        except ClientError as e:
+            logger.error(f"Error generating download URLs: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate download URL"
+            )
+        for object_key, url in signed.items():
+            _download_urls.put(object_key, expiration, url, signed_at)
+        urls.update(signed)
+        return urls
+
     async def check_file_exists(self, object_key: str) -> bool:
         """Check if a file exists in S3"""
         try:
-            self.s3_client.head_object(
+            await run_storage_io(
+                self.s3_client.head_object,
                 Bucket=self.bucket_name,
                 Key=object_key
             )
@@ -108,11 +299,67 @@ class StorageService:
     async def get_file_size(self, object_key: str) -> Optional[int]:
         """Get the size of a file in S3"""
         try:
-            response = self.s3_client.head_object(
+            response = await run_storage_io(
+                self.s3_client.head_object,
                 Bucket=self.bucket_name,
                 Key=object_key
             )
             return response['ContentLength']
         except ClientError as e:
             logger.error(f"Error getting file size: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
+
+    async def get_etag(self, object_key: str) -> Optional[str]:
+        """Get the ETag of a file in S3, without quotes"""
+        try:
+            response = await run_storage_io(
+                self.s3_client.head_object,
+                Bucket=self.bucket_name,
+                Key=object_key
+            )
+            return response['ETag'].strip('"')
+        except ClientError as e:
+            logger.error(f"Error getting file ETag: {str(e)}")
+            return None
+
+    async def read_file(self, object_key: str) -> bytes:
+        """Read a whole (small) file from S3"""
+        try:
+            response = await run_storage_io(
+                self.s3_client.get_object,
+                Bucket=self.bucket_name,
+                Key=object_key
+            )
+            return await run_storage_io(response['Body'].read)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="File not found"
+                )
+            logger.error(f"Error reading file from S3: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to read file"
+            )
+
+    def read_range(self, object_key: str, offset: int, length: int, etag: Optional[str] = None) -> bytes:
+        """
+        Read length bytes of a file starting at offset with a ranged GET.
+        With an etag, the read fails unless the object is still that version.
+        """
+        try:
+            conditions = {'IfMatch': f'"{etag}"'} if etag else {}
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=object_key,
+                Range=f"bytes={offset}-{offset + length - 1}",
+                **conditions
+            )
+            return response['Body'].read()
+        except ClientError as e:
+            logger.error(f"Error reading file range from S3: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to read file"
+            )
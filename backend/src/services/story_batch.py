@@ -0,0 +1,366 @@
+import math
+import random
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_
+from fastapi import HTTPException, status
+
+from models.story import (
+    StoryTemplate,
+    VideoSegment,
+    GeneratedStory,
+    GeneratedStorySegment,
+    StoryBatch
+)
+from schemas.story import StoryBatchRequest
+from services.storage import StorageService
+from services.segment_cache import SegmentCache
+from services.previews import preview_storage_paths
+from services.renderer import ClipCache
+from services.render_plan import RenderPlan
+from services.render_cost import get_cost_model
+from services.story_generation import render_story_job, build_generation_status, check_render_capacity
+from services.story_events import notify_story_status
+from config.database import SessionLocal
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# (story_id, storage_path, metadata, error) for each rendered story
+RenderResult = Tuple[int, Optional[str], Optional[Dict[str, Any]], Optional[str]]
+
+class StoryBatchService:
+    """Service for planning and tracking batch story generation"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def create_batch(self, user_id: int, request: StoryBatchRequest) -> StoryBatch:
+        """
+        Plan every story in a batch up front.
+        Candidates for each step are loaded once and shared by all stories.
+        Refused with 503 while renders are over capacity, like single stories.
+        """
+        template = self.db.query(StoryTemplate).filter(
+            and_(
+                StoryTemplate.id == request.template_id,
+                StoryTemplate.is_active == True
+            )
+        ).first()
+
+        if not template:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Template not found or inactive"
+            )
+
+        check_render_capacity(self.db)
+
+        steps = sorted(template.steps, key=lambda x: x.order)
+        candidates = {}
+        for step in steps:
+            candidates[step.id] = self.db.query(
+                VideoSegment.id,
+                VideoSegment.suggested_start_time,
+                VideoSegment.suggested_end_time
+            ).filter(
+                and_(
+                    VideoSegment.step_id == step.id,
+                    VideoSegment.is_approved == True,
+                    VideoSegment.processing_status == 'completed',
+                    VideoSegment.user_id != user_id
+                )
+            ).all()
+            if not candidates[step.id]:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"No approved video segments available for step {step.id}"
+                )
+
+        try:
+            batch = StoryBatch(
+                template_id=template.id,
+                user_id=user_id,
+                resolution=request.preferred_resolution,
+                transition_type=request.transition_type,
+                transition_duration=request.transition_duration,
+                status='pending',
+                total_count=request.count,
+                completed_count=0,
+                failed_count=0
+            )
+            self.db.add(batch)
+
+            for index in range(request.count):
+                story = GeneratedStory(
+                    template_id=template.id,
+                    user_id=user_id,
+                    batch=batch,
+                    title=f"{request.title} #{index + 1}" if request.count > 1 else request.title,
+                    description=request.description,
+                    status='pending'
+                )
+                story.segments = []
+                for step in steps:
+                    candidate = random.choice(candidates[step.id])
+                    story.segments.append(GeneratedStorySegment(
+                        step_id=step.id,
+                        video_segment_id=candidate.id,
+                        order=step.order,
+                        start_time=candidate.suggested_start_time,
+                        end_time=candidate.suggested_end_time,
+                        transition_type=request.transition_type,
+                        transition_duration=request.transition_duration
+                    ))
+                self.db.add(story)
+
+            self.db.commit()
+            self.db.refresh(batch)
+            return batch
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error creating story batch: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to create story batch"
+            )
+
+    async def get_batch_status(self, batch_id: int, user_id: int) -> Dict[str, Any]:
+        """Get progress of a batch owned by the user"""
+        batch = self.db.query(StoryBatch).filter(
+            and_(
+                StoryBatch.id == batch_id,
+                StoryBatch.user_id == user_id
+            )
+        ).first()
+
+        if not batch:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Batch not found"
+            )
+
+        story_ids = [
+            story_id for story_id, in self.db.query(GeneratedStory.id).filter(
+                GeneratedStory.batch_id == batch.id
+            ).order_by(GeneratedStory.id)
+        ]
+        return {
+            "id": batch.id,
+            "template_id": batch.template_id,
+            "status": batch.status,
+            "total_count": batch.total_count,
+            "completed_count": batch.completed_count,
+            "failed_count": batch.failed_count,
+            "progress": (batch.completed_count + batch.failed_count) / batch.total_count,
+            "error_message": batch.error_message,
+            "story_ids": story_ids,
+            "created_at": batch.created_at,
+            "updated_at": batch.updated_at
+        }
+
+# Render processes shared by every batch in this process, so concurrent
+# batches queue for the same BATCH_RENDER_PROCESSES workers
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=max(settings.BATCH_RENDER_PROCESSES, 1),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _render_pool
+
+def _discard_render_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next batch starts fresh workers"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_render_pool() -> None:
+    """Stop the batch render workers; unfinished batch stories stay processing"""
+    global _render_pool
+    with _render_pool_lock:
+        pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+# Per worker process state, kept across chunks so segments decoded for one
+# chunk are reused by the next
+_worker_clip_cache: Optional[ClipCache] = None
+_worker_storage_service: Optional[StorageService] = None
+_worker_segment_cache: Optional[SegmentCache] = None
+
+def _render_batch_chunk(jobs: List[Tuple[int, RenderPlan]]) -> List[RenderResult]:
+    """Worker process entry point: render a chunk of stories with a shared clip cache"""
+    global _worker_clip_cache, _worker_storage_service, _worker_segment_cache
+    if _worker_clip_cache is None:
+        _worker_clip_cache = ClipCache()
+        _worker_storage_service = StorageService()
+        _worker_segment_cache = SegmentCache(_worker_storage_service)
+
+    results = []
+    for story_id, plan in jobs:
+        try:
+            # Segments were downloaded by the parent, so fetch only resolves paths
+            storage_path, metadata = render_story_job(
+                plan,
+                _worker_storage_service,
+                _worker_segment_cache.resolve,
+                _worker_clip_cache
+            )
+            results.append((story_id, storage_path, metadata, None))
+        except Exception as e:
+            logger.error(f"Error rendering story {story_id}: {str(e)}")
+            results.append((story_id, None, None, str(e)))
+    return results
+
+def _record_results(db: Session, batch_id: int, results: List[RenderResult]) -> None:
+    """Store finished renders and bump the batch counters in one short transaction"""
+    completed = failed = 0
+    for story_id, storage_path, metadata, error in results:
+        story = db.query(GeneratedStory).filter(GeneratedStory.id == story_id).first()
+        if error:
+            story.status = 'failed'
+            story.error_message = "Failed to generate story video"
+            notify_story_status(db, story_id, build_generation_status('failed', None, story.error_message))
+            failed += 1
+            continue
+
+        previews = preview_storage_paths(storage_path)
+        story.storage_path = storage_path
+        story.thumbnail_path = previews.thumbnail_path
+        story.sprite_path = previews.sprite_path
+        story.sprite_vtt_path = previews.vtt_path
+        story.duration = metadata["duration"]
+        story.width = metadata["width"]
+        story.height = metadata["height"]
+        story.fps = metadata["fps"]
+        story.status = 'completed'
+        story.generation_metadata = {
+            **(story.generation_metadata or {}),
+            "generation_time": datetime.utcnow().isoformat(),
+            "stage_timings": metadata["stage_timings"]
+        }
+        notify_story_status(db, story_id, build_generation_status('completed', None))
+        completed += 1
+
+    db.query(StoryBatch).filter(StoryBatch.id == batch_id).update({
+        StoryBatch.completed_count: StoryBatch.completed_count + completed,
+        StoryBatch.failed_count: StoryBatch.failed_count + failed
+    }, synchronize_session=False)
+    db.commit()
+
+def run_story_batch(batch_id: int) -> None:
+    """
+    Render every story in a batch. Meant to run as a background task.
+    1. Download each distinct segment once
+    2. Spread renders over the shared render processes, keeping stories
+       that share segments in the same chunk so each worker decodes a
+       segment once
+    3. Record results as chunks finish
+    Each story's predicted render time is stored with it, so batches count
+    towards the render capacity checked before new work is accepted.
+    """
+    db = SessionLocal()
+    try:
+        batch = db.query(StoryBatch).filter(StoryBatch.id == batch_id).first()
+        if not batch:
+            logger.error(f"Story batch {batch_id} not found")
+            return
+
+        generation_metadata = {
+            "resolution": batch.resolution,
+            "transition_type": batch.transition_type,
+            "transition_duration": batch.transition_duration,
+            "batch_id": batch.id
+        }
+        stories = db.query(GeneratedStory).options(
+            selectinload(GeneratedStory.segments).selectinload(GeneratedStorySegment.video_segment)
+        ).filter(
+            and_(
+                GeneratedStory.batch_id == batch_id,
+                GeneratedStory.status == 'pending'
+            )
+        ).all()
+
+        # Plans are stored with each story and are all the workers receive
+        jobs = []
+        cost_model = get_cost_model(db)
+        render_started_at = datetime.utcnow().isoformat()
+        for story in stories:
+            plan = RenderPlan.from_story_segments(batch.resolution, story.segments)
+            story.generation_metadata = {
+                **generation_metadata,
+                "render_plan": plan.to_dict(),
+                "predicted_stage_seconds": cost_model.predict(plan),
+                "render_started_at": render_started_at
+            }
+            story.status = 'processing'
+            jobs.append((story.id, plan))
+
+        batch.status = 'processing'
+        db.commit()
+
+        # Download each distinct segment version once
+        segment_cache = SegmentCache()
+        sources = {(segment.storage_path, segment.etag) for _, plan in jobs for segment in plan.segments}
+        with ThreadPoolExecutor(max_workers=settings.BATCH_DOWNLOAD_THREADS) as download_pool:
+            list(download_pool.map(lambda source: segment_cache.fetch(*source), sources))
+
+        # Sorting by sources puts stories sharing leading segments next to each other
+        jobs.sort(key=lambda job: job[1].storage_paths)
+        processes = max(settings.BATCH_RENDER_PROCESSES, 1)
+        chunk_size = max(1, math.ceil(len(jobs) / (processes * 4)))
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+        executor = _get_render_pool()
+        futures = {
+            executor.submit(_render_batch_chunk, chunk): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.error(f"Batch render worker failed: {str(e)}")
+                if isinstance(e, BrokenProcessPool):
+                    _discard_render_pool(executor)
+                results = [(story_id, None, None, str(e)) for story_id, _ in futures[future]]
+            _record_results(db, batch_id, results)
+
+        batch = db.query(StoryBatch).filter(StoryBatch.id == batch_id).first()
+        batch.status = 'failed' if batch.completed_count == 0 and batch.failed_count else 'completed'
+        db.commit()
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error running story batch {batch_id}: {str(e)}")
+        db.query(GeneratedStory).filter(
+            and_(
+                GeneratedStory.batch_id == batch_id,
+                GeneratedStory.status.in_(['pending', 'processing'])
+            )
+        ).update({
+            GeneratedStory.status: 'failed',
+            GeneratedStory.error_message: "Failed to generate story video"
+        }, synchronize_session=False)
+        db.query(StoryBatch).filter(StoryBatch.id == batch_id).update({
+            StoryBatch.status: 'failed',
+            StoryBatch.error_message: "Failed to generate story batch"
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,121 @@
+"""
+Story generation status events.
+
+Render code publishes status updates with Postgres NOTIFY. Each API worker
+keeps a single LISTEN connection and fans notifications out to in-process
+subscribers, so an idle subscriber costs one asyncio queue rather than a
+database connection or a poll.
+"""
+import json
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Set, Optional, AsyncIterator
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+STORY_STATUS_CHANNEL = "story_status"
+
+def notify_story_status(db: Session, story_id: int, story_status: Dict[str, Any]) -> None:
+    """Queue a status notification; it is delivered when the session commits"""
+    payload = json.dumps({"story_id": story_id, **story_status})
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": STORY_STATUS_CHANNEL, "payload": payload}
+    )
+
+def publish_story_status(story_id: int, story_status: Dict[str, Any]) -> None:
+    """Publish a status notification in its own short transaction"""
+    db = SessionLocal()
+    try:
+        notify_story_status(db, story_id, story_status)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error publishing story status: {str(e)}")
+    finally:
+        db.close()
+
+class StoryEventBroker:
+    """Fans story status notifications out to subscribers in this process"""
+
+    def __init__(self):
+        self._connection = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+
+    def _connect(self) -> None:
+        """Open the LISTEN connection and watch it from the event loop"""
+        self._connection = psycopg2.connect(settings.DATABASE_URL)
+        self._connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with self._connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {STORY_STATUS_CHANNEL};")
+        self._loop.add_reader(self._connection.fileno(), self._on_readable)
+
+    def _disconnect(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._loop.remove_reader(self._connection.fileno())
+            self._connection.close()
+        except Exception as e:
+            logger.error(f"Error closing story event connection: {str(e)}")
+        self._connection = None
+
+    def _on_readable(self) -> None:
+        """Drain pending notifications and hand them to subscribers"""
+        try:
+            self._connection.poll()
+        except Exception as e:
+            logger.error(f"Story event connection lost: {str(e)}")
+            self._disconnect()
+            self._loop.call_later(settings.STORY_EVENTS_RECONNECT_DELAY, self._reconnect)
+            return
+
+        while self._connection.notifies:
+            notification = self._connection.notifies.pop(0)
+            try:
+                event = json.loads(notification.payload)
+            except ValueError:
+                continue
+            for queue in self._subscribers.get(event.get("story_id"), ()):
+                queue.put_nowait(event)
+
+    def _reconnect(self) -> None:
+        if self._connection is not None or not self._subscribers:
+            return
+        try:
+            self._connect()
+        except Exception as e:
+            logger.error(f"Error reconnecting story events: {str(e)}")
+            self._loop.call_later(settings.STORY_EVENTS_RECONNECT_DELAY, self._reconnect)
+
+    @asynccontextmanager
+    async def subscribe(self, story_id: int) -> AsyncIterator[asyncio.Queue]:
+        """Receive status events for a story until the context exits"""
+        if self._connection is None:
+            self._loop = asyncio.get_running_loop()
+            self._connect()
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(story_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(story_id)
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[story_id]
+
+    def close(self) -> None:
+        """Stop listening"""
+        self._disconnect()
+
+story_event_broker = StoryEventBroker()
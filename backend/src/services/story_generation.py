@@ -1,28 +1,182 @@
 import os
+import asyncio
 import logging
 import random
+import secrets
 import tempfile
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime
-from moviepy.editor import VideoFileClip, concatenate_videoclips, vfx
+import uuid
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from fastapi import HTTPException, status
+from fastapi import HTTPException, status, BackgroundTasks
 
 from models.story import (
     StoryTemplate,
     StoryStep,
     VideoSegment,
     GeneratedStory,
-    GeneratedStorySegment
+    GeneratedStorySegment,
+    PrerenderedStory,
+    StoryPlan
 )
-from schemas.story import StoryGenerationRequest, StoryGenerationStatus
+from schemas.story import StoryGenerationRequest, StoryGenerationStatus, StoryPrepareRequest
 from services.storage import StorageService
 from services.video import VideoService
+from services.prerender_pool import PrerenderPoolService
+from services.segment_cache import SegmentCache
+from services.renderer import ClipCache, StageTimer, render_story
+from services.previews import extract_previews, upload_previews, preview_storage_paths, signed_sprite_vtt
+from services.deletion_outbox import enqueue_artifact_deletion
+from services.media_probe import probe_mp4
+from services.render_plan import RenderPlan, RenderSegment
+from services.render_cost import get_cost_model
+from services.story_events import notify_story_status, publish_story_status
+from config.database import SessionLocal
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+def render_story_job(
+    plan: RenderPlan,
+    storage_service: StorageService,
+    resolve_path: Callable[[RenderSegment], str],
+    clip_cache: Optional[ClipCache] = None,
+    on_stage: Optional[Callable[[str], None]] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Render a story plan, then upload the video and its previews.
+    on_stage is called with the name of each step as it starts.
+    Never touches the database, so it can run in a worker process.
+    Returns tuple of (storage_path, metadata); metadata includes per-stage timings.
+    """
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Generate output path
+        output_filename = f"story_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.mp4"
+        output_path = os.path.join(temp_dir, output_filename)
+
+        metadata = render_story(plan, resolve_path, output_path, clip_cache, timer, on_stage)
+
+        # Upload to S3
+        if on_stage:
+            on_stage("upload")
+        s3_path = f"generated_stories/{output_filename}"
+        with timer.stage("upload"), open(output_path, 'rb') as video_file:
+            storage_service.s3_client.upload_fileobj(
+                video_file,
+                settings.AWS_BUCKET_NAME,
+                s3_path,
+                ExtraArgs={'ContentType': 'video/mp4'}
+            )
+
+        # Generate thumbnail and scrubber sprite from the output's keyframes
+        if on_stage:
+            on_stage("thumbnail")
+        with timer.stage("thumbnail"):
+            previews = extract_previews(
+                output_path,
+                metadata["duration"],
+                metadata["width"],
+                metadata["height"],
+                temp_dir,
+                probe_mp4(output_path).keyframe_times
+            )
+            upload_previews(storage_service, previews, s3_path)
+
+        metadata["stage_timings"] = timer.as_dict()
+        return s3_path, metadata
+
+def build_generation_status(
+    story_status: str,
+    generation_metadata: Optional[Dict[str, Any]],
+    error_message: Optional[str] = None,
+    current_step: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build a StoryGenerationStatus payload.
+    Progress and remaining time are estimated from the cost model
+    prediction stored when the story was planned.
+    """
+    if story_status == 'completed':
+        return {"status": story_status, "progress": 1.0, "estimated_time_remaining": 0}
+    if story_status == 'failed':
+        return {"status": story_status, "error_message": error_message}
+
+    metadata = generation_metadata or {}
+    predicted = metadata.get("predicted_stage_seconds")
+    started_at = metadata.get("render_started_at")
+    if not predicted or not started_at or not predicted.get("total"):
+        return {"status": story_status, "current_step": current_step}
+
+    elapsed = (datetime.utcnow() - datetime.fromisoformat(started_at)).total_seconds()
+
+    # Decode, resize and encode run interleaved, so they are reported as one step
+    if current_step is None:
+        phases = [
+            ("download", ["download"]),
+            ("encode", ["decode", "resize", "encode"]),
+            ("upload", ["upload"]),
+            ("thumbnail", ["thumbnail"])
+        ]
+        current_step = phases[-1][0]
+        cumulative = 0.0
+        for phase, stages in phases:
+            cumulative += sum(predicted.get(stage, 0.0) for stage in stages)
+            if elapsed < cumulative:
+                current_step = phase
+                break
+
+    total = predicted["total"]
+    return {
+        "status": story_status,
+        "progress": min(elapsed / total, 0.99),
+        "current_step": current_step,
+        "estimated_time_remaining": int(max(total - elapsed, 0.0))
+    }
+
+def check_render_capacity(db: Session) -> None:
+    """
+    Refuse new renders, single or batch, while the predicted in-flight
+    render time is over budget
+    """
+    if not settings.RENDER_MAX_BACKLOG_SECONDS:
+        return
+
+    backlog = 0.0
+    now = datetime.utcnow()
+    rows = db.query(GeneratedStory.generation_metadata).filter(
+        GeneratedStory.status == 'processing'
+    ).all()
+    for metadata, in rows:
+        metadata = metadata or {}
+        predicted = metadata.get("predicted_stage_seconds", {}).get("total")
+        started_at = metadata.get("render_started_at")
+        if predicted is None or started_at is None:
+            continue
+        elapsed = (now - datetime.fromisoformat(started_at)).total_seconds()
+        backlog += max(predicted - elapsed, 0.0)
+
+    if backlog > settings.RENDER_MAX_BACKLOG_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Story rendering is at capacity, please try again later",
+            headers={"Retry-After": str(int(backlog - settings.RENDER_MAX_BACKLOG_SECONDS) + 1)}
+        )
+
+async def render_story_in_background(story_id: int, plan: RenderPlan) -> None:
+    """Background task: render a planned story with its own session"""
+    db = SessionLocal()
+    try:
+        await StoryGenerationService(db).render_planned_story(story_id, plan)
+    except HTTPException:
+        # Already recorded on the story and published to subscribers
+        pass
+    except Exception as e:
+        logger.error(f"Error rendering story {story_id} in background: {str(e)}")
+    finally:
+        db.close()
+
 class StoryGenerationService:
     """Service for handling story generation operations"""
 
@@ -30,6 +184,7 @@ class StoryGenerationService:
         self.db = db
         self.storage_service = StorageService()
         self.video_service = VideoService(db)
+        self.segment_cache = SegmentCache(self.storage_service)
 
     async def _select_random_segment(
         self,
@@ -57,117 +212,23 @@ class StoryGenerationService:
 
         return random.choice(segments)
 
-    async def _apply_transition(
-        self,
-        clip: VideoFileClip,
-        transition_type: str,
-        transition_duration: float
-    ) -> VideoFileClip:
-        """Apply transition effect to video clip"""
-        if transition_type == "fade":
-            clip = clip.fadein(transition_duration).fadeout(transition_duration)
-        elif transition_type == "dissolve":
-            # Implement dissolve transition
-            pass
-        # Add more transition types as needed
-        return clip
-
     async def _concatenate_videos(
         self,
-        segments: List[GeneratedStorySegment],
-        preferred_resolution: str
+        plan: RenderPlan,
+        on_stage: Optional[Callable[[str], None]] = None
     ) -> Tuple[str, Dict[str, Any]]:
         """Concatenate video segments into final story"""
         try:
-            clips = []
-            target_height = 1080 if preferred_resolution == "1080p" else 720
-
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Download and process each segment
-                for segment in segments:
-                    # Download video
-                    temp_path = os.path.join(temp_dir, f"segment_{segment.order}.mp4")
-                    self.storage_service.s3_client.download_file(
-                        settings.AWS_BUCKET_NAME,
-                        segment.video_segment.storage_path,
-                        temp_path
-                    )
-
-                    # Load and process clip
-                    clip = VideoFileClip(temp_path)
-                    
-                    # Apply customizations
-                    if segment.start_time is not None and segment.end_time is not None:
-                        clip = clip.subclip(segment.start_time, segment.end_time)
-                    
-                    # Resize if needed
-                    if clip.h != target_height:
-                        clip = clip.resize(height=target_height)
-                    
-                    # Apply volume adjustment
-                    if segment.volume_adjustment != 1.0:
-                        clip = clip.volumex(segment.volume_adjustment)
-                    
-                    # Apply transitions
-                    if segment.transition_type and segment.transition_duration:
-                        clip = await self._apply_transition(
-                            clip,
-                            segment.transition_type,
-                            segment.transition_duration
-                        )
-                    
-                    clips.append(clip)
-
-                # Concatenate all clips
-                final_clip = concatenate_videoclips(clips, method="compose")
-                
-                # Generate output path
-                output_filename = f"story_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.mp4"
-                output_path = os.path.join(temp_dir, output_filename)
-                
-                # Write final video
-                final_clip.write_videofile(
-                    output_path,
-                    codec='libx264',
-                    audio_codec='aac',
-                    temp_audiofile='temp-audio.m4a',
-                    remove_temp=True
-                )
-
-                # Extract metadata
-                metadata = {
-                    "duration": final_clip.duration,
-                    "width": final_clip.w,
-                    "height": final_clip.h,
-                    "fps": final_clip.fps
-                }
-
-                # Upload to S3
-                s3_path = f"generated_stories/{output_filename}"
-                with open(output_path, 'rb') as video_file:
-                    self.storage_service.s3_client.upload_fileobj(
-                        video_file,
-                        settings.AWS_BUCKET_NAME,
-                        s3_path,
-                        ExtraArgs={'ContentType': 'video/mp4'}
-                    )
-
-                # Generate thumbnail
-                thumbnail_data = await self.video_service.generate_thumbnail(output_path)
-                thumbnail_key = f"{s3_path}_thumb.jpg"
-                self.storage_service.s3_client.put_object(
-                    Bucket=settings.AWS_BUCKET_NAME,
-                    Key=thumbnail_key,
-                    Body=thumbnail_data,
-                    ContentType='image/jpeg'
-                )
-
-                # Clean up
-                for clip in clips:
-                    clip.close()
-                final_clip.close()
-
-                return s3_path, metadata
+            # Render off the event loop; segments already downloaded by
+            # prepare or other renders are reused from the cache
+            return await asyncio.to_thread(
+                render_story_job,
+                plan,
+                self.storage_service,
+                self.segment_cache.resolve,
+                None,
+                on_stage
+            )
 
         except Exception as e:
             logger.error(f"Error concatenating videos: {str(e)}")
@@ -176,12 +237,251 @@ class StoryGenerationService:
                 detail="Failed to generate story video"
             )
 
-    async def generate_story(
+    async def prepare_story(
+        self,
+        user_id: int,
+        request: StoryPrepareRequest,
+        background_tasks: BackgroundTasks
+    ) -> StoryPlan:
+        """
+        Select segments for a story before the user asks to generate it.
+        The selection is pinned to a plan token and the segments are
+        downloaded to the local cache in the background.
+        """
+        template = self.db.query(StoryTemplate).filter(
+            and_(
+                StoryTemplate.id == request.template_id,
+                StoryTemplate.is_active == True
+            )
+        ).first()
+
+        if not template:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Template not found or inactive"
+            )
+
+        video_segments = []
+        for step in sorted(template.steps, key=lambda x: x.order):
+            video_segments.append(await self._select_random_segment(step.id, [user_id]))
+
+        plan = StoryPlan(
+            token=secrets.token_urlsafe(32),
+            user_id=user_id,
+            template_id=template.id,
+            segment_ids=[segment.id for segment in video_segments],
+            expires_at=datetime.utcnow() + timedelta(seconds=settings.STORY_PLAN_TTL)
+        )
+        self.db.add(plan)
+        self.db.commit()
+        self.db.refresh(plan)
+
+        # Streamed renders read straight from storage, so there is nothing to warm
+        if not settings.RENDER_STREAM_INPUTS:
+            background_tasks.add_task(
+                self.segment_cache.warm,
+                [(segment.storage_path, segment.etag) for segment in video_segments]
+            )
+        return plan
+
+    async def _redeem_plan(
         self,
+        plan_token: str,
+        user_id: int,
+        template_id: int
+    ) -> Dict[int, VideoSegment]:
+        """
+        Consume a plan token and return its pinned segments keyed by step ID.
+        Segments that are no longer usable are left out so the caller selects
+        replacements; an unknown or expired token yields no segments.
+        """
+        plan = self.db.query(StoryPlan).filter(
+            and_(
+                StoryPlan.token == plan_token,
+                StoryPlan.user_id == user_id,
+                StoryPlan.template_id == template_id
+            )
+        ).first()
+
+        if not plan:
+            logger.warning("Story plan not found, selecting segments on demand")
+            return {}
+
+        self.db.delete(plan)
+        if plan.expires_at <= datetime.utcnow():
+            return {}
+
+        video_segments = self.db.query(VideoSegment).filter(
+            and_(
+                VideoSegment.id.in_(plan.segment_ids),
+                VideoSegment.is_approved == True,
+                VideoSegment.processing_status == 'completed'
+            )
+        ).all()
+        return {segment.step_id: segment for segment in video_segments}
+
+    async def prerender_story(self, template_id: int, resolution: str) -> PrerenderedStory:
+        """Render a random story for a template and add it to the pre-render pool"""
+        template = self.db.query(StoryTemplate).filter(
+            and_(
+                StoryTemplate.id == template_id,
+                StoryTemplate.is_active == True
+            )
+        ).first()
+
+        if not template:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Template not found or inactive"
+            )
+
+        # Pool stories use the default transition so plain requests can claim them
+        transition_type = StoryGenerationRequest.model_fields["transition_type"].default
+        transition_duration = StoryGenerationRequest.model_fields["transition_duration"].default
+
+        segments = []
+        for step in sorted(template.steps, key=lambda x: x.order):
+            video_segment = await self._select_random_segment(step.id)
+            segments.append(GeneratedStorySegment(
+                step_id=step.id,
+                video_segment=video_segment,
+                order=step.order,
+                start_time=video_segment.suggested_start_time,
+                end_time=video_segment.suggested_end_time,
+                transition_type=transition_type,
+                transition_duration=transition_duration
+            ))
+
+        plan = RenderPlan.from_story_segments(resolution, segments)
+        segment_ids = [segment.video_segment.id for segment in segments]
+        segment_user_ids = [segment.video_segment.user_id for segment in segments]
+        template_id = template.id
+
+        # End the read transaction so no connection is held while encoding
+        self.db.commit()
+        storage_path, metadata = await self._concatenate_videos(plan)
+
+        previews = preview_storage_paths(storage_path)
+        entry = PrerenderedStory(
+            template_id=template_id,
+            resolution=resolution,
+            transition_type=transition_type,
+            transition_duration=transition_duration,
+            storage_path=storage_path,
+            thumbnail_path=previews.thumbnail_path,
+            sprite_path=previews.sprite_path,
+            sprite_vtt_path=previews.vtt_path,
+            duration=metadata["duration"],
+            width=metadata["width"],
+            height=metadata["height"],
+            fps=metadata["fps"],
+            segment_ids=segment_ids,
+            segment_user_ids=segment_user_ids,
+            expires_at=datetime.utcnow() + timedelta(seconds=settings.PRERENDER_POOL_TTL)
+        )
+        self.db.add(entry)
+        self.db.commit()
+        return entry
+
+    async def _claim_prerendered_story(
+        self,
+        template: StoryTemplate,
         user_id: int,
         request: StoryGenerationRequest
+    ) -> Optional[GeneratedStory]:
+        """Turn a matching pre-rendered story into the user's story, if one is ready"""
+        pool = PrerenderPoolService(self.db)
+        try:
+            entry = await pool.claim(
+                template.id,
+                user_id,
+                request.preferred_resolution,
+                request.transition_type,
+                request.transition_duration
+            )
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error claiming pre-rendered story: {str(e)}")
+            return None
+
+        if not entry:
+            return None
+
+        # Steps may have changed since the entry was rendered
+        steps = {step.id: step for step in template.steps}
+        video_segments = {
+            row.id: row for row in self.db.query(
+                VideoSegment.id,
+                VideoSegment.step_id,
+                VideoSegment.suggested_start_time,
+                VideoSegment.suggested_end_time
+            ).filter(
+                VideoSegment.id.in_(entry.segment_ids)
+            ).all()
+        }
+        if any(
+            segment_id not in video_segments or video_segments[segment_id].step_id not in steps
+            for segment_id in entry.segment_ids
+        ):
+            await pool._discard([entry])
+            return None
+
+        story = GeneratedStory(
+            template_id=template.id,
+            user_id=user_id,
+            title=request.title,
+            description=request.description,
+            storage_path=entry.storage_path,
+            thumbnail_path=entry.thumbnail_path,
+            sprite_path=entry.sprite_path,
+            sprite_vtt_path=entry.sprite_vtt_path,
+            duration=entry.duration,
+            width=entry.width,
+            height=entry.height,
+            fps=entry.fps,
+            status='completed',
+            generation_metadata={
+                "resolution": entry.resolution,
+                "transition_type": entry.transition_type,
+                "transition_duration": entry.transition_duration,
+                "generation_time": entry.created_at.isoformat(),
+                "prerendered": True
+            }
+        )
+        self.db.add(story)
+        self.db.flush()
+
+        for segment_id in entry.segment_ids:
+            video_segment = video_segments[segment_id]
+            step = steps[video_segment.step_id]
+            self.db.add(GeneratedStorySegment(
+                story_id=story.id,
+                step_id=step.id,
+                video_segment_id=segment_id,
+                order=step.order,
+                start_time=video_segment.suggested_start_time,
+                end_time=video_segment.suggested_end_time,
+                transition_type=entry.transition_type,
+                transition_duration=entry.transition_duration
+            ))
+
+        # The rendered files now belong to the story
+        self.db.delete(entry)
+        self.db.commit()
+        self.db.refresh(story)
+        return story
+
+    async def generate_story(
+        self,
+        user_id: int,
+        request: StoryGenerationRequest,
+        background_tasks: Optional[BackgroundTasks] = None
     ) -> GeneratedStory:
-        """Generate a new story from template"""
+        """
+        Generate a new story from template.
+        With background_tasks the story is returned as soon as it is planned
+        and rendered afterwards; otherwise the render completes first.
+        """
         # Get template and validate
         template = self.db.query(StoryTemplate).filter(
             and_(
@@ -196,58 +496,156 @@ class StoryGenerationService:
                 detail="Template not found or inactive"
             )
 
+        # Serve from the pre-render pool when a matching story is ready
+        if settings.PRERENDER_POOL_ENABLED and template.id in settings.PRERENDER_POOL_TARGETS:
+            story = await self._claim_prerendered_story(template, user_id, request)
+            if story:
+                return story
+
+        check_render_capacity(self.db)
+
         try:
-            # Create story record
-            story = GeneratedStory(
-                template_id=template.id,
-                user_id=user_id,
-                title=request.title,
-                description=request.description,
-                status='processing'
+            story_id, plan = await self._plan_story(template, user_id, request)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error generating story: {str(e)}")
+            if isinstance(e, HTTPException):
+                raise e
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate story"
             )
-            self.db.add(story)
-            self.db.flush()
 
-            # Select random segments for each step
-            segments = []
-            excluded_user_ids = [user_id]  # Optionally exclude user's own videos
-            
-            for step in sorted(template.steps, key=lambda x: x.order):
+        if background_tasks is None:
+            return await self.render_planned_story(story_id, plan)
+
+        background_tasks.add_task(render_story_in_background, story_id, plan)
+        return self.db.query(GeneratedStory).filter(GeneratedStory.id == story_id).first()
+
+    async def _plan_story(
+        self,
+        template: StoryTemplate,
+        user_id: int,
+        request: StoryGenerationRequest
+    ) -> Tuple[int, RenderPlan]:
+        """
+        Create the story, its segments and its render plan in one short transaction.
+        Returns tuple of (story_id, plan).
+        """
+        # Create story record
+        story = GeneratedStory(
+            template_id=template.id,
+            user_id=user_id,
+            title=request.title,
+            description=request.description,
+            status='processing'
+        )
+        self.db.add(story)
+        self.db.flush()
+
+        # Use segments pinned by /prepare where still available
+        planned_segments = {}
+        if request.plan_token:
+            planned_segments = await self._redeem_plan(request.plan_token, user_id, template.id)
+
+        # Select random segments for each remaining step
+        segments = []
+        excluded_user_ids = [user_id]  # Optionally exclude user's own videos
+        
+        for step in sorted(template.steps, key=lambda x: x.order):
+            video_segment = planned_segments.get(step.id)
+            if video_segment is None:
                 video_segment = await self._select_random_segment(step.id, excluded_user_ids)
-                
-                segment = GeneratedStorySegment(
-                    story_id=story.id,
-                    step_id=step.id,
-                    video_segment_id=video_segment.id,
-                    order=step.order,
-                    transition_type=request.transition_type,
-                    transition_duration=request.transition_duration
-                )
-                self.db.add(segment)
-                segments.append(segment)
             
-            self.db.flush()
+            segment = GeneratedStorySegment(
+                story_id=story.id,
+                step_id=step.id,
+                video_segment=video_segment,
+                order=step.order,
+                start_time=video_segment.suggested_start_time,
+                end_time=video_segment.suggested_end_time,
+                transition_type=request.transition_type,
+                transition_duration=request.transition_duration
+            )
+            self.db.add(segment)
+            segments.append(segment)
+
+        # Everything the render needs, with no lazy loads during the render
+        plan = RenderPlan.from_story_segments(request.preferred_resolution, segments)
+        story.generation_metadata = {
+            "resolution": request.preferred_resolution,
+            "transition_type": request.transition_type,
+            "transition_duration": request.transition_duration,
+            "render_plan": plan.to_dict(),
+            "predicted_stage_seconds": get_cost_model(self.db).predict(plan),
+            "render_started_at": datetime.utcnow().isoformat()
+        }
+        notify_story_status(
+            self.db,
+            story.id,
+            build_generation_status('processing', story.generation_metadata, current_step="queued")
+        )
+
+        story_id = story.id
+        self.db.commit()
+        return story_id, plan
+
+    async def render_planned_story(self, story_id: int, plan: RenderPlan) -> GeneratedStory:
+        """
+        Render a committed plan and store the result.
+        The session holds no connection while encoding; the result is
+        written in a second short transaction. Status changes are
+        published to story event subscribers.
+        """
+        generation_metadata = self.db.query(GeneratedStory.generation_metadata).filter(
+            GeneratedStory.id == story_id
+        ).scalar()
+        self.db.commit()
 
-            # Concatenate videos
-            storage_path, metadata = await self._concatenate_videos(
-                segments,
-                request.preferred_resolution
+        def on_stage(stage: str) -> None:
+            publish_story_status(
+                story_id,
+                build_generation_status('processing', generation_metadata, current_step=stage)
             )
 
+        try:
+            storage_path, metadata = await self._concatenate_videos(plan, on_stage)
+        except Exception as e:
+            logger.error(f"Error generating story {story_id}: {str(e)}")
+            error_message = "Failed to generate story video"
+            self.db.query(GeneratedStory).filter(GeneratedStory.id == story_id).update({
+                GeneratedStory.status: 'failed',
+                GeneratedStory.error_message: error_message
+            }, synchronize_session=False)
+            notify_story_status(self.db, story_id, build_generation_status('failed', None, error_message))
+            self.db.commit()
+            if isinstance(e, HTTPException):
+                raise e
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate story"
+            )
+
+        try:
+            story = self.db.query(GeneratedStory).filter(GeneratedStory.id == story_id).first()
+
             # Update story with final data
+            previews = preview_storage_paths(storage_path)
             story.storage_path = storage_path
-            story.thumbnail_path = f"{storage_path}_thumb.jpg"
+            story.thumbnail_path = previews.thumbnail_path
+            story.sprite_path = previews.sprite_path
+            story.sprite_vtt_path = previews.vtt_path
             story.duration = metadata["duration"]
             story.width = metadata["width"]
             story.height = metadata["height"]
             story.fps = metadata["fps"]
             story.status = 'completed'
             story.generation_metadata = {
-                "resolution": request.preferred_resolution,
-                "transition_type": request.transition_type,
-                "transition_duration": request.transition_duration,
-                "generation_time": datetime.utcnow().isoformat()
+                **(story.generation_metadata or {}),
+                "generation_time": datetime.utcnow().isoformat(),
+                "stage_timings": metadata["stage_timings"]
             }
+            notify_story_status(self.db, story_id, build_generation_status('completed', None))
 
             self.db.commit()
             self.db.refresh(story)
@@ -255,14 +653,29 @@ class StoryGenerationService:
 
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error generating story: {str(e)}")
-            if isinstance(e, HTTPException):
-                raise e
+            logger.error(f"Error saving generated story {story_id}: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to generate story"
             )
 
+    async def get_generation_status(self, story_id: int, user_id: int) -> Dict[str, Any]:
+        """Get generation progress of a story"""
+        story = self.db.query(GeneratedStory).filter(
+            and_(
+                GeneratedStory.id == story_id,
+                GeneratedStory.user_id == user_id
+            )
+        ).first()
+
+        if not story:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Story not found"
+            )
+
+        return build_generation_status(story.status, story.generation_metadata, story.error_message)
+
     async def get_story(self, story_id: int, user_id: int) -> GeneratedStory:
         """Get a generated story by ID"""
         story = self.db.query(GeneratedStory).filter(
@@ -297,6 +710,37 @@ class StoryGenerationService:
         
         return stories, total
 
+    async def attach_urls(self, stories: List[GeneratedStory]) -> None:
+        """
+        Set presigned playback, thumbnail and sprite URLs on stories for the
+        response, signing every story's files in one pass, and the API path
+        of each story's WebVTT index
+        """
+        urls = await self.storage_service.get_download_urls(
+            path
+            for story in stories
+            for path in (story.storage_path, story.thumbnail_path, story.sprite_path)
+            if path
+        )
+        for story in stories:
+            story.playback_url = urls.get(story.storage_path)
+            story.thumbnail_url = urls.get(story.thumbnail_path)
+            story.sprite_url = urls.get(story.sprite_path)
+            if story.sprite_vtt_path:
+                story.sprite_vtt_url = f"{settings.API_V1_PREFIX}/stories/{story.id}/sprite.vtt"
+
+    async def get_sprite_vtt(self, story_id: int) -> str:
+        """A story's WebVTT scrubber index, pointing at a presigned sprite URL"""
+        story = self.db.query(GeneratedStory).filter(GeneratedStory.id == story_id).first()
+        if not story or not story.sprite_vtt_path or not story.sprite_path:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Story previews not found"
+            )
+        vtt_path, sprite_path = story.sprite_vtt_path, story.sprite_path
+        self.db.commit()
+        return await signed_sprite_vtt(self.storage_service, vtt_path, sprite_path)
+
     async def delete_story(self, story_id: int, user_id: int) -> bool:
         """Delete a generated story"""
         story = self.db.query(GeneratedStory).filter(
@@ -313,13 +757,8 @@ class StoryGenerationService:
             )
 
         try:
-            # Delete video and thumbnail from S3
-            if story.storage_path:
-                await self.storage_service.delete_file(story.storage_path)
-            if story.thumbnail_path:
-                await self.storage_service.delete_file(story.thumbnail_path)
-
-            # Delete from database
+            # Stored files are deleted by the outbox drainer once this commits
+            enqueue_artifact_deletion(self.db, story)
             self.db.delete(story)
             self.db.commit()
             return True
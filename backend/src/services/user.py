@@ -5,7 +5,7 @@ from sqlalchemy import or_, and_
 from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-from models.base import User
+from models.story import User
 from schemas.user import UserCreate, UserUpdate, UserSearchParams, UserProfileUpdate
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
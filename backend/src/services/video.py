@@ -1,20 +1,41 @@
 import os
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import unquote_plus
 from datetime import datetime
 import tempfile
 import asyncio
-from moviepy.editor import VideoFileClip
 import magic
-from fastapi import HTTPException, status
+from fastapi import HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.postgresql import insert
 
-from models.story import VideoSegment
-from services.storage import StorageService
+from models.story import VideoSegment, StoryStep, IngestEvent, GeneratedStory
+from schemas.video import VideoMetadata, VideoSegmentUpdate, VideoUploadComplete
+from services.storage import StorageService, run_storage_io
+from services.prerender_pool import PrerenderPoolService
+from services.segment_cache import SegmentCache
+from services.ingest import check_ingest_capacity, submit_ingest, parse_upload_object_key
+from services.previews import PreviewPaths, extract_previews, upload_previews, signed_sprite_vtt
+from services.deletion_outbox import enqueue_artifact_deletion
+from services.media_probe import (
+    ProbeResult, ProbeError, locate_box, parse_moov, probe_ffprobe, probe_video
+)
+from services.media_analysis import HASH_CHUNKS, analyze_video, hash_chunks, hamming_distance, sequence_agreement
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Near-duplicate thresholds. The video distance must stay below HASH_CHUNKS
+# for the chunk index to find every match; candidates must then agree on
+# their per-second hashes too.
+MAX_DUPLICATE_VIDEO_DISTANCE = 3
+MAX_DUPLICATE_FRAME_DISTANCE = 10  # bits, per second of the hash sequence
+MIN_DUPLICATE_SEQUENCE_AGREEMENT = 0.9  # share of seconds that must match
+MAX_DUPLICATE_AUDIO_DISTANCE = 8
+MAX_DUPLICATE_DURATION_DELTA = 0.5  # seconds
+
 class VideoService:
     """Service for handling video processing operations"""
 
@@ -22,40 +43,123 @@ class VideoService:
         self.db = db
         self.storage_service = StorageService()
 
+    def _build_metadata(self, probe: ProbeResult, mime_type: str) -> Dict[str, Any]:
+        """Check probed metadata against upload limits and flatten it"""
+        if probe.duration > settings.MAX_VIDEO_DURATION:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Video duration exceeds maximum of {settings.MAX_VIDEO_DURATION} seconds"
+            )
+
+        return {
+            "duration": probe.duration,
+            "width": probe.display_width,
+            "height": probe.display_height,
+            "fps": probe.fps,
+            "codec": probe.codec,
+            "bitrate": probe.bitrate,
+            "rotation": probe.rotation,
+            "audio_codec": probe.audio_codec,
+            "audio_channels": probe.audio_channels,
+            "audio_sample_rate": probe.audio_sample_rate,
+            "keyframe_times": list(probe.keyframe_times) or None,
+            "keyframe_offsets": list(probe.keyframe_offsets) or None,
+            "content_type": mime_type
+        }
+
+    def _check_mime_type(self, mime_type: str) -> None:
+        if mime_type not in settings.ALLOWED_VIDEO_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid file type. Allowed types: {settings.ALLOWED_VIDEO_TYPES}"
+            )
+
     async def validate_video(self, file_path: str) -> Dict[str, Any]:
         """
-        Validate video file and extract metadata.
+        Validate a local video file and extract metadata.
         Returns dict with metadata if valid, raises HTTPException if invalid.
         """
         try:
             # Check file type
             mime_type = magic.from_file(file_path, mime=True)
-            if mime_type not in settings.ALLOWED_VIDEO_TYPES:
+            self._check_mime_type(mime_type)
+
+            # Get video metadata from container headers
+            probe = await asyncio.to_thread(probe_video, file_path, settings.FFPROBE_BINARY)
+            return self._build_metadata(probe, mime_type)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error validating video: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid video file"
+            )
+
+    def _probe_remote(self, object_key: str, file_size: int, head: bytes) -> ProbeResult:
+        """
+        Probe a stored video with ranged reads: box headers are walked to
+        the moov box, which is the only part fetched. Containers without
+        one are probed by ffprobe over a presigned URL, which also reads
+        ranges.
+        """
+        def read_range(offset: int, length: int) -> bytes:
+            if offset + length <= len(head):
+                return head[offset:offset + length]
+            return self.storage_service.read_range(object_key, offset, length)
+
+        location = locate_box(read_range, file_size, b"moov")
+        if location is not None:
+            offset, size = location
+            try:
+                return parse_moov(read_range(offset, size), file_size)
+            except ProbeError as e:
+                logger.warning(f"Falling back to ffprobe for {object_key}: {str(e)}")
+
+        url = self.storage_service.s3_client.generate_presigned_url(
+            ClientMethod='get_object',
+            Params={'Bucket': self.storage_service.bucket_name, 'Key': object_key},
+            ExpiresIn=300
+        )
+        return probe_ffprobe(url, settings.FFPROBE_BINARY)
+
+    async def validate_remote_video(self, object_key: str) -> Dict[str, Any]:
+        """
+        Validate an uploaded video in place and extract metadata.
+        Only the object's size, leading bytes and header boxes are
+        transferred, so bad uploads are rejected without downloading them.
+        """
+        try:
+            # Check size
+            file_size = await self.storage_service.get_file_size(object_key)
+            if file_size is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Uploaded file not found"
+                )
+            if file_size > settings.MAX_UPLOAD_SIZE:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid file type. Allowed types: {settings.ALLOWED_VIDEO_TYPES}"
+                    detail=f"File exceeds maximum size of {settings.MAX_UPLOAD_SIZE} bytes"
                 )
 
-            # Get video metadata
-            with VideoFileClip(file_path) as video:
-                duration = video.duration
-                width = int(video.size[0])
-                height = int(video.size[1])
-
-                # Check duration
-                if duration > settings.MAX_VIDEO_DURATION:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Video duration exceeds maximum of {settings.MAX_VIDEO_DURATION} seconds"
-                    )
+            # Check file type from the leading bytes
+            head = await asyncio.to_thread(
+                self.storage_service.read_range,
+                object_key,
+                0,
+                min(settings.UPLOAD_SNIFF_BYTES, file_size)
+            )
+            mime_type = magic.from_buffer(head, mime=True)
+            self._check_mime_type(mime_type)
 
-                return {
-                    "duration": duration,
-                    "width": width,
-                    "height": height,
-                    "content_type": mime_type
-                }
+            # Get video metadata from container headers
+            probe = await asyncio.to_thread(self._probe_remote, object_key, file_size, head)
+            return self._build_metadata(probe, mime_type)
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error validating video: {str(e)}")
             raise HTTPException(
@@ -63,57 +167,361 @@ class VideoService:
                 detail="Invalid video file"
             )
 
-    async def process_video(
+    async def process_upload(
+        self,
+        upload_data: VideoUploadComplete,
+        user_id: int,
+        background_tasks: BackgroundTasks
+    ) -> VideoSegment:
+        """
+        Record a completed upload as a pending segment and queue it for ingestion.
+        Completing the same upload twice, or after its object-created
+        notification arrived, returns the existing segment.
+        """
+        if not upload_data.success:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=upload_data.error_message or "Upload failed"
+            )
+
+        # Only keys issued by upload-url can become segments
+        owner = parse_upload_object_key(upload_data.object_key)
+        if owner is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Object key is not an upload key"
+            )
+        if owner[0] != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access this video"
+            )
+        # Keys in the older layout do not name a step, so the client must
+        step_id = owner[1] if owner[1] is not None else upload_data.step_id
+        if step_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="step_id is required for this object key"
+            )
+        if upload_data.step_id is not None and upload_data.step_id != step_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Video was uploaded for a different story step"
+            )
+
+        etag = await self.storage_service.get_etag(upload_data.object_key)
+        if etag is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Uploaded video not found"
+            )
+
+        video_segment, queued = await self.record_upload(
+            upload_data.object_key, etag, user_id, step_id, 'complete-upload'
+        )
+        if queued:
+            # Queue once the response is on its way
+            background_tasks.add_task(submit_ingest, video_segment.id)
+        return video_segment
+
+    async def process_storage_notification(self, notification: Dict[str, Any]) -> int:
+        """
+        Record uploads announced by an S3-style object-created notification
+        and queue them for ingestion. Records for other buckets or events,
+        keys outside the upload convention (such as preview files), and keys
+        that do not name a story step are ignored; the latter are recorded by
+        complete-upload. Returns the number of segments queued.
+        """
+        queued_count = 0
+        for record in notification.get("Records") or []:
+            s3 = record.get("s3") or {}
+            if "ObjectCreated" not in record.get("eventName", ""):
+                continue
+            if (s3.get("bucket") or {}).get("name") != self.storage_service.bucket_name:
+                continue
+
+            s3_object = s3.get("object") or {}
+            object_key = unquote_plus(s3_object.get("key", ""))
+            etag = (s3_object.get("eTag") or s3_object.get("etag") or "").strip('"')
+            owner = parse_upload_object_key(object_key)
+            if not owner or owner[1] is None or not etag:
+                continue
+
+            try:
+                video_segment, queued = await self.record_upload(
+                    object_key, etag, owner[0], owner[1], 'notification'
+                )
+            except HTTPException as e:
+                # A full queue is retried by the sender; earlier records are already claimed
+                if e.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+                    raise
+                logger.warning(f"Ignoring notification for {object_key}: {e.detail}")
+                continue
+
+            if queued:
+                # Submitted right away so a later refusal cannot drop it
+                submit_ingest(video_segment.id)
+                queued_count += 1
+        return queued_count
+
+    async def record_upload(
         self,
         object_key: str,
+        etag: str,
+        user_id: int,
         step_id: int,
-        user_id: int
-    ) -> VideoSegment:
+        source: str
+    ) -> Tuple[VideoSegment, bool]:
         """
-        Process uploaded video:
-        1. Download from S3
-        2. Validate and extract metadata
-        3. Create video segment record
+        Record one version of an uploaded object as a pending segment, once.
+        The (object_key, etag) claim and the segment are committed together,
+        so repeated or concurrent triggers for the same version find the claim
+        taken and get the existing segment. A new version of an ingested key
+        sends its segment back to pending.
+        Returns tuple of (segment, queued); only queued segments need submitting.
         """
+        step = self.db.query(StoryStep).filter(StoryStep.id == step_id).first()
+        if not step:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Story step not found"
+            )
+
         try:
+            event_id = self.db.execute(
+                insert(IngestEvent)
+                .values(object_key=object_key, etag=etag, source=source)
+                .on_conflict_do_nothing(constraint="uq_ingest_events_object_key_etag")
+                .returning(IngestEvent.id)
+            ).scalar()
+            video_segment = self.db.query(VideoSegment).filter(
+                VideoSegment.storage_path == object_key
+            ).first()
+
+            if event_id is None:
+                self.db.commit()
+                if not video_segment:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Video segment not found"
+                    )
+                return video_segment, False
+
+            replaced_approved = False
+            # Local cache copies of the content this upload replaces
+            replaced_etag = video_segment.etag if video_segment else None
+            replaced = video_segment is not None
+            if video_segment and video_segment.processing_status in ('pending', 'processing'):
+                # The worker reads the object when it starts
+                queued = False
+            else:
+                check_ingest_capacity(self.db)
+                queued = True
+                if not video_segment:
+                    video_segment = VideoSegment(
+                        step_id=step.id,
+                        user_id=user_id,
+                        storage_path=object_key,
+                        duration=0.0,  # Filled in by ingestion
+                        is_approved=False
+                    )
+                    self.db.add(video_segment)
+                elif video_segment.is_approved:
+                    # Replaced content needs moderating again
+                    video_segment.is_approved = False
+                    replaced_approved = True
+                video_segment.processing_status = 'pending'
+                video_segment.processing_error = None
+                video_segment.duplicate_of_id = None
+            video_segment.etag = etag
+
+            self.db.flush()
+            self.db.query(IngestEvent).filter(IngestEvent.id == event_id).update(
+                {IngestEvent.video_segment_id: video_segment.id}
+            )
+            self.db.commit()
+
+            # Stories pre-rendered from the old content must not be served,
+            # nor may renders on this host read its cached copies
+            if replaced_approved:
+                await PrerenderPoolService(self.db).invalidate_segment(video_segment.id)
+            if replaced:
+                SegmentCache(self.storage_service).discard(object_key, replaced_etag)
+            self.db.refresh(video_segment)
+            return video_segment, queued
+        except HTTPException:
+            self.db.rollback()
+            raise
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error recording upload: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to record upload"
+            )
+
+    async def process_video(self, segment_id: int) -> Optional[VideoSegment]:
+        """
+        Ingest a pending video segment:
+        1. Validate and extract metadata with ranged reads
+        2. Download from S3
+        3. Detect scene changes, defects, loudness and the best trim for
+           the step's duration window in one decode
+        4. Extract the thumbnail and scrubber sprite from keyframes
+        5. Store the metadata and mark the segment completed
+        Failures are recorded on the segment rather than raised.
+        """
+        video_segment = await self.get_video_segment(segment_id)
+        if not video_segment:
+            logger.error(f"Video segment {segment_id} not found for ingestion")
+            return None
+
+        video_segment.processing_status = 'processing'
+        video_segment.processing_error = None
+        self.db.commit()
+        object_key = video_segment.storage_path
+
+        try:
+            # Validate before transferring the whole file
+            metadata = await self.validate_remote_video(object_key)
+
             # Create temporary file
             with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as temp_file:
-                # Download file from S3
-                self.storage_service.s3_client.download_file(
+                # Download file from S3 on the storage I/O pool, off the event loop
+                await run_storage_io(
+                    self.storage_service.s3_client.download_file,
                     settings.AWS_BUCKET_NAME,
                     object_key,
                     temp_file.name
                 )
 
-                # Validate video and get metadata
-                metadata = await self.validate_video(temp_file.name)
-
-                # Create video segment
-                video_segment = VideoSegment(
-                    step_id=step_id,
-                    user_id=user_id,
-                    storage_path=object_key,
-                    duration=metadata["duration"],
-                    is_approved=False
+                analysis = await asyncio.to_thread(
+                    analyze_video,
+                    temp_file.name,
+                    video_segment.step.duration_max
                 )
 
-                self.db.add(video_segment)
-                self.db.commit()
-                self.db.refresh(video_segment)
+            video_segment.duration = metadata["duration"]
+            video_segment.width = metadata["width"]
+            video_segment.height = metadata["height"]
+            video_segment.fps = metadata["fps"]
+            video_segment.content_type = metadata["content_type"]
+            video_segment.keyframe_times = metadata["keyframe_times"]
+            video_segment.keyframe_offsets = metadata["keyframe_offsets"]
+            video_segment.scene_changes = analysis["scene_changes"]
+            video_segment.mean_volume = analysis["mean_volume"]
+            video_segment.max_volume = analysis["max_volume"]
+            video_segment.moderation_labels = analysis["moderation_labels"]
+            video_segment.suggested_start_time, video_segment.suggested_end_time = analysis["trim"] or (None, None)
+            self._set_fingerprint(
+                video_segment,
+                analysis["video_hash"],
+                analysis["video_hash_sequence"],
+                analysis["audio_hash"]
+            )
 
-                return video_segment
+            # Re-uploads of an existing clip go no further
+            duplicate = self._find_duplicate(video_segment)
+            if duplicate:
+                video_segment.duplicate_of_id = duplicate.id
+                video_segment.processing_status = 'failed'
+                video_segment.processing_error = f"Duplicate of video segment {duplicate.id}"
+            else:
+                previews = await asyncio.to_thread(self._create_previews, temp_file.name, metadata, object_key)
+                video_segment.thumbnail_path = previews.thumbnail_path
+                video_segment.sprite_path = previews.sprite_path
+                video_segment.sprite_vtt_path = previews.vtt_path
+                video_segment.processing_status = 'completed'
+            self.db.commit()
 
         except Exception as e:
+            self.db.rollback()
             logger.error(f"Error processing video: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to process video"
-            )
+            video_segment.processing_status = 'failed'
+            video_segment.processing_error = e.detail if isinstance(e, HTTPException) else "Failed to process video"
+            self.db.commit()
         finally:
             # Clean up temporary file
             if 'temp_file' in locals():
                 os.unlink(temp_file.name)
 
+        self.db.refresh(video_segment)
+        return video_segment
+
+    def _create_previews(self, file_path: str, metadata: Dict[str, Any], object_key: str) -> PreviewPaths:
+        """Extract and upload a segment's thumbnail, sprite sheet and WebVTT index"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            previews = extract_previews(
+                file_path,
+                metadata["duration"],
+                metadata["width"],
+                metadata["height"],
+                temp_dir,
+                metadata["keyframe_times"]
+            )
+            return upload_previews(self.storage_service, previews, object_key)
+
+    def _set_fingerprint(
+        self,
+        video_segment: VideoSegment,
+        video_hash: Optional[int],
+        video_hash_sequence: List[int],
+        audio_hash: Optional[int]
+    ) -> None:
+        """Store a segment's fingerprint and the chunks its lookup index uses"""
+        video_segment.video_hash = video_hash
+        video_segment.video_hash_sequence = video_hash_sequence or None
+        video_segment.audio_hash = audio_hash
+        chunks = hash_chunks(video_hash) if video_hash is not None else [None] * HASH_CHUNKS
+        for index, chunk in enumerate(chunks):
+            setattr(video_segment, f"video_hash_{index}", chunk)
+
+    def _find_duplicate(self, video_segment: VideoSegment) -> Optional[VideoSegment]:
+        """
+        Find an ingested segment with a near-identical fingerprint.
+        Hashes within MAX_DUPLICATE_VIDEO_DISTANCE bits of each other share
+        at least one of the four 16-bit chunks exactly, so candidates come
+        from indexed equality lookups and are then compared in full. A
+        match also needs the per-second hash sequences to agree, so clips
+        that only share a static layout are not rejected.
+        """
+        if video_segment.video_hash is None or not video_segment.video_hash_sequence:
+            return None
+
+        chunk_columns = [
+            VideoSegment.video_hash_0,
+            VideoSegment.video_hash_1,
+            VideoSegment.video_hash_2,
+            VideoSegment.video_hash_3
+        ]
+        candidates = self.db.query(VideoSegment).filter(
+            and_(
+                VideoSegment.id != video_segment.id,
+                VideoSegment.processing_status == 'completed',
+                or_(*[
+                    column == chunk
+                    for column, chunk in zip(chunk_columns, hash_chunks(video_segment.video_hash))
+                ])
+            )
+        ).order_by(VideoSegment.id).all()
+
+        for candidate in candidates:
+            if abs(candidate.duration - video_segment.duration) > MAX_DUPLICATE_DURATION_DELTA:
+                continue
+            if hamming_distance(candidate.video_hash, video_segment.video_hash) > MAX_DUPLICATE_VIDEO_DISTANCE:
+                continue
+            if not candidate.video_hash_sequence or sequence_agreement(
+                candidate.video_hash_sequence,
+                video_segment.video_hash_sequence,
+                MAX_DUPLICATE_FRAME_DISTANCE
+            ) < MIN_DUPLICATE_SEQUENCE_AGREEMENT:
+                continue
+            if candidate.audio_hash is not None and video_segment.audio_hash is not None:
+                if hamming_distance(candidate.audio_hash, video_segment.audio_hash) > MAX_DUPLICATE_AUDIO_DISTANCE:
+                    continue
+            return candidate
+        return None
+
     async def get_video_segment(self, segment_id: int) -> Optional[VideoSegment]:
         """Get video segment by ID"""
         return self.db.query(VideoSegment).filter(VideoSegment.id == segment_id).first()
@@ -132,12 +540,96 @@ class VideoService:
                 detail="Video segment not found"
             )
 
+        was_approved = segment.is_approved
         segment.is_approved = is_approved
         segment.approval_notes = approval_notes
         self.db.commit()
+
+        # Pre-rendered stories must not outlive a segment's approval
+        if was_approved and not is_approved:
+            await PrerenderPoolService(self.db).invalidate_segment(segment_id)
+
         self.db.refresh(segment)
         return segment
 
+    async def update_segment_status(self, segment_id: int, update: VideoSegmentUpdate) -> VideoSegment:
+        """Approve or reject a video segment, keeping the rejection reason as its notes"""
+        return await self.update_video_segment(
+            segment_id,
+            is_approved=update.status == "approved",
+            approval_notes=update.rejection_reason
+        )
+
+    async def _get_owned_segment(self, object_key: str, user_id: int) -> VideoSegment:
+        """The segment stored at an object key, if it belongs to the user"""
+        segment = self.db.query(VideoSegment).filter(VideoSegment.storage_path == object_key).first()
+        if not segment:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Video not found"
+            )
+        if segment.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access this video"
+            )
+        return segment
+
+    async def get_metadata(self, object_key: str, user_id: int) -> VideoMetadata:
+        """Metadata of a user's uploaded video"""
+        segment = await self._get_owned_segment(object_key, user_id)
+        details = {
+            "content_type": segment.content_type or "video/mp4",
+            "duration": segment.duration,
+            "width": segment.width,
+            "height": segment.height
+        }
+        # Release the connection before the storage round trip
+        self.db.commit()
+
+        size = await self.storage_service.get_file_size(object_key)
+        if size is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Video not found"
+            )
+        return VideoMetadata(object_key=object_key, size=size, **details)
+
+    async def delete_video(self, object_key: str, user_id: int) -> bool:
+        """Delete a user's uploaded video and its segment"""
+        segment = await self._get_owned_segment(object_key, user_id)
+        return await self.delete_video_segment(segment.id)
+
+    async def get_view_url(self, object_key: str) -> str:
+        """
+        Presigned URL for viewing a video. Objects the database knows about,
+        and objects with a cached URL, skip the storage existence check.
+        """
+        url = self.storage_service.cached_download_url(object_key)
+        if url is not None:
+            return url
+
+        known = self.db.query(VideoSegment.id).filter(VideoSegment.storage_path == object_key).first() or \
+            self.db.query(GeneratedStory.id).filter(GeneratedStory.storage_path == object_key).first()
+        if not known and not await self.storage_service.check_file_exists(object_key):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Video not found"
+            )
+        return await self.storage_service.get_download_url(object_key)
+
+    async def get_sprite_vtt(self, segment_id: int) -> str:
+        """A segment's WebVTT scrubber index, pointing at a presigned sprite URL"""
+        segment = await self.get_video_segment(segment_id)
+        if not segment or not segment.sprite_vtt_path or not segment.sprite_path:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Video segment previews not found"
+            )
+        vtt_path, sprite_path = segment.sprite_vtt_path, segment.sprite_path
+        self.db.commit()
+        return await signed_sprite_vtt(self.storage_service, vtt_path, sprite_path)
+
     async def delete_video_segment(self, segment_id: int) -> bool:
         """Delete video segment and its associated file"""
         segment = await self.get_video_segment(segment_id)
@@ -147,10 +639,13 @@ class VideoService:
                 detail="Video segment not found"
             )
 
-        # Delete file from S3
-        await self.storage_service.delete_file(segment.storage_path)
+        await PrerenderPoolService(self.db).invalidate_segment(segment_id)
 
-        # Delete segment record
+        # Stored files are deleted by the outbox drainer once this commits
+        enqueue_artifact_deletion(self.db, segment)
+        self.db.query(IngestEvent).filter(IngestEvent.video_segment_id == segment_id).update(
+            {IngestEvent.video_segment_id: None}
+        )
         self.db.delete(segment)
         self.db.commit()
         return True 
\ No newline at end of file
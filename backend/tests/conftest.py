@@ -0,0 +1,50 @@
+"""Shared test setup: import paths, required settings and a test database"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# Settings without defaults; tests never reach the configured database or bucket
+for name, value in {
+    "DB_USER": "postgres",
+    "DB_PASSWORD": "postgres",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "lovestory_test",
+    "JWT_SECRET": "test",
+    "AWS_ACCESS_KEY_ID": "test",
+    "AWS_SECRET_ACCESS_KEY": "test",
+    "AWS_BUCKET_NAME": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+@pytest.fixture(scope="session")
+def engine():
+    """
+    Engine on the Postgres database named by TEST_DATABASE_URL, with the
+    schema created for the session and dropped afterwards
+    """
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    import models.story  # noqa: F401  registers every table on Base.metadata
+    from models.base import Base
+
+    engine = create_engine(url, pool_size=5, max_overflow=0)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+@pytest.fixture
+def db(engine):
+    """A session bound to the test engine"""
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
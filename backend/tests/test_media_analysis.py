@@ -0,0 +1,49 @@
+"""Ingest analysis on real encoded clips"""
+import os
+import sys
+
+import pytest
+from moviepy.editor import VideoFileClip
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from fixtures import ClipSpec, make_clip
+from services.media_analysis import ANALYSIS_SAMPLE_RATE, analyze_video, decode_audio, measure_loudness
+
+@pytest.fixture(scope="module")
+def clip_dir(tmp_path_factory) -> str:
+    return str(tmp_path_factory.mktemp("clips"))
+
+def test_decode_audio_longer_than_one_chunk(clip_dir):
+    path = make_clip(ClipSpec(160, 120, 12, 4.0, 44100), clip_dir)
+
+    with VideoFileClip(path, audio_fps=ANALYSIS_SAMPLE_RATE) as video:
+        samples = decode_audio(video, ANALYSIS_SAMPLE_RATE)
+
+    assert samples.shape[1] == 2
+    assert samples.shape[0] == pytest.approx(4.0 * ANALYSIS_SAMPLE_RATE, rel=0.05)
+    mean_volume, max_volume = measure_loudness(samples, ANALYSIS_SAMPLE_RATE)
+    assert mean_volume is not None and max_volume is not None
+
+def test_decode_audio_without_audio_stream(clip_dir):
+    path = make_clip(ClipSpec(160, 120, 12, 4.0, 44100), clip_dir)
+    silent_path = os.path.join(clip_dir, "no_audio.mp4")
+    with VideoFileClip(path) as video:
+        video.without_audio().write_videofile(silent_path, codec="libx264", audio=False, logger=None)
+
+    with VideoFileClip(silent_path, audio_fps=ANALYSIS_SAMPLE_RATE) as video:
+        assert decode_audio(video, ANALYSIS_SAMPLE_RATE) is None
+
+def test_analyze_video_with_audio_longer_than_three_seconds(clip_dir):
+    path = make_clip(ClipSpec(320, 240, 24, 5.0, 44100), clip_dir)
+
+    analysis = analyze_video(path, duration_max=3.0)
+
+    assert analysis["mean_volume"] is not None
+    assert analysis["max_volume"] is not None
+    assert analysis["audio_hash"] is not None
+    assert analysis["video_hash"] is not None
+    assert len(analysis["video_hash_sequence"]) == 5
+    assert "silent" not in analysis["moderation_labels"]["flags"]
+    start, end = analysis["trim"]
+    assert end - start == pytest.approx(3.0, abs=0.1)
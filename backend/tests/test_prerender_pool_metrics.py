@@ -0,0 +1,47 @@
+"""Pool claims count hits and misses without a database round trip of their own"""
+import asyncio
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from models.story import PrerenderPoolMetric
+from services import prerender_pool
+from services.prerender_pool import PrerenderPoolService, flush_pool_metrics
+
+@pytest.fixture
+def metrics(engine, monkeypatch):
+    """Counters flushed to the test database, starting from zero"""
+    monkeypatch.setattr(prerender_pool, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(prerender_pool, "_pending_metrics", {})
+    with engine.begin() as connection:
+        connection.execute(PrerenderPoolMetric.__table__.delete())
+    yield
+    with engine.begin() as connection:
+        connection.execute(PrerenderPoolMetric.__table__.delete())
+
+def test_claim_uses_only_the_callers_connection(engine, db, metrics):
+    checkouts = []
+    listener = lambda *args: checkouts.append(args)
+    event.listen(engine, "checkout", listener)
+    try:
+        entry = asyncio.run(PrerenderPoolService(db).claim(1, 1, "1080p", None, None))
+    finally:
+        event.remove(engine, "checkout", listener)
+        db.rollback()
+
+    assert entry is None
+    assert len(checkouts) == 1
+    assert db.query(PrerenderPoolMetric).count() == 0
+
+def test_flush_adds_pending_counts(db, metrics):
+    prerender_pool.record_pool_metric("misses")
+    prerender_pool.record_pool_metric("misses")
+    flush_pool_metrics()
+    prerender_pool.record_pool_metric("misses")
+    prerender_pool.record_pool_metric("hits")
+    flush_pool_metrics()
+
+    counts = dict(db.query(PrerenderPoolMetric.name, PrerenderPoolMetric.count).all())
+    assert counts == {"hits": 1, "misses": 3}
+    assert prerender_pool._pending_metrics == {}
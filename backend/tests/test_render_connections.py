@@ -0,0 +1,85 @@
+"""Story renders must not hold a pooled database connection while encoding"""
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from models.story import User, StoryTemplate, GeneratedStory
+from services import story_generation
+from services.render_plan import RenderPlan, RenderSegment
+
+class PoolCounter:
+    """Counts connections checked out of an engine's pool"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.checkouts = 0
+        self.checkins = 0
+
+    @property
+    def checked_out(self) -> int:
+        """Connections currently checked out, including any from before counting began"""
+        return self.engine.pool.checkedout()
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.checkins += 1
+
+    def __enter__(self) -> "PoolCounter":
+        event.listen(self.engine, "checkout", self._on_checkout)
+        event.listen(self.engine, "checkin", self._on_checkin)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "checkout", self._on_checkout)
+        event.remove(self.engine, "checkin", self._on_checkin)
+
+@pytest.fixture
+def story_id(db) -> int:
+    """A committed story waiting to be rendered"""
+    suffix = uuid.uuid4().hex[:8]
+    user = User(username=f"render_{suffix}", email=f"render_{suffix}@example.com", hashed_password="x")
+    template = StoryTemplate(name=f"Template {suffix}")
+    db.add_all([user, template])
+    db.flush()
+    story = GeneratedStory(
+        template_id=template.id,
+        user_id=user.id,
+        title="Render test",
+        status='processing',
+        generation_metadata={}
+    )
+    db.add(story)
+    db.flush()
+    story_id = story.id
+    db.commit()
+    return story_id
+
+def test_render_holds_no_connection_while_encoding(engine, db, story_id, monkeypatch):
+    plan = RenderPlan("720p", (RenderSegment("videos/1/1/clip.mp4", source_duration=5.0),))
+
+    with PoolCounter(engine) as counter:
+        checked_out_during_render = []
+
+        def render_job(plan, storage_service, resolve_path, clip_cache=None, on_stage=None):
+            checked_out_during_render.append(counter.checked_out)
+            return "generated_stories/story_test.mp4", {
+                "duration": 5.0,
+                "width": 1280,
+                "height": 720,
+                "fps": 30.0,
+                "stage_timings": {"encode": 1.0}
+            }
+
+        monkeypatch.setattr(story_generation, "render_story_job", render_job)
+        service = story_generation.StoryGenerationService(db)
+        story = asyncio.run(service.render_planned_story(story_id, plan))
+
+    assert checked_out_during_render == [0]
+    # The plan lookup and the result write did use the pool
+    assert counter.checkouts >= 2
+    assert story.status == 'completed'
+    assert story.storage_path == "generated_stories/story_test.mp4"
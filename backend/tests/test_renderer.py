@@ -0,0 +1,36 @@
+"""Story renders from real encoded clips"""
+import os
+import sys
+
+import pytest
+from moviepy.editor import VideoFileClip
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from fixtures import ClipSpec, make_clip
+from services.media_analysis import ANALYSIS_SAMPLE_RATE, decode_audio, measure_loudness
+from services.render_plan import RenderPlan, RenderSegment
+from services.renderer import render_story
+
+@pytest.fixture(scope="module")
+def source(tmp_path_factory) -> str:
+    # Already at the target height, so renders skip the resize
+    return make_clip(ClipSpec(400, 720, 12, 3.0, 44100), str(tmp_path_factory.mktemp("clips")))
+
+def _render_loudness(source: str, output_path: str, gains) -> float:
+    plan = RenderPlan("720p", tuple(
+        RenderSegment("source.mp4", volume_adjustment=gain, source_duration=3.0) for gain in gains
+    ))
+    render_story(plan, lambda segment: source, output_path)
+    with VideoFileClip(output_path, audio_fps=ANALYSIS_SAMPLE_RATE) as video:
+        mean_volume, _ = measure_loudness(decode_audio(video, ANALYSIS_SAMPLE_RATE), ANALYSIS_SAMPLE_RATE)
+    return mean_volume
+
+def test_segment_gain_is_applied_by_the_encoder(source, tmp_path):
+    unity = _render_loudness(source, str(tmp_path / "unity.mp4"), [1.0, 1.0])
+    halved = _render_loudness(source, str(tmp_path / "halved.mp4"), [0.5, 0.5])
+    mixed = _render_loudness(source, str(tmp_path / "mixed.mp4"), [1.0, 0.5])
+
+    # Half the amplitude is 6 dB quieter; one halved segment of two lands in between
+    assert halved == pytest.approx(unity - 6.02, abs=0.5)
+    assert halved < mixed < unity
@@ -0,0 +1,66 @@
+"""Local segment cache copies are kept per uploaded version"""
+import os
+
+import pytest
+
+from services.render_plan import RenderSegment
+from services.segment_cache import SegmentCache
+from config.settings import settings
+
+class FakeS3Client:
+    """Serves one object whose content changes with its ETag"""
+
+    def __init__(self):
+        self.etag = "v1"
+        self.downloads = []
+
+    def download_file(self, bucket, key, filename, ExtraArgs=None):
+        self.downloads.append(ExtraArgs)
+        if ExtraArgs and ExtraArgs.get("IfMatch") != f'"{self.etag}"':
+            raise RuntimeError("412 Precondition Failed")
+        with open(filename, "wb") as local_file:
+            local_file.write(self.etag.encode())
+
+class FakeStorageService:
+    def __init__(self):
+        self.s3_client = FakeS3Client()
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch) -> SegmentCache:
+    monkeypatch.setattr(settings, "SEGMENT_CACHE_DIR", str(tmp_path))
+    return SegmentCache(FakeStorageService())
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as local_file:
+        return local_file.read()
+
+def test_reupload_is_not_served_from_the_old_copy(cache):
+    s3 = cache.storage_service.s3_client
+    first = cache.resolve(RenderSegment("videos/1/1/clip.mp4", etag="v1"))
+    assert _read(first) == b"v1"
+
+    s3.etag = "v2"
+    second = cache.resolve(RenderSegment("videos/1/1/clip.mp4", etag="v2"))
+
+    assert second != first
+    assert _read(second) == b"v2"
+    assert s3.downloads == [{"IfMatch": '"v1"'}, {"IfMatch": '"v2"'}]
+
+def test_download_of_a_replaced_version_fails(cache):
+    cache.storage_service.s3_client.etag = "v2"
+    with pytest.raises(RuntimeError):
+        cache.fetch("videos/1/1/clip.mp4", "v1")
+    assert not cache.is_cached("videos/1/1/clip.mp4", "v1")
+
+def test_discard_removes_full_and_sparse_copies(cache):
+    full_path = cache.fetch("videos/1/1/clip.mp4", "v1")
+    root, extension = os.path.splitext(full_path)
+    sparse_path = f"{root}_0-100{extension}"
+    open(sparse_path, "wb").close()
+    kept = cache.fetch("videos/1/1/other.mp4", "v1")
+
+    cache.discard("videos/1/1/clip.mp4", "v1")
+
+    assert not os.path.exists(full_path)
+    assert not os.path.exists(sparse_path)
+    assert os.path.exists(kept)
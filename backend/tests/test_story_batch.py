@@ -0,0 +1,43 @@
+"""Batch story generation shares the render capacity of single stories"""
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from models.story import User, StoryTemplate, GeneratedStory
+from schemas.story import StoryBatchRequest
+from services.story_batch import StoryBatchService
+from config.settings import settings
+
+def test_batch_refused_while_renders_are_over_capacity(db):
+    suffix = uuid.uuid4().hex[:8]
+    user = User(username=f"batch_{suffix}", email=f"batch_{suffix}@example.com", hashed_password="x")
+    template = StoryTemplate(name=f"Template {suffix}", is_active=True)
+    db.add_all([user, template])
+    db.flush()
+    busy = GeneratedStory(
+        template_id=template.id,
+        user_id=user.id,
+        title="In flight",
+        status='processing',
+        generation_metadata={
+            "predicted_stage_seconds": {"total": settings.RENDER_MAX_BACKLOG_SECONDS + 120.0},
+            "render_started_at": datetime.utcnow().isoformat()
+        }
+    )
+    db.add(busy)
+    db.commit()
+
+    try:
+        request = StoryBatchRequest(template_id=template.id, count=3, title="Batch")
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(StoryBatchService(db).create_batch(user.id, request))
+
+        assert error.value.status_code == 503
+        assert int(error.value.headers["Retry-After"]) > 0
+    finally:
+        db.rollback()
+        db.delete(busy)
+        db.commit()